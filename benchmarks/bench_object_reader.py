@@ -0,0 +1,80 @@
+"""
+Compares reading blobs with one `git cat-file -p` process per blob against the pooled
+`git cat-file --batch` coprocess.
+
+Usage:
+    python benchmarks/bench_object_reader.py [blob_count]
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from gh_worktree.git import GitCLI
+
+
+def _create_repo(repo_dir: Path, blob_count: int):
+    subprocess.run(["git", "init", "-q"], cwd=repo_dir, check=True)
+    files_dir = repo_dir / "files"
+    files_dir.mkdir()
+    for i in range(blob_count):
+        (files_dir / f"file_{i}.txt").write_text(f"content of file {i}\n" * 20)
+    subprocess.run(["git", "add", "files"], cwd=repo_dir, check=True)
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=bench",
+            "-c",
+            "user.email=bench@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "bench",
+        ],
+        cwd=repo_dir,
+        check=True,
+    )
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    # silence the `Executing: ...` lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+
+def main(blob_count: int = 500):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo_dir = Path(tmp_dir)
+        _create_repo(repo_dir, blob_count)
+        paths = [f"files/file_{i}.txt" for i in range(blob_count)]
+
+        def one_process_per_blob():
+            cli = GitCLI(SimpleNamespace(cwd=repo_dir))
+            for path in paths:
+                list(cli._iter_output("cat-file", "-p", f"HEAD:{path}"))
+
+        def pooled_coprocess():
+            cli = GitCLI(SimpleNamespace(cwd=repo_dir))
+            for path in paths:
+                cli.read_object(f"HEAD:{path}")
+            cli.close()
+
+        old = _time(one_process_per_blob)
+        new = _time(pooled_coprocess)
+
+    print(f"Reading {blob_count} blobs")
+    print(f"  one process per blob: {old * 1000:8.1f} ms")
+    print(f"  pooled coprocess:     {new * 1000:8.1f} ms")
+    print(f"  speedup:              {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,86 @@
+"""
+Compares adding a worktree with every file checked out against a sparse worktree holding one
+directory of a synthetic repository, by wall time and by the number of files written.
+
+Usage:
+    python benchmarks/bench_sparse_checkout.py [dir_count] [files_per_dir]
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from gh_worktree.git import GitCLI
+
+
+def _create_repo(repo_dir: Path, dir_count: int, files_per_dir: int):
+    subprocess.run(["git", "init", "-q", "-b", "main"], cwd=repo_dir, check=True)
+    for i in range(dir_count):
+        package_dir = repo_dir / f"package_{i}"
+        package_dir.mkdir()
+        for j in range(files_per_dir):
+            (package_dir / f"module_{j}.py").write_text(f"# module {j}\n" * 50)
+    subprocess.run(["git", "add", "."], cwd=repo_dir, check=True)
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=bench",
+            "-c",
+            "user.email=bench@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "bench",
+        ],
+        cwd=repo_dir,
+        check=True,
+    )
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    # silence the `Executing: ...` lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+
+def _count_files(worktree_dir: Path) -> int:
+    # a worktree's .git is a file pointing at the bare repository
+    return sum(len(files) for _, _, files in os.walk(worktree_dir)) - 1
+
+
+def main(dir_count: int = 100, files_per_dir: int = 200):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo_dir = Path(tmp_dir) / "repo"
+        repo_dir.mkdir()
+        _create_repo(repo_dir, dir_count, files_per_dir)
+        project_dir = Path(tmp_dir) / "project"
+        with contextlib.redirect_stdout(io.StringIO()):
+            GitCLI(SimpleNamespace(cwd=Path(tmp_dir))).clone(
+                str(repo_dir), str(project_dir)
+            )
+
+        cli = GitCLI(SimpleNamespace(cwd=project_dir))
+        full = _time(lambda: cli.add_worktree("full", "main"))
+        sparse = _time(
+            lambda: cli.add_worktree("sparse", "main", sparse_cones=["package_0"])
+        )
+        full_files = _count_files(project_dir / "full")
+        sparse_files = _count_files(project_dir / "sparse")
+
+    print(f"Adding a worktree of {dir_count * files_per_dir} files")
+    print(f"  full checkout:   {full * 1000:8.1f} ms {full_files:8d} files")
+    print(f"  sparse checkout: {sparse * 1000:8.1f} ms {sparse_files:8d} files")
+    print(f"  speedup:         {full / sparse:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
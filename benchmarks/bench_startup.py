@@ -0,0 +1,97 @@
+"""
+Measures CLI startup cost: the cumulative import time of `gh_worktree.cli`, from
+`python -X importtime`, and the wall-clock time of `gh-worktree version`. Exits with an error
+when a module only some commands need is imported at startup, so CI catches startup regressions.
+Timings are only reported, since they vary with the machine.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+# slow to import, and only needed by some commands, so they're imported where they're used
+LAZY_MODULES = [
+    "asyncio",
+    "concurrent.futures",
+    "gh_worktree.gh",
+    "gh_worktree.git",
+    "gh_worktree.templates",
+    "hashlib",
+    "inspect",
+    "socket",
+    "ssl",
+]
+
+
+def _env() -> Dict[str, str]:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_DIR), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def import_times(module: str = "gh_worktree.cli") -> Dict[str, int]:
+    """
+    :return: A map of module name to cumulative import time, in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_env(),
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.replace("import time:", "", 1).split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def version_wall_time(runs: int) -> float:
+    """
+    :return: The median wall-clock time of `gh-worktree version`, in seconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "gh_worktree", "version"],
+            capture_output=True,
+            check=True,
+            env=_env(),
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(runs: int = 20):
+    times = import_times()
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[1:6]
+
+    print(f"import gh_worktree.cli: {times['gh_worktree.cli'] / 1000:8.1f} ms")
+    for name, cumulative in slowest:
+        print(f"  {name:<28} {cumulative / 1000:8.1f} ms")
+    print(f"gh-worktree version:    {version_wall_time(runs) * 1000:8.1f} ms")
+
+    failures = [
+        f"{name} is imported at startup" for name in LAZY_MODULES if name in times
+    ]
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
@@ -0,0 +1,86 @@
+"""
+Times materializing a synthetic template tree into new worktrees, copying files one at a time
+against copying them on the thread pool.
+
+The pool pays off where each file operation waits on the filesystem, like NFS, so pass a
+directory on such a mount as `base_dir` to measure it there.
+
+Usage:
+    python benchmarks/bench_templates.py [file_count] [workers] [base_dir]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+from gh_worktree.config import GlobalConfig
+from gh_worktree.templates import Templates
+
+FILES_PER_DIR = 100
+# one in this many files references variables
+TEMPLATE_RATIO = 10
+
+
+def _create_templates(templates_dir: Path, file_count: int):
+    for i in range(file_count):
+        file_dir = templates_dir / f"dir_{i // FILES_PER_DIR}"
+        file_dir.mkdir(parents=True, exist_ok=True)
+        if i % TEMPLATE_RATIO == 0:
+            content = f"worktree: $WORKTREE_NAME\nrepo: ${{REPO_NAME}}\nfile: {i}\n"
+        else:
+            content = f"static content of file {i}\n" * 20
+        file_path = file_dir / f"file_{i}.conf"
+        file_path.write_text(content)
+        # old enough for the template index to trust the modification time
+        os.utime(file_path, (time.time() - 60, time.time() - 60))
+
+
+def _time(templates: Templates, worktree_name: str) -> float:
+    start = time.perf_counter()
+    # silence the summary line
+    with contextlib.redirect_stdout(io.StringIO()):
+        templates.copy(worktree_name)
+    return time.perf_counter() - start
+
+
+def main(file_count: int = 5000, workers: int = 8, base_dir: Optional[str] = None):
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp_dir:
+        project_dir = Path(tmp_dir) / "project"
+        config_dir = project_dir / ".gh" / "worktree"
+        _create_templates(config_dir / "templates", file_count)
+
+        def run(worktree_name: str, template_workers: int) -> float:
+            global_config = GlobalConfig()
+            global_config.update(
+                template_strategy="copy", template_workers=template_workers
+            )
+            context = SimpleNamespace(
+                project_dir=project_dir,
+                config_dir=config_dir,
+                global_config_dir=Path(tmp_dir) / "global",
+                get_config=lambda: SimpleNamespace(name="bench"),
+                get_global_config=lambda: global_config,
+            )
+            (project_dir / worktree_name).mkdir()
+            return _time(Templates(context), worktree_name)
+
+        # builds the template index, so both runs below reuse it
+        run("warmup", workers)
+        serial = run("serial", 1)
+        pooled = run("pooled", workers)
+
+    print(f"Copying {file_count} templates")
+    print(f"  1 worker:     {serial * 1000:8.1f} ms")
+    print(f"  {workers} workers:{'' if workers > 9 else ' '}   {pooled * 1000:8.1f} ms")
+    print(f"  speedup:      {serial / pooled:8.1f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*[int(arg) for arg in args[:2]], *args[2:3])
@@ -6,7 +6,17 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # commands are imported lazily by name, see `gh_worktree.main`
+    hiddenimports=[
+        'gh_worktree.commands.checkout',
+        'gh_worktree.commands.create',
+        'gh_worktree.commands.init',
+        'gh_worktree.commands.install',
+        'gh_worktree.commands.list',
+        'gh_worktree.commands.remove',
+        'gh_worktree.commands.status',
+        'gh_worktree.commands.sync_templates',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
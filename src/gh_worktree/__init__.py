@@ -1,7 +1,11 @@
-from importlib.metadata import version, PackageNotFoundError
+def __getattr__(name: str):
+    # resolving the version scans installed distributions, so only do it when asked
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
 
-try:
-    __version__ = version("gh-worktree")
-except PackageNotFoundError:
-    # Package is not installed
-    __version__ = "unknown"
\ No newline at end of file
+        try:
+            return version("gh-worktree")
+        except PackageNotFoundError:
+            # Package is not installed
+            return "unknown"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,13 @@
-import fire
+import sys
 
+from gh_worktree.dispatch import Dispatcher
 from gh_worktree.main import WorktreeCommands
 
 
 def main():
-    fire.Fire(WorktreeCommands, name="worktree")
+    commands = WorktreeCommands()
+    try:
+        exit_status = Dispatcher("worktree", commands)(sys.argv[1:])
+    finally:
+        commands._runtime.close()
+    sys.exit(exit_status)
@@ -1,8 +1,13 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
+from typing import Dict
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 from gh_worktree.command import Command
+from gh_worktree.config import RepositoryConfig
 from gh_worktree.hooks import Hook
 from gh_worktree.runtime import Runtime
 
@@ -90,12 +95,34 @@ class CheckoutInput(object):
         return self.branch_or_pr
 
 
+def _pr_number(config: RepositoryConfig, pr_number_or_url: str) -> str:
+    """Returns the PR number from a PR number or URL of the project's repository"""
+    if pr_number_or_url.isdigit():
+        return pr_number_or_url
+    if URL_RE.match(pr_number_or_url) and pr_number_or_url.startswith(
+        f"{config.url}/pull/"
+    ):
+        return pr_number_or_url.rsplit("/", 1)[1]
+    raise ValueError(
+        f"Couldn't parse {pr_number_or_url}. Only PR numbers or URLs of "
+        f"{config.owner}/{config.name} can be checked out together."
+    )
+
+
 class CheckoutCommand(Command):
     _name = "checkout"
 
-    def __call__(self, branch_or_pr: str, remote: Optional[str] = None):  # noqa: C901
+    def __call__(
+        self,
+        *branch_or_pr: str,
+        remote: Optional[str] = None,
+        label: Optional[str] = None,
+        review_requested: Optional[str] = None,
+        offline: bool = False,
+        sparse: Optional[str] = None,
+    ):
         """
-        Checkout an existing branch or PR as a worktree.
+        Checkout existing branches or PRs as worktrees.
 
         This accepts a PR number which will be looked up on the GitHub repository the project was
         initialized with. It will also accept a GitHub PR URL. Lastly, it will accept a branch
@@ -103,21 +130,66 @@ class CheckoutCommand(Command):
         to fetch the latest version of the branch with `--remote`, and that flag only works when
         passing a branch name.
 
+        Several PRs may be checked out at once, by number or URL, or by selecting the open PRs
+        with a `--label` or whose review is requested from a user (`@me` for yourself). Their
+        details are looked up in one GitHub request and their branches fetched in one `git fetch`,
+        then the worktrees are set up concurrently, up to the global config's `checkout_workers`
+        at once. PRs whose worktree already exists are skipped.
+
+        PR details are cached in the project for the global config's `cache_ttl`. With
+        `--offline`, they're only read from the cache and nothing is fetched, so the PRs' branches
+        must have been fetched before.
+
+        With `--sparse`, only the directories of a profile in the project config's
+        `sparse_profiles` are checked out, using sparse-checkout's cone mode.
+
         Examples:
             gh-worktree checkout 1234
             gh-worktree checkout https://github.com/octo/repo/pull/1234
             gh-worktree checkout my-local-branch
             gh-worktree checkout a-branch --remote upstream
+            gh-worktree checkout 1234 1235 1236
+            gh-worktree checkout --review-requested @me
+            gh-worktree checkout --label needs-qa
+            gh-worktree checkout 1234 --offline
+            gh-worktree checkout 1234 --sparse backend
 
-        :param branch_or_pr: The branch, PR number, or PR URL to create as a worktree
+        :param branch_or_pr: The branch, PR number, or PR URL to create as a worktree, or several
+            PR numbers or URLs
         :param remote: If `branch_or_pr` is a branch, this may be set to choose the remote to use
+        :param label: Check out the open PRs with this label
+        :param review_requested: Check out the open PRs whose review is requested from this user
+        :param offline: Only use cached PR details and local branches, without network requests
+        :param sparse: The sparse profile whose directories to check out, instead of all files
         """
         self._context.assert_within_project()
+        if offline:
+            self._runtime.gh.offline = True
+        sparse_cones = None
+        if sparse is not None:
+            sparse_cones = self._context.get_config().sparse_cones(sparse)
+        if len(branch_or_pr) == 1 and label is None and review_requested is None:
+            self._checkout_one(str(branch_or_pr[0]), remote, sparse_cones)
+            return
 
-        inpt = CheckoutInput(self._runtime, str(branch_or_pr), remote_name=remote)
+        if not branch_or_pr and label is None and review_requested is None:
+            raise ValueError("Specify a branch, PR number or PR URL to check out")
+        if remote is not None:
+            raise ValueError("Remote name isn't allowed when checking out several PRs.")
+        self._checkout_prs(branch_or_pr, label, review_requested, sparse_cones)
+
+    def _checkout_one(
+        self,
+        branch_or_pr: str,
+        remote: Optional[str],
+        sparse_cones: Optional[List[str]] = None,
+    ):
+        inpt = CheckoutInput(self._runtime, branch_or_pr, remote_name=remote)
         inpt.validate()
 
-        if inpt.pr_number:
+        if self._runtime.gh.offline:
+            print(f"Offline, using the local branch {inpt.worktree_name}")
+        elif inpt.pr_number:
             self._runtime.git.fetch(
                 inpt.remote, f"pull/{inpt.pr_number}/head:{inpt.worktree_name}"
             )
@@ -131,16 +203,144 @@ class CheckoutCommand(Command):
                 print("Ignoring git fetch error, attempting to open worktree")
                 pass
 
+        base_ref = f"{inpt.remote}/{inpt.worktree_name}"
         with self._context.use(self._context.project_dir):
+            self._open(inpt.worktree_name, base_ref, inpt.pr_number, sparse_cones)
+            self._fire_post_checkout(inpt.worktree_name, base_ref)
+
+    def _open(
+        self,
+        worktree_name: str,
+        base_ref: str,
+        pr_number: Optional[str],
+        sparse_cones: Optional[List[str]] = None,
+    ):
+        """Adds the worktree and copies templates into it, between the pre and post hooks"""
+        self._runtime.hooks.fire(Hook.pre_checkout, worktree_name, base_ref)
+        self._runtime.git.open_worktree(worktree_name, sparse_cones=sparse_cones)
+        self._runtime.inventory.record(
+            worktree_name, base_ref=base_ref, pr_number=pr_number
+        )
+        self._runtime.templates.copy(worktree_name)
+
+    def _fire_post_checkout(self, worktree_name: str, base_ref: str):
+        with self._runtime.inventory.track_hook(worktree_name, Hook.post_checkout):
             self._runtime.hooks.fire(
-                Hook.pre_checkout,
-                inpt.worktree_name,
-                f"{inpt.remote}/{inpt.worktree_name}",
+                Hook.post_checkout, worktree_name, base_ref, worktree=worktree_name
             )
-            self._runtime.git.open_worktree(inpt.worktree_name)
-            self._runtime.templates.copy(inpt.worktree_name)
-            self._runtime.hooks.fire(
-                Hook.post_checkout,
-                inpt.worktree_name,
-                f"{inpt.remote}/{inpt.worktree_name}",
+
+    def _resolve_prs(
+        self,
+        pr_numbers_or_urls: Tuple[str, ...],
+        label: Optional[str],
+        review_requested: Optional[str],
+    ) -> Dict[str, str]:
+        """
+        Looks up the PRs to check out, skipping those whose worktree exists
+        :return: A map of PR number to worktree name
+        """
+        config = self._context.get_config()
+        owner_repo = f"{config.owner}/{config.name}"
+        pr_numbers = [_pr_number(config, str(value)) for value in pr_numbers_or_urls]
+        prs = self._runtime.gh.pr_statuses(pr_numbers, owner_repo)
+        if label is not None or review_requested is not None:
+            search = (
+                f"review-requested:{review_requested}" if review_requested else None
+            )
+            for pr in self._runtime.gh.pr_list(owner_repo, label=label, search=search):
+                prs.setdefault(str(pr["number"]), pr)
+
+        existing = set(self._runtime.get_worktrees())
+        worktree_names = {}
+        for pr_number, pr in prs.items():
+            worktree_name = pr["headRefName"]
+            if worktree_name in existing:
+                print(f"Skipping #{pr_number}, worktree {worktree_name} already exists")
+                continue
+            existing.add(worktree_name)
+            worktree_names[pr_number] = worktree_name
+        return worktree_names
+
+    def _checkout_prs(
+        self,
+        pr_numbers_or_urls: Tuple[str, ...],
+        label: Optional[str],
+        review_requested: Optional[str],
+        sparse_cones: Optional[List[str]] = None,
+    ):
+        worktree_names = self._resolve_prs(pr_numbers_or_urls, label, review_requested)
+        if not worktree_names:
+            print("No PRs to check out.")
+            return
+
+        git_remote = self._runtime.get_remote(
+            owner_name=self._context.get_config().owner
+        )
+        if not git_remote:
+            raise AssertionError("Couldn't find matching remote for PR")
+        if not self._runtime.gh.offline:
+            self._runtime.git.fetch_many(
+                git_remote.name,
+                [
+                    f"pull/{pr_number}/head:{worktree_name}"
+                    for pr_number, worktree_name in worktree_names.items()
+                ],
+            )
+
+        # background hooks fork the process, which is only safe without other threads running
+        defer_post_hooks = self._runtime.hooks.runs_in_background(Hook.post_checkout)
+
+        def checkout(pr_number: str) -> Optional[str]:
+            worktree_name = worktree_names[pr_number]
+            base_ref = f"{git_remote.name}/{worktree_name}"
+            try:
+                self._open(worktree_name, base_ref, pr_number, sparse_cones)
+                if not defer_post_hooks:
+                    self._fire_post_checkout(worktree_name, base_ref)
+            except Exception as e:
+                # reported with the others, rather than aborting the whole batch
+                return str(e)
+            return None
+
+        max_workers = self._context.get_global_config().checkout_workers
+        with self._context.use(self._context.project_dir):
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                errors = dict(
+                    zip(worktree_names, executor.map(checkout, worktree_names))
+                )
+
+            if defer_post_hooks:
+                self._fire_deferred(worktree_names, errors, git_remote.name)
+
+        self._report(worktree_names, errors)
+
+    def _fire_deferred(
+        self,
+        worktree_names: Dict[str, str],
+        errors: Dict[str, Optional[str]],
+        remote_name: str,
+    ):
+        """Fires the post hooks of the PRs that were checked out, one after another"""
+        for pr_number, worktree_name in worktree_names.items():
+            if errors[pr_number] is not None:
+                continue
+            try:
+                self._fire_post_checkout(
+                    worktree_name, f"{remote_name}/{worktree_name}"
+                )
+            except Exception as e:
+                errors[pr_number] = str(e)
+
+    @staticmethod
+    def _report(worktree_names: Dict[str, str], errors: Dict[str, Optional[str]]):
+        failures = 0
+        for pr_number, worktree_name in worktree_names.items():
+            if errors[pr_number] is None:
+                print(f"Checked out #{pr_number} as {worktree_name}")
+            else:
+                failures += 1
+                print(f"Failed to check out #{pr_number}: {errors[pr_number]}")
+        if failures:
+            raise RuntimeError(
+                f"Failed to check out {failures} of {len(worktree_names)} PRs"
             )
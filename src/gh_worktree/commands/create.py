@@ -7,7 +7,12 @@ from gh_worktree.hooks import Hook
 class CreateCommand(Command):
     _name = "create"
 
-    def __call__(self, worktree_name: str, *base_ref: Optional[str]):
+    def __call__(
+        self,
+        worktree_name: str,
+        *base_ref: Optional[str],
+        sparse: Optional[str] = None,
+    ):
         """
         Create a new worktree in the current project.
 
@@ -22,17 +27,25 @@ class CreateCommand(Command):
             gh-worktree create testing-create main
             gh-worktree create testing-create upstream/main
             gh-worktree create testing-create upstream/some/other/branch
+            gh-worktree create testing-create --sparse frontend
+
+        With `--sparse`, only the directories of a profile in the project config's
+        `sparse_profiles` are checked out, using sparse-checkout's cone mode.
 
         :param worktree_name: The name of the worktree
         :param base_ref: The base reference to create the worktree from
+        :param sparse: The sparse profile whose directories to check out, instead of all files
         """
         base_ref = base_ref[0] if base_ref else None
         self._context.assert_within_project()
+        sparse_cones = None
+        if sparse is not None:
+            sparse_cones = self._context.get_config().sparse_cones(sparse)
         git_remote_name = None
 
         if base_ref is None:
-            project_config = self._context.get_config()
-            base_ref = project_config.default_branch
+            # the default branch may have changed since the project was initialized
+            base_ref = self._runtime.refresh_config().default_branch
         elif "/" in base_ref:
             git_remote_name, base_ref = base_ref.split("/", 1)
 
@@ -48,9 +61,20 @@ class CreateCommand(Command):
                 Hook.pre_create, worktree_name, f"{git_remote_name}/{base_ref}"
             )
             self._runtime.git.add_worktree(
-                worktree_name, f"{git_remote_name}/{base_ref}"
+                worktree_name,
+                f"{git_remote_name}/{base_ref}",
+                sparse_cones=sparse_cones,
             )
-            self._runtime.templates.copy(worktree_name)
-            self._runtime.hooks.fire(
-                Hook.post_create, worktree_name, f"{git_remote_name}/{base_ref}"
+            self._runtime.inventory.record(
+                worktree_name,
+                base_ref=f"{git_remote_name}/{base_ref}",
+                base_commit=self._runtime.git.rev_parse(f"refs/heads/{worktree_name}"),
             )
+            self._runtime.templates.copy(worktree_name)
+            with self._runtime.inventory.track_hook(worktree_name, Hook.post_create):
+                self._runtime.hooks.fire(
+                    Hook.post_create,
+                    worktree_name,
+                    f"{git_remote_name}/{base_ref}",
+                    worktree=worktree_name,
+                )
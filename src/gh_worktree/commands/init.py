@@ -1,9 +1,11 @@
 import re
+from pathlib import Path
 from typing import Optional
 from urllib import parse
 
 from gh_worktree.command import Command
 from gh_worktree.config import RepositoryConfig
+from gh_worktree.files import lock_file
 from gh_worktree.hooks import Hook
 from gh_worktree.hooks import HookExists
 from gh_worktree.templates import TemplateExists
@@ -12,6 +14,11 @@ from gh_worktree.templates import TemplateExists
 JUST_PATH_RE = re.compile(r"^[\w\-_]+/[\w\-_]+$")
 GIT_EXT_RE = re.compile(r"\.git$")
 
+CONFIG_GIT_PATH = ".gh/worktree"
+TEMPLATES_GIT_PATH = f"{CONFIG_GIT_PATH}/templates"
+# git tree modes of regular files, mapped to the permissions they're written with
+FILE_MODES = {"100644": 0o644, "100755": 0o755}
+
 
 def normalize(repo: str):
     if not repo.startswith("http") and not repo.startswith("git@"):
@@ -25,6 +32,16 @@ def normalize(repo: str):
     return repo
 
 
+def parse_depth(depth: Optional[str]) -> Optional[int]:
+    if depth is None:
+        return None
+    if not depth.isdigit() or int(depth) < 1:
+        raise ValueError(
+            f"Invalid depth: {depth}. Must be a positive number of commits"
+        )
+    return int(depth)
+
+
 class RepositoryTarget(object):
     def __init__(self, repo: str, destination_dir: Optional[str] = None):
         self.uri = normalize(repo)
@@ -43,6 +60,13 @@ class RepositoryTarget(object):
         _, path = self.uri.split(":")
         return path.lstrip("/")
 
+    @property
+    def host(self):
+        if self.uri.startswith("http"):
+            return parse.urlparse(self.uri).hostname
+        host, _ = self.uri.split(":")
+        return host.rsplit("@", 1)[-1]
+
     @property
     def owner(self):
         return self.path.split("/")[0]
@@ -63,7 +87,15 @@ class InitCommand(Command):
 
     _name = "init"
 
-    def __call__(self, repo: str, *destination_dir: Optional[str]):
+    def __call__(
+        self,
+        repo: str,
+        *destination_dir: Optional[str],
+        reference_cache: Optional[str] = None,
+        filter_: Optional[str] = None,
+        depth: Optional[str] = None,
+        shallow_since: Optional[str] = None,
+    ):
         """
         Initialize a project for using gh-worktree with it, by cloning the project and configuring
         it to be a bare git repo.
@@ -77,13 +109,32 @@ class InitCommand(Command):
             gh-worktree init ssh@github.com:bjester/gh-worktree.git
             gh-worktree init bjester/gh-worktree
             gh-worktree init bjester/gh-worktree gh-worktree-second
+            gh-worktree init bjester/gh-worktree --reference-cache ~/.cache/gh-worktree
+            gh-worktree init bjester/gh-worktree --filter=blob:none
+            gh-worktree init bjester/gh-worktree --depth=50
+
+        With `--reference-cache`, or the global config's `reference_cache`, the repository's
+        objects are kept once in a shared cache directory, at `<dir>/<host>/<owner>/<repo>.git`,
+        which is cloned on first use and brought up to date with a single fetch after that. The
+        project's clone borrows the cache's objects through git alternates, so it only fetches
+        and stores what the cache lacks. The cache must not be deleted while projects use it.
+
+        A partial clone, e.g. with `--filter=blob:none`, leaves the objects the filter omits to be
+        fetched as worktrees need them. The hooks and templates in the repo are fetched in one
+        request. A shallow clone, with `--depth` or `--shallow-since`, limits the history fetched
+        instead, which makes later fetches of branches based on older commits slower.
 
         :param repo: The URI, or Github 'owner/repo', to clone
         :type repo: str
         :param destination_dir: The destination directory to clone the project into.
         :type destination_dir: str
+        :param reference_cache: A directory of shared object caches to clone with
+        :param filter_: A partial clone filter, e.g. `blob:none` or `tree:0`
+        :param depth: The number of commits of history to clone
+        :param shallow_since: A date to clone history since, e.g. `2024-01-01`
         """
         destination_dir = destination_dir[0] if destination_dir else None
+        shallow = dict(depth=parse_depth(depth), shallow_since=shallow_since)
         repo_target = RepositoryTarget(repo, destination_dir=destination_dir)
         repo_target.validate()
 
@@ -102,7 +153,14 @@ class InitCommand(Command):
                 project_dir,
                 skip_project=True,
             )
-            self._runtime.git.clone(repo_target.uri, ".bare")
+            reference = self._update_reference(repo_target, reference_cache)
+            self._runtime.git.clone(
+                repo_target.uri,
+                ".bare",
+                reference=reference,
+                filter_spec=filter_,
+                **shallow,
+            )
 
             with (project_dir / ".git").open("w", encoding="utf-8") as f:
                 f.write("gitdir: ./.bare")
@@ -110,16 +168,13 @@ class InitCommand(Command):
             self._runtime.git.config(
                 "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"
             )
-            self._runtime.git.fetch()
-            repo_data = self._runtime.gh.repo_status()
-            config = RepositoryConfig()
-            config.update(
-                default_branch=repo_data["defaultBranchRef"]["name"],
-                owner=repo_data["owner"]["login"],
-                name=repo_data["name"],
-                url=repo_data["url"],
-                is_private=repo_data["isPrivate"],
+            self._runtime.git.fetch(**shallow)
+            # cached, so later commands refresh it with a conditional request
+            repo_data = self._runtime.gh.repo_status(
+                f"{repo_target.owner}/{repo_target.name}"
             )
+            config = RepositoryConfig()
+            config.update_repository(repo_data)
 
             self._context.config_dir.mkdir(parents=True, exist_ok=True)
             with (self._context.config_dir / "config.json").open(
@@ -127,8 +182,7 @@ class InitCommand(Command):
             ) as f:
                 config.save(f)
 
-            self._add_templates(config)
-            self._add_hooks(config)
+            self._import_config(config, partial=filter_ is not None)
 
             self._runtime.hooks.fire(
                 Hook.post_init,
@@ -136,36 +190,78 @@ class InitCommand(Command):
                 project_dir,
             )
 
-    def _add_hooks(self, config):
-        """Checks whether the repo has hooks in the default branch and copies them"""
-        for hook in Hook:
-            # check to see if repo has a hook
-            if not any(self._runtime.git.ls_tree(config.default_branch, hook.git_path)):
-                continue
+    def _update_reference(
+        self, repo_target: RepositoryTarget, reference_cache: Optional[str]
+    ) -> Optional[str]:
+        """
+        Brings the repository's shared object cache up to date, if there's a cache directory
+        :return: The path of the cache's bare repository to clone with, if any
+        """
+        if reference_cache is None:
+            reference_cache = self._context.get_global_config().reference_cache
+        if not reference_cache:
+            return None
+
+        reference_dir = (
+            Path(reference_cache).expanduser().resolve()
+            / repo_target.host
+            / repo_target.owner
+            / f"{repo_target.name}.git"
+        )
+        # projects initialized at the same time, e.g. by CI agents, share the cache
+        with lock_file(reference_dir.with_name(f"{reference_dir.name}.lock")):
+            self._runtime.git.update_reference(repo_target.uri, reference_dir)
+        return str(reference_dir)
+
+    def _import_config(self, config, partial: bool = False):
+        """
+        Copies hooks and templates from the repo's default branch, using a single tree listing
+        and a single batched object read. A partial clone fetches the objects in one request
+        first, rather than one request per object as they're read.
+        """
+        hooks = {hook.git_path: hook for hook in Hook}
+        hook_dirs = {f"{hook.git_path}.d": hook for hook in Hook}
+        hook_entries = []
+        template_entries = []
 
-            # copy it
+        for entry in self._runtime.git.iter_tree(
+            config.default_branch, CONFIG_GIT_PATH
+        ):
+            if entry.type != "blob" or entry.mode not in FILE_MODES:
+                continue
+            hook_dir, _, script = entry.path.rpartition("/")
+            if entry.path in hooks:
+                hook_entries.append((hooks[entry.path], None, entry))
+            elif hook_dir in hook_dirs:
+                hook_entries.append((hook_dirs[hook_dir], script, entry))
+            elif entry.path.startswith(f"{TEMPLATES_GIT_PATH}/"):
+                template_entries.append(entry)
+
+        objects = [entry.object for _, _, entry in hook_entries]
+        objects.extend(entry.object for entry in template_entries)
+        if partial:
+            self._runtime.git.fetch_objects(objects)
+        contents = dict(self._runtime.git.cat_file_batch(objects))
+
+        self._add_templates(template_entries, contents)
+        self._add_hooks(hook_entries, contents)
+
+    def _add_hooks(self, hook_entries, contents):
+        """Copies the hooks found in the repo's default branch"""
+        for hook, script, entry in hook_entries:
             try:
-                with self._runtime.hooks.add(hook) as f:
-                    for line in self._runtime.git.cat_file(
-                        config.default_branch, hook.git_path
-                    ):
-                        f.write(f"{line}\n")
+                with self._runtime.hooks.add(hook, binary=True, script=script) as f:
+                    f.write(contents[entry.object])
             except HookExists as e:
                 print(f"{str(e)} Skipping")
 
-    def _add_templates(self, config):
-        """Checks whether the repo has templates in the default branch and copies them"""
-        # check to see if repo has templates
-        for template_ls in self._runtime.git.ls_tree(
-            config.default_branch, ".gh/worktree/templates"
-        ):
-            template_file = template_ls.split("\t")[1].strip('"')
-            # copy it
+    def _add_templates(self, template_entries, contents):
+        """Copies the templates found in the repo's default branch"""
+        for entry in template_entries:
             try:
-                with self._runtime.templates.add(template_file) as f:
-                    for line in self._runtime.git.cat_file(
-                        config.default_branch, template_file
-                    ):
-                        f.write(f"{line}\n")
+                with self._runtime.templates.add(
+                    entry.path, binary=True, mode=FILE_MODES[entry.mode]
+                ) as f:
+                    f.write(contents[entry.object])
             except TemplateExists as e:
                 print(f"{str(e)} Skipping")
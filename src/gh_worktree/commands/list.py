@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from gh_worktree.command import Command
+from gh_worktree.inventory import WorktreeEntry
+from gh_worktree.utils import print_table
+
+
+def _describe_branch(entry: WorktreeEntry) -> str:
+    if entry.git.branch:
+        branch = entry.git.branch
+    else:
+        branch = f"(detached at {(entry.git.head or '')[:7]})"
+    if entry.git.prunable:
+        return f"{branch} (prunable)"
+    if entry.git.locked:
+        return f"{branch} (locked)"
+    return branch
+
+
+class ListCommand(Command):
+    _name = "list"
+    _aliases = ["ls"]
+
+    def __call__(self):
+        """
+        List the worktrees in the current project.
+
+        The worktrees come from git, in a single `git worktree list` call, joined with what
+        `create` and `checkout` recorded about them in `.gh/worktree/worktrees.json`: the PR they
+        were checked out from, the ref they're based on, when they were created and how their
+        last hook finished. Worktrees added without gh-worktree have no recorded details.
+
+        Examples:
+            gh-worktree list
+            gh-worktree ls
+        """
+        self._context.assert_within_project()
+
+        entries = self._runtime.inventory.list(
+            self._runtime.get_worktrees(), self._runtime.jobs
+        )
+        if not entries:
+            print("No worktrees.")
+            return
+
+        rows = [("NAME", "BRANCH", "PR", "BASE", "CREATED", "HOOK")]
+        for entry in entries:
+            created = "-"
+            if entry.created_at is not None:
+                created = datetime.fromtimestamp(entry.created_at).strftime(
+                    "%Y-%m-%d %H:%M"
+                )
+            hook = "-"
+            if entry.hook is not None:
+                hook = f"{entry.hook} {entry.hook_status}"
+            rows.append(
+                (
+                    entry.name,
+                    _describe_branch(entry),
+                    f"#{entry.pr_number}" if entry.pr_number else "-",
+                    entry.base_ref or "-",
+                    created,
+                    hook,
+                )
+            )
+        print_table(rows)
@@ -1,32 +1,219 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Dict
+from typing import List
+from typing import Optional
+
 from gh_worktree.command import Command
+from gh_worktree.git import GitWorktree
 from gh_worktree.hooks import Hook
+from gh_worktree.inventory import WorktreeEntry
+
+DURATION_RE = re.compile(r"^(\d+)([mhdw])$")
+DURATION_UNITS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+GLOB_CHARS = set("*?[")
+
+
+def parse_duration(duration: str) -> int:
+    """Parses a duration like `90m`, `12h`, `14d` or `2w` into seconds"""
+    match = DURATION_RE.match(duration.strip())
+    if not match:
+        raise ValueError(
+            f"Invalid duration: {duration}. Use a number followed by m, h, d or w, e.g. 14d"
+        )
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def _select(patterns: List[str], worktrees: Dict[str, GitWorktree]) -> List[str]:
+    """Returns the names of the worktrees matching any of the names or glob patterns, in order"""
+    selected = {}
+    for pattern in patterns:
+        if not GLOB_CHARS.intersection(pattern):
+            if pattern not in worktrees:
+                raise ValueError(f"Worktree {pattern} does not exist")
+            selected[pattern] = True
+            continue
+
+        matches = [name for name in sorted(worktrees) if fnmatchcase(name, pattern)]
+        if not matches:
+            raise ValueError(f"No worktrees match {pattern}")
+        selected.update(dict.fromkeys(matches, True))
+    return list(selected)
 
 
 class RemoveCommand(Command):
-    """Remove a worktree from the current project"""
+    """Remove worktrees from the current project"""
 
     _name = "remove"
     _aliases = ["rm"]
 
-    def __call__(self, worktree_name: str, force: bool = False):
+    def __call__(
+        self,
+        *worktree_names: str,
+        force: bool = False,
+        merged: bool = False,
+        include_unchanged: bool = False,
+        pr_closed: bool = False,
+        older_than: Optional[str] = None,
+        offline: bool = False,
+    ):
         """
-        Remove a worktree from the current project that was added with `create` or `checkout`.
+        Remove worktrees from the current project that were added with `create` or `checkout`.
+
+        Worktrees may be named, or matched with glob patterns like `feature-*`. The filters
+        `--merged`, `--pr-closed` and `--older-than` narrow the named worktrees down, or select
+        from all worktrees when none are named. Combined filters must all match. Worktrees are
+        torn down concurrently, up to the global config's `remove_workers` at once, and the
+        outcome of each is reported once all have finished.
 
-        If git detects the worktree has commits that are unmerged, then it will refuse to delete it.
+        `--merged` never selects the default branch's worktree, nor a worktree whose branch has no
+        commits of its own yet, e.g. one just made with `create`, since git counts those as merged
+        too. Pass `--include-unchanged` to select the latter anyway.
+
+        If git detects a worktree has commits that are unmerged, then it will refuse to delete it.
         You may use `--force` to passthrough `--force` to git and force the worktree's deletion.
 
         Examples:
             gh-worktree remove testing-create
             gh-worktree remove testing-create --force
+            gh-worktree remove 'sprint-12-*' other-feature
+            gh-worktree remove --merged
+            gh-worktree remove --merged --include-unchanged
+            gh-worktree remove --pr-closed --older-than 14d
+            gh-worktree remove --pr-closed --offline
 
-        :param worktree_name: The name of the worktree to remove
-        :param force: Whether to force the removal of the worktree, if it's unmerged
+        :param worktree_names: The names, or glob patterns, of the worktrees to remove
+        :param force: Whether to force the removal of the worktrees, if they're unmerged
+        :param merged: Only remove worktrees whose branch is merged into the default branch
+        :param include_unchanged: With `--merged`, also remove worktrees whose branch has no
+            commits since it was created
+        :param pr_closed: Only remove worktrees checked out from a PR that's closed or merged
+        :param older_than: Only remove worktrees created longer ago than this, e.g. `14d`,
+            `2w` or `12h`
+        :param offline: Only use cached PR details for `--pr-closed`, without GitHub requests
         """
-        project_dir = self._context.project_dir
-        if not (project_dir / worktree_name).exists():
-            raise ValueError(f"Worktree {worktree_name} does not exist")
+        self._context.assert_within_project()
+        if offline:
+            self._runtime.gh.offline = True
+        has_filters = merged or pr_closed or older_than is not None
+        if not worktree_names and not has_filters:
+            raise ValueError("Specify the worktrees to remove, or a filter")
+        min_age = parse_duration(older_than) if older_than is not None else None
+
+        worktrees = self._runtime.get_worktrees()
+        names = (
+            _select(list(worktree_names), worktrees) if worktree_names else worktrees
+        )
+        entries = self._runtime.inventory.list(
+            {name: worktrees[name] for name in names}, self._runtime.jobs
+        )
+        if merged:
+            entries = self._filter_merged(entries, include_unchanged)
+        if pr_closed:
+            entries = self._filter_pr_closed(entries)
+        if min_age is not None:
+            entries = self._filter_older(entries, min_age)
+
+        if not entries:
+            print("No worktrees to remove.")
+            return
+
+        self._remove_all([entry.name for entry in entries], force)
+
+    def _filter_merged(
+        self, entries: List[WorktreeEntry], include_unchanged: bool
+    ) -> List[WorktreeEntry]:
+        default_branch = self._runtime.refresh_config().default_branch
+        remote = self._runtime.get_default_remote()
+        base_ref = f"{remote.name}/{default_branch}" if remote else default_branch
+        with self._context.use(self._context.project_dir):
+            merged_branches = self._runtime.git.merged_branches(base_ref)
+            base_commit = self._runtime.git.rev_parse(base_ref)
+        merged_branches.discard(default_branch)
+
+        merged = []
+        for entry in entries:
+            if entry.git.branch not in merged_branches:
+                continue
+            # without a recorded starting point, a branch at the default branch's tip is new
+            unchanged = entry.git.head == (entry.base_commit or base_commit)
+            if include_unchanged or not unchanged:
+                merged.append(entry)
+        return merged
+
+    def _filter_pr_closed(self, entries: List[WorktreeEntry]) -> List[WorktreeEntry]:
+        config = self._context.get_config()
+        entries = [entry for entry in entries if entry.pr_number]
+        if not entries:
+            return []
+
+        prs = self._runtime.gh.pr_statuses(
+            [entry.pr_number for entry in entries],
+            f"{config.owner}/{config.name}",
+            missing_ok=True,
+        )
+        closed = []
+        for entry in entries:
+            pr = prs.get(entry.pr_number)
+            if pr is None:
+                # e.g. deleted, or transferred to another repository
+                print(f"Skipping {entry.name}, couldn't find PR #{entry.pr_number}")
+            elif pr["state"] != "OPEN":
+                closed.append(entry)
+        return closed
+
+    @staticmethod
+    def _filter_older(
+        entries: List[WorktreeEntry], min_age: int
+    ) -> List[WorktreeEntry]:
+        now = time.time()
+        older = []
+        for entry in entries:
+            created_at = entry.created_at
+            if created_at is None:
+                # not created by gh-worktree, so go by when git linked the worktree
+                try:
+                    created_at = (entry.git.path / ".git").stat().st_mtime
+                except FileNotFoundError:
+                    print(f"Skipping {entry.name}, its directory no longer exists")
+                    continue
+            if now - created_at >= min_age:
+                older.append(entry)
+        return older
+
+    @property
+    def _workers(self) -> int:
+        return max(1, self._context.get_global_config().remove_workers)
+
+    def _remove_all(self, names: List[str], force: bool):
+        with self._context.use(self._context.project_dir):
+            with ThreadPoolExecutor(max_workers=self._workers) as executor:
+                errors = list(
+                    executor.map(lambda name: self._remove(name, force), names)
+                )
+
+        failures = 0
+        for name, error in zip(names, errors):
+            if error is None:
+                print(f"Removed {name}")
+            else:
+                failures += 1
+                print(f"Failed to remove {name}: {error}")
+        if failures:
+            raise RuntimeError(f"Failed to remove {failures} of {len(names)} worktrees")
 
-        with self._context.use(project_dir):
+    def _remove(self, worktree_name: str, force: bool) -> Optional[str]:
+        """Tears down one worktree, returning why it failed, if it did"""
+        try:
             self._runtime.hooks.fire(Hook.pre_remove, worktree_name)
             self._runtime.git.remove_worktree(worktree_name, force=force)
+            self._runtime.jobs.discard(worktree_name)
+            self._runtime.templates.discard_record(worktree_name)
+            self._runtime.inventory.discard(worktree_name)
             self._runtime.hooks.fire(Hook.post_remove, worktree_name)
+        except Exception as e:
+            # reported with the others, rather than aborting the whole batch
+            return str(e)
+        return None
@@ -0,0 +1,180 @@
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+from typing import Optional
+
+from gh_worktree.command import Command
+from gh_worktree.git import GitStatus
+from gh_worktree.inventory import WorktreeEntry
+from gh_worktree.jobs import HookJob
+from gh_worktree.utils import print_table
+
+# seconds between checks for new log output while following
+POLL_INTERVAL = 0.5
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}m {seconds:02d}s"
+
+
+def format_upstream(status: GitStatus) -> str:
+    if status.upstream is None:
+        return "-"
+    if not status.ahead and not status.behind:
+        return "up to date"
+    return f"+{status.ahead} -{status.behind}"
+
+
+def format_changes(status: GitStatus) -> str:
+    changes = [
+        f"{count} {kind}"
+        for kind, count in (
+            ("conflicted", status.conflicted),
+            ("staged", status.staged),
+            ("unstaged", status.unstaged),
+            ("untracked", status.untracked),
+        )
+        if count
+    ]
+    return ", ".join(changes) or "clean"
+
+
+def _dashboard_row(entry: WorktreeEntry, status: Optional[GitStatus]) -> tuple:
+    pr = f"#{entry.pr_number}" if entry.pr_number else "-"
+    hook = f"{entry.hook} {entry.hook_status}" if entry.hook else "-"
+    if status is None:
+        state = "missing" if entry.git.prunable else "unreadable"
+        return entry.name, entry.git.branch or "-", "-", state, pr, hook
+    return (
+        entry.name,
+        status.branch or f"(detached at {(entry.git.head or '')[:7]})",
+        format_upstream(status),
+        format_changes(status),
+        pr,
+        hook,
+    )
+
+
+class StatusCommand(Command):
+    _name = "status"
+
+    def __call__(
+        self,
+        worktree_name: Optional[str] = None,
+        follow: bool = False,
+        hooks: bool = False,
+    ):
+        """
+        Show the status of every worktree, or the hooks running in the background.
+
+        Without arguments, this reads every worktree's `git status` concurrently, up to the global
+        config's `status_workers` at once, and shows a table of each worktree's branch, how far
+        it's ahead of or behind its upstream, its uncommitted changes, the PR it was checked out
+        from and how its last hook finished.
+
+        Post hooks listed in the global config's `background_hooks` run detached from `create` and
+        `checkout`, and their output goes to `.gh/worktree/logs/<worktree>.log`. With `--hooks`,
+        this lists the background hooks of every worktree instead. Given a worktree, it lists the
+        worktree's background hooks followed by its log. With `--follow`, the worktree's log is
+        tailed until its hooks finish.
+
+        Examples:
+            gh-worktree status
+            gh-worktree status --hooks
+            gh-worktree status my-feature
+            gh-worktree status my-feature --follow
+
+        :param worktree_name: Optionally, the worktree to show the hooks and log of
+        :param follow: Whether to keep printing the worktree's log until its hooks finish
+        :param hooks: Whether to list the background hooks of every worktree
+        """
+        self._context.assert_within_project()
+        if follow and worktree_name is None:
+            raise ValueError("A worktree name is required to follow its log")
+        if worktree_name is None and not hooks:
+            self._print_dashboard()
+            return
+
+        jobs = self._runtime.jobs.list(worktree_name)
+        if not jobs:
+            target = f" for {worktree_name}" if worktree_name else ""
+            print(f"No background hooks have run{target}.")
+            return
+
+        self._print_jobs(jobs)
+        if worktree_name is None:
+            return
+
+        log_path = self._runtime.jobs.log_path(worktree_name)
+        print(f"\n==> {log_path} <==")
+        if follow:
+            self._follow(worktree_name, log_path)
+        elif log_path.exists():
+            sys.stdout.write(log_path.read_text(errors="replace"))
+
+    def _print_dashboard(self):
+        entries = self._runtime.inventory.list(
+            self._runtime.get_worktrees(), self._runtime.jobs
+        )
+        if not entries:
+            print("No worktrees.")
+            return
+
+        # prunable worktrees are missing, so git can't read them
+        readable = [entry for entry in entries if not entry.git.prunable]
+        statuses = dict(
+            zip(
+                [entry.name for entry in readable],
+                self._runtime.git.statuses(
+                    [entry.git.path for entry in readable],
+                    max_workers=self._context.get_global_config().status_workers,
+                ),
+            )
+        )
+
+        rows = [("NAME", "BRANCH", "UPSTREAM", "CHANGES", "PR", "HOOK")]
+        rows.extend(
+            _dashboard_row(entry, statuses.get(entry.name)) for entry in entries
+        )
+        print_table(rows)
+
+    @staticmethod
+    def _print_jobs(jobs: List[HookJob]):
+        rows = [("WORKTREE", "HOOK", "STATUS", "STARTED", "DURATION")]
+        now = time.time()
+        for job in jobs:
+            started_at = job.started_at or now
+            rows.append(
+                (
+                    job.worktree,
+                    job.hook,
+                    job.state,
+                    datetime.fromtimestamp(started_at).strftime("%Y-%m-%d %H:%M:%S"),
+                    format_duration((job.finished_at or now) - started_at),
+                )
+            )
+        print_table(rows)
+
+    def _follow(self, worktree_name: str, log_path: Path):
+        """Prints the log as it's written, until none of the worktree's jobs are running"""
+        position = 0
+        while True:
+            running = any(
+                job.state == "running" for job in self._runtime.jobs.list(worktree_name)
+            )
+            if log_path.exists():
+                with log_path.open("r", errors="replace") as f:
+                    f.seek(position)
+                    sys.stdout.write(f.read())
+                    sys.stdout.flush()
+                    position = f.tell()
+
+            if not running:
+                break
+            time.sleep(POLL_INTERVAL)
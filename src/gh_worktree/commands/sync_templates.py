@@ -0,0 +1,47 @@
+from gh_worktree.command import Command
+
+
+class SyncTemplatesCommand(Command):
+    _name = "sync-templates"
+
+    def __call__(self, *worktree_names: str, all_: bool = False):
+        """
+        Re-apply the project's templates to existing worktrees.
+
+        Templates are otherwise only copied when a worktree is created or checked out. This renders
+        them again for each worktree, and rewrites only the files whose content differs from the
+        rendered template, compared by hash. Worktrees are synced concurrently. Files in the
+        worktree that no longer have a template are left alone.
+
+        Examples:
+            gh-worktree sync-templates my-feature
+            gh-worktree sync-templates my-feature other-feature
+            gh-worktree sync-templates --all
+
+        :param worktree_names: The names of the worktrees to sync
+        :param all_: Whether to sync every worktree of the project
+        """
+        self._context.assert_within_project()
+        if all_ and worktree_names:
+            raise ValueError("Specify either worktree names or --all, not both")
+
+        if all_:
+            worktree_names = list(self._runtime.get_worktrees())
+        elif not worktree_names:
+            raise ValueError("Specify the worktrees to sync, or --all")
+
+        project_dir = self._context.project_dir
+        for worktree_name in worktree_names:
+            if not (project_dir / worktree_name).is_dir():
+                raise ValueError(f"Worktree {worktree_name} does not exist")
+
+        with self._context.use(project_dir):
+            synced = self._runtime.templates.sync(list(worktree_names))
+
+        for worktree_name, strategies in synced.items():
+            if not strategies:
+                print(f"{worktree_name}: up to date")
+                continue
+            print(f"{worktree_name}: updated {len(strategies)} files")
+            for relative_path in sorted(strategies):
+                print(f"  {relative_path}")
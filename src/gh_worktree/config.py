@@ -1,6 +1,15 @@
+import copy
+import io
 import json
+import threading
+from collections import Counter
+from pathlib import Path
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Type
+from typing import TypeVar
 
 
 class Config(object):
@@ -15,6 +24,17 @@ class Config(object):
     def save(self, fd):
         json.dump(self._data, fd, indent=4)
 
+    def dumps(self) -> str:
+        """Returns the content save writes"""
+        buffer = io.StringIO()
+        self.save(buffer)
+        return buffer.getvalue()
+
+    def copy(self):
+        config = type(self)()
+        config._data = copy.deepcopy(self._data)
+        return config
+
     @classmethod
     def load(cls, fd):
         config = cls()
@@ -36,6 +56,65 @@ class GlobalConfig(Config):
     def allowed_envvars(self) -> List[str]:
         return self._data.get("allowed_envvars", [])
 
+    @property
+    def parallel_hooks(self) -> List[str]:
+        """Names of hook stages whose global and project hooks may run concurrently"""
+        return self._data.get("parallel_hooks", [])
+
+    @property
+    def background_hooks(self) -> List[str]:
+        """Names of post hook stages that run detached, so the command needn't wait for them"""
+        return self._data.get("background_hooks", [])
+
+    @property
+    def reference_cache(self) -> Optional[str]:
+        """
+        A directory of shared object caches, one per upstream repository, that `init` clones
+        with, unless given `--reference-cache`
+        """
+        return self._data.get("reference_cache")
+
+    @property
+    def hook_workers(self) -> int:
+        """The maximum number of hook scripts to run at once"""
+        return self._data.get("hook_workers", 4)
+
+    @property
+    def checkout_workers(self) -> int:
+        """The maximum number of worktrees `checkout` sets up at once, when given several PRs"""
+        return self._data.get("checkout_workers", 4)
+
+    @property
+    def remove_workers(self) -> int:
+        """The maximum number of worktrees `remove` tears down at once"""
+        return self._data.get("remove_workers", 4)
+
+    @property
+    def cache_ttl(self) -> float:
+        """
+        Seconds a cached GitHub response is used before it's revalidated. 0 revalidates on
+        every lookup.
+        """
+        return self._data.get("cache_ttl", 300)
+
+    @property
+    def status_workers(self) -> int:
+        """The maximum number of worktrees `status` reads at once"""
+        return self._data.get("status_workers", 8)
+
+    @property
+    def template_strategy(self) -> str:
+        """
+        How template files needing no substitution are materialized: `reflink` (default) and
+        `hardlink`, each falling back to `copy`
+        """
+        return self._data.get("template_strategy", "reflink")
+
+    @property
+    def template_workers(self) -> int:
+        """The maximum number of template files to copy at once"""
+        return self._data.get("template_workers", 8)
+
     def allow_hook(self, path: str, checksum: str):
         hooks = self.allowed_hooks.copy()
         hooks[path] = checksum
@@ -64,3 +143,107 @@ class RepositoryConfig(Config):
     @property
     def is_private(self) -> bool:
         return self._data.get("is_private", False)
+
+    def update_repository(self, repo_data: dict) -> bool:
+        """
+        Sets the repository's details from a `repo_status` lookup
+        :return: Whether any of them changed
+        """
+        details = dict(
+            default_branch=repo_data["defaultBranchRef"]["name"],
+            owner=repo_data["owner"]["login"],
+            name=repo_data["name"],
+            url=repo_data["url"],
+            is_private=repo_data["isPrivate"],
+        )
+        changed = any(self._data.get(key) != value for key, value in details.items())
+        self.update(**details)
+        return changed
+
+    @property
+    def sparse_profiles(self) -> Dict[str, List[str]]:
+        """
+        Named sets of directories, e.g. `{"frontend": ["web", "shared/ui"]}`, that `create` and
+        `checkout` check out with `--sparse`, in sparse-checkout's cone mode
+        """
+        return self._data.get("sparse_profiles", {})
+
+    def sparse_cones(self, profile: str) -> List[str]:
+        """Returns the directories of a sparse profile"""
+        cones = self.sparse_profiles.get(profile)
+        if cones is None:
+            known = ", ".join(sorted(self.sparse_profiles)) or "none"
+            raise ValueError(
+                f"Unknown sparse profile {profile}. Profiles in the project config: {known}"
+            )
+        return cones
+
+
+ConfigT = TypeVar("ConfigT", bound=Config)
+
+
+class ConfigCache(object):
+    """
+    Per-process cache of parsed config files. Entries are validated against the file's
+    modification time and size, so changes made by other processes are picked up.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[Tuple[int, int], Config]] = {}
+        self._parse_counts = Counter()
+        # commands read config from thread pools, e.g. checking out several PRs at once
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(file_path: Path) -> Tuple[int, int]:
+        stat = file_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, config_cls: Type[ConfigT], file_path: Path) -> ConfigT:
+        """
+        Returns the config parsed from file_path, or an empty config if it doesn't exist
+        :param config_cls: The type of config to load
+        :param file_path: The path to the config file
+        :return: A copy of the cached config, which is safe to modify
+        """
+        with self._lock:
+            try:
+                signature = self._signature(file_path)
+            except FileNotFoundError:
+                self._entries.pop(file_path, None)
+                return config_cls()
+
+            entry = self._entries.get(file_path)
+            if (
+                entry is None
+                or entry[0] != signature
+                or type(entry[1]) is not config_cls
+            ):
+                with file_path.open("r", encoding="utf-8") as f:
+                    config = config_cls.load(f)
+                self._parse_counts[file_path] += 1
+                entry = self._entries[file_path] = (signature, config)
+
+            return entry[1].copy()
+
+    def save(self, config: Config, file_path: Path):
+        """Writes config to file_path, and caches it so it needn't be parsed again"""
+        with self._lock:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            with file_path.open("w", encoding="utf-8") as f:
+                config.save(f)
+            self._entries[file_path] = (self._signature(file_path), config.copy())
+
+    def parse_count(self, file_path: Path) -> int:
+        """The number of times file_path has been read and parsed by this cache"""
+        with self._lock:
+            return self._parse_counts[file_path]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._parse_counts.clear()
+
+
+# shared by every `Context` in the process
+config_cache = ConfigCache()
@@ -1,23 +1,75 @@
 import os
+from collections import namedtuple
 from contextlib import contextmanager
-from functools import cached_property
 from pathlib import Path
+from typing import Dict
 from typing import Union
 
 from gh_worktree.config import Config
+from gh_worktree.config import config_cache
 from gh_worktree.config import GlobalConfig
 from gh_worktree.config import RepositoryConfig
-from gh_worktree.utils import find_up
+
+
+ProjectPaths = namedtuple("ProjectPaths", ["project_dir", "global_config_dir"])
+
+
+def resolve_paths(cwd: Union[str, Path]) -> ProjectPaths:
+    """
+    Finds the project directory and the global config directory in a single upward walk. The
+    project directory is the closest ancestor containing `.bare`. The global config directory is
+    the `.gh/worktree` of the closest ancestor above the project directory (or above cwd, outside
+    a project) containing `.gh`, defaulting to `~/.gh/worktree`.
+
+    :param cwd: The directory to start from
+    :return: The paths, with project_dir set to None when outside a project
+    """
+    start_path = Path(cwd).resolve()
+    project_dir = None
+    # `.gh` directories found before the project directory, which are only global outside one
+    gh_dirs = []
+
+    for search_path in [start_path, *start_path.parents]:
+        if project_dir is None and (search_path / ".bare").exists():
+            project_dir = search_path
+            continue
+
+        if search_path == start_path or not (search_path / ".gh").exists():
+            continue
+        if project_dir is not None:
+            return ProjectPaths(project_dir, search_path / ".gh" / "worktree")
+        gh_dirs.append(search_path)
+
+    if project_dir is None and gh_dirs:
+        return ProjectPaths(None, gh_dirs[0] / ".gh" / "worktree")
+    return ProjectPaths(project_dir, Path.home() / ".gh" / "worktree")
 
 
 class Context(object):
     def __init__(self):
         self.cwd = Path.cwd()
+        self._paths: Dict[Path, ProjectPaths] = {}
+
+    @property
+    def paths(self) -> ProjectPaths:
+        """The project and global config paths for the current working directory"""
+        paths = self._paths.get(self.cwd)
+        if paths is None:
+            paths = resolve_paths(self.cwd)
+            # outside a project, don't cache, as commands like `init` create one
+            if paths.project_dir is not None:
+                self._paths[self.cwd] = paths
+        return paths
+
+    def invalidate_paths(self):
+        self._paths.clear()
 
-    @cached_property
+    @property
     def project_dir(self) -> Path:
-        git_bare_dir = find_up(".bare", self.cwd)
-        return git_bare_dir.parent
+        project_dir = self.paths.project_dir
+        if project_dir is None:
+            raise RuntimeError(f"Could not find .bare in {self.cwd} ancestors")
+        return project_dir
 
     @property
     def config_dir(self) -> Path:
@@ -25,17 +77,7 @@ class Context(object):
 
     @property
     def global_config_dir(self) -> Path:
-        try:
-            parent_dir = self.project_dir.parent
-        except RuntimeError:
-            parent_dir = self.cwd.parent
-
-        try:
-            closest_gh_dir = find_up(".gh", parent_dir)
-            return closest_gh_dir / "worktree"
-        except RuntimeError:
-            # default to ~/.gh/worktree
-            return Path.home() / ".gh" / "worktree"
+        return self.paths.global_config_dir
 
     @contextmanager
     def use(self, cwd: Union[str, Path]):
@@ -48,28 +90,18 @@ class Context(object):
         finally:
             os.chdir(old_cwd)
             self.cwd = old_cwd
+            # the block may have changed the project layout, e.g. `init`
+            self.invalidate_paths()
 
     def assert_within_project(self):
-        try:
-            find_up(".bare", self.cwd)
-        except RuntimeError:
+        if self.paths.project_dir is None:
             raise AssertionError("Project not found")
 
     def get_config(self) -> RepositoryConfig:
-        file_path = self.config_dir / "config.json"
-        if not file_path.exists():
-            return RepositoryConfig()
-
-        with file_path.open("r", encoding="utf-8") as f:
-            return RepositoryConfig.load(f)
-
-    def get_global_config(self):
-        file_path = self.global_config_dir / "config.json"
-        if not file_path.exists():
-            return GlobalConfig()
+        return config_cache.load(RepositoryConfig, self.config_dir / "config.json")
 
-        with file_path.open("r", encoding="utf-8") as f:
-            return GlobalConfig.load(f)
+    def get_global_config(self) -> GlobalConfig:
+        return config_cache.load(GlobalConfig, self.global_config_dir / "config.json")
 
     def set_config(self, config: Config):
         if isinstance(config, RepositoryConfig):
@@ -79,6 +111,4 @@ class Context(object):
         else:
             raise ValueError(f"Unknown config type: {type(config)}")
 
-        config_dir.mkdir(parents=True, exist_ok=True)
-        with (config_dir / "config.json").open("w", encoding="utf-8") as f:
-            config.save(f)
+        config_cache.save(config, config_dir / "config.json")
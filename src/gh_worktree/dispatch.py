@@ -0,0 +1,382 @@
+import sys
+from collections import namedtuple
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+
+from gh_worktree.command import Command
+
+# from CPython's `Include/cpython/code.h`, to avoid importing `inspect` on every invocation
+CO_VARARGS = 0x04
+
+_EMPTY = object()
+
+Parameter = namedtuple("Parameter", ["name", "default", "is_varargs"])
+DocString = namedtuple("DocString", ["summary", "description", "params"])
+
+
+class DispatchError(Exception):
+    pass
+
+
+def get_parameters(func: Callable) -> List[Parameter]:
+    """
+    Reads the parameters of a function, or bound method, from its code object
+    :param func: The function to read
+    :return: The parameters, in order, excluding `self`
+    """
+    fn = getattr(func, "__func__", func)
+    code = fn.__code__
+    names = code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+    positional_defaults = fn.__defaults__ or ()
+    keyword_defaults = fn.__kwdefaults__ or {}
+    first_default = code.co_argcount - len(positional_defaults)
+
+    parameters = []
+    for i, name in enumerate(names):
+        if i < code.co_argcount:
+            default = (
+                positional_defaults[i - first_default] if i >= first_default else _EMPTY
+            )
+        else:
+            default = keyword_defaults.get(name, _EMPTY)
+        parameters.append(Parameter(name, default, False))
+
+    if code.co_flags & CO_VARARGS:
+        varargs_name = code.co_varnames[len(names)]
+        # keyword-only parameters follow varargs
+        parameters.insert(code.co_argcount, Parameter(varargs_name, (), True))
+
+    if hasattr(func, "__self__"):
+        parameters.pop(0)
+    return parameters
+
+
+def _dedent(lines: List[str]) -> List[str]:
+    indents = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+    margin = min(indents, default=0)
+    return [line[margin:].rstrip() for line in lines]
+
+
+def _indent(text: str) -> List[str]:
+    return [f"    {line}" if line else line for line in text.splitlines()]
+
+
+def parse_docstring(doc: Optional[str]) -> DocString:
+    """
+    Splits a reST style docstring into its summary, description and `:param` descriptions
+    """
+    lines = (doc or "").expandtabs().strip("\n").splitlines()
+    if not lines:
+        return DocString("", "", {})
+
+    lines = [lines[0].strip()] + _dedent(lines[1:])
+    while lines and not lines[0]:
+        lines.pop(0)
+
+    # the summary is the first paragraph
+    summary = []
+    while lines and lines[0] and not lines[0].startswith(":"):
+        summary.append(lines.pop(0).strip())
+
+    description = []
+    params = {}
+    param_name = None
+    for line in lines:
+        if line.startswith(":param "):
+            name, _, text = line.split(" ", 1)[1].partition(":")
+            param_name = name.strip()
+            params[param_name] = text.strip()
+        elif param_name and line.startswith(" "):
+            # an indented line continues the param's description
+            params[param_name] = f"{params[param_name]} {line.strip()}"
+        elif not line.startswith(":"):
+            param_name = None
+            description.append(line)
+
+    return DocString(" ".join(summary), "\n".join(description).strip("\n"), params)
+
+
+def _flag_name(name: str) -> str:
+    # a trailing underscore only keeps a parameter from shadowing a builtin, e.g. `all_`
+    return name.rstrip("_").replace("_", "-")
+
+
+def _command_name(name: str) -> str:
+    # like flags, e.g. the `list` command is the `list_` attribute
+    return name.rstrip("_").replace("_", "-")
+
+
+def _lookup_param(name: str, by_name: Dict[str, Parameter]) -> Optional[str]:
+    for candidate in (name, f"{name}_"):
+        if candidate in by_name:
+            return candidate
+    return None
+
+
+def _parse_bool(name: str, value: str) -> bool:
+    if value.lower() in ("true", "yes", "1"):
+        return True
+    if value.lower() in ("false", "no", "0"):
+        return False
+    raise DispatchError(f"Flag --{_flag_name(name)} expects a boolean, got: {value}")
+
+
+def _resolve_flag(arg: str, by_name: Dict[str, Parameter]) -> Tuple[str, bool]:
+    """
+    :return: A tuple of the parameter name the flag refers to, and whether it's negated
+    """
+    flag = arg.lstrip("-").partition("=")[0]
+    name = flag.replace("-", "_")
+
+    if not arg.startswith("--") and len(flag) == 1:
+        matches = [p for p in by_name if p.startswith(flag)]
+        if len(matches) != 1:
+            raise DispatchError(f"Unknown flag: {arg}")
+        return matches[0], False
+
+    param_name = _lookup_param(name, by_name)
+    if param_name is not None:
+        return param_name, False
+    param_name = _lookup_param(name[2:], by_name) if name.startswith("no") else None
+    if param_name is not None and isinstance(by_name[param_name].default, bool):
+        if "=" not in arg:
+            return param_name, True
+    raise DispatchError(f"Unknown flag: {arg}")
+
+
+def _parse_flags(
+    parameters: List[Parameter], args: List[str]
+) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Separates flags from positional arguments
+    :return: A tuple of the positional arguments, and a map of parameter name to flag value
+    """
+    by_name = {p.name: p for p in parameters if not p.is_varargs}
+    keywords = {}
+    positionals = []
+    remaining = list(args)
+    while remaining:
+        arg = remaining.pop(0)
+        if arg == "--":
+            positionals.extend(remaining)
+            break
+
+        if not arg.startswith("-") or arg == "-" or arg[1:2].isdigit():
+            positionals.append(arg)
+            continue
+
+        name, negated = _resolve_flag(arg, by_name)
+        if name in keywords:
+            raise DispatchError(f"Flag --{_flag_name(name)} was given more than once")
+
+        _, has_value, value = arg.partition("=")
+        is_switch = isinstance(by_name[name].default, bool)
+        if negated:
+            keywords[name] = False
+        elif has_value:
+            keywords[name] = _parse_bool(name, value) if is_switch else value
+        elif is_switch:
+            keywords[name] = True
+        elif remaining:
+            keywords[name] = remaining.pop(0)
+        else:
+            raise DispatchError(f"Flag --{_flag_name(name)} expects a value")
+
+    return positionals, keywords
+
+
+def parse_args(
+    parameters: List[Parameter], args: List[str]
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Maps command line arguments onto parameters, following the conventions the CLI has always
+    had: positional arguments fill parameters in order, extra positionals go to varargs, and any
+    parameter may be passed as `--name value` or `--name=value`. Parameters defaulting to a bool
+    are switches: `--name` and `--noname`. Unambiguous first letters work as short flags, e.g.
+    `-f` for `--force`. A trailing underscore is dropped from the flag, so `all_` is `--all`.
+
+    :param parameters: The parameters of the function being called
+    :param args: The command line arguments following the command name
+    :return: A tuple of positional and keyword arguments to call the function with
+    """
+    positionals, keywords = _parse_flags(parameters, args)
+
+    call_args = []
+    filled = set(keywords)
+    for p in parameters:
+        if p.is_varargs:
+            call_args.extend(positionals)
+            positionals = []
+            break
+        if p.name in keywords or not positionals:
+            # once a parameter is passed as a flag, the rest must be too
+            break
+        call_args.append(positionals.pop(0))
+        filled.add(p.name)
+
+    if positionals:
+        raise DispatchError(f"Unexpected arguments: {' '.join(positionals)}")
+
+    for p in parameters:
+        if not p.is_varargs and p.default is _EMPTY and p.name not in filled:
+            raise DispatchError(f"Missing required argument: {p.name}")
+
+    return call_args, keywords
+
+
+class Dispatcher(object):
+    """
+    Routes command line arguments to the commands of a command group, which are its public
+    attributes
+    """
+
+    def __init__(self, name: str, group: object, out: Optional[TextIO] = None):
+        self.name = name
+        self.group = group
+        self.out = out or sys.stdout
+
+    @property
+    def command_names(self) -> List[str]:
+        """
+        :return: The names of the commands, as typed on the command line
+        """
+        return [_command_name(name) for name in self._attribute_names]
+
+    @property
+    def _attribute_names(self) -> List[str]:
+        names = []
+        for name in dir(type(self.group)):
+            # methods and lazily loaded commands are both descriptors
+            if not name.startswith("_") and hasattr(
+                getattr(type(self.group), name), "__get__"
+            ):
+                names.append(name)
+        return names
+
+    def _get_function(self, name: str) -> Callable:
+        command = getattr(self.group, name)
+        return command.__call__ if isinstance(command, Command) else command
+
+    def _resolve(self, name: str) -> Optional[Callable]:
+        attribute_names = {_command_name(n): n for n in self._attribute_names}
+        attribute_name = attribute_names.get(_command_name(name))
+        if attribute_name is None:
+            return None
+        return self._get_function(attribute_name)
+
+    def _synopsis(self, name: str, parameters: List[Parameter]) -> str:
+        parts = [self.name, name]
+        has_flags = False
+        for p in parameters:
+            if p.is_varargs:
+                parts.append(f"[{p.name.upper()}]...")
+            elif p.default is _EMPTY:
+                parts.append(p.name.upper())
+            else:
+                has_flags = True
+        if has_flags:
+            parts.append("<flags>")
+        return " ".join(parts)
+
+    def print_group_help(self):
+        doc = parse_docstring(type(self.group).__doc__)
+        lines = ["NAME", f"    {self.name} - {doc.summary}", ""]
+        lines.extend(["SYNOPSIS", f"    {self.name} COMMAND", ""])
+        if doc.description:
+            lines.append("DESCRIPTION")
+            lines.extend(_indent(doc.description))
+            lines.append("")
+
+        lines.extend(["COMMANDS", "    COMMAND is one of the following:", ""])
+        for name in self._attribute_names:
+            command = getattr(self.group, name)
+            summary = parse_docstring(self._get_function(name).__doc__)
+            title = _command_name(name)
+            if isinstance(command, Command) and title in command._aliases:
+                title = f"{title} (alias of {command._name})"
+            lines.append(f"     {title}")
+            lines.append(f"       {summary.summary}")
+            lines.append("")
+        print("\n".join(lines).rstrip("\n"), file=self.out)
+
+    def print_command_help(self, name: str, func: Callable):
+        doc = parse_docstring(func.__doc__)
+        parameters = get_parameters(func)
+
+        lines = ["NAME", f"    {self.name} {name} - {doc.summary}", ""]
+        lines.extend(["SYNOPSIS", f"    {self._synopsis(name, parameters)}", ""])
+        if doc.description:
+            lines.append("DESCRIPTION")
+            lines.extend(_indent(doc.description))
+            lines.append("")
+
+        positionals = [p for p in parameters if p.default is _EMPTY or p.is_varargs]
+        flags = [p for p in parameters if p not in positionals]
+        if positionals:
+            lines.append("POSITIONAL ARGUMENTS")
+            for p in positionals:
+                lines.append(f"    {p.name.upper()}")
+                if p.name in doc.params:
+                    lines.append(f"        {doc.params[p.name]}")
+            lines.append("")
+        if flags:
+            lines.append("FLAGS")
+            for p in flags:
+                flag = f"--{_flag_name(p.name)}"
+                if not isinstance(p.default, bool):
+                    flag += f"={p.name.rstrip('_').upper()}"
+                lines.append(f"    {flag}")
+                lines.append(f"        Default: {p.default}")
+                if p.name in doc.params:
+                    lines.append(f"        {doc.params[p.name]}")
+            lines.append("")
+        print("\n".join(lines).rstrip("\n"), file=self.out)
+
+    def _usage_error(self, error: DispatchError, name: Optional[str] = None) -> int:
+        print(f"ERROR: {error}", file=sys.stderr)
+        if name is None:
+            print(f"Usage: {self.name} <command>", file=sys.stderr)
+            print(
+                f"  available commands: {' | '.join(self.command_names)}",
+                file=sys.stderr,
+            )
+        else:
+            print("For detailed information on this command, run:", file=sys.stderr)
+            print(f"  {self.name} {name} --help", file=sys.stderr)
+        return 2
+
+    def __call__(self, argv: List[str]) -> int:
+        """
+        Dispatches the command line arguments, excluding the program name
+        :return: The exit status
+        """
+        if not argv or argv[0] in ("-h", "--help"):
+            self.print_group_help()
+            return 0
+
+        name, args = argv[0], argv[1:]
+        func = self._resolve(name)
+        if func is None:
+            return self._usage_error(DispatchError(f"Unknown command: {name}"))
+        name = _command_name(name)
+
+        if "--" in args:
+            flag_args = args[: args.index("--")]
+        else:
+            flag_args = args
+        if "-h" in flag_args or "--help" in flag_args:
+            self.print_command_help(name, func)
+            return 0
+
+        try:
+            call_args, call_kwargs = parse_args(get_parameters(func), args)
+        except DispatchError as e:
+            return self._usage_error(e, name)
+
+        func(*call_args, **call_kwargs)
+        return 0
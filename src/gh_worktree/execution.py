@@ -0,0 +1,209 @@
+import asyncio
+import shlex
+import subprocess
+import sys
+from collections import namedtuple
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from gh_worktree.utils import _log_prefix
+from gh_worktree.utils import COLOR_RESET
+from gh_worktree.utils import COLORS
+
+# the most bytes of each stream kept by a request, the rest is read and dropped
+CAPTURE_LIMIT = 1024 * 1024
+# how much is read from a pipe at once
+CHUNK_SIZE = 64 * 1024
+
+# a command to run. Streamed commands print each line of their output, stderr included, prefixed
+# with the command in colour, like `stream_exec`. The others run quietly.
+ExecRequest = namedtuple(
+    "ExecRequest", ["command", "cwd", "stream", "input"], defaults=(None, False, None)
+)
+
+
+class ExecResult(
+    namedtuple("ExecResult", ["command", "returncode", "output", "errors", "truncated"])
+):
+    """
+    The outcome of a command. Output and errors are bytes, bounded by the capture limit, and
+    truncated is whether either lost bytes past it. Streamed commands have no errors, as
+    stderr is part of their output.
+    """
+
+    def check_returncode(self):
+        if self.returncode:
+            raise subprocess.CalledProcessError(
+                self.returncode, self.command, self.output, self.errors
+            )
+
+
+async def _read(
+    stream: asyncio.StreamReader, limit: int, prefix: Optional[str] = None
+) -> Tuple[bytes, bool]:
+    """
+    Reads a pipe until it's closed, keeping at most limit bytes, so it never fills up and
+    blocks the process. With a prefix, each line is printed as it arrives.
+    :return: The bytes kept, and whether any were dropped
+    """
+    chunks = []
+    size = 0
+    truncated = False
+    pending = b""
+    while True:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+
+        keep = max(0, min(len(chunk), limit - size))
+        if keep:
+            chunks.append(chunk[:keep])
+            size += keep
+        truncated = truncated or keep < len(chunk)
+
+        if prefix is not None:
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                _print_line(prefix, line)
+            if len(pending) > limit:
+                # a line too long to hold is printed in parts
+                _print_line(prefix, pending)
+                pending = b""
+
+    if prefix is not None and pending:
+        _print_line(prefix, pending)
+    return b"".join(chunks), truncated
+
+
+async def _write(stream: asyncio.StreamWriter, data: bytes):
+    try:
+        stream.write(data)
+        await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        # the process exited without reading all of it, which its exit status reflects
+        pass
+    stream.close()
+
+
+def _print_line(prefix: str, line: bytes):
+    text = line.decode("utf-8", errors="replace").rstrip("\r")
+    print(f"{prefix} {text}", flush=True)
+
+
+async def _kill(process: asyncio.subprocess.Process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await process.wait()
+
+
+async def run_async(
+    request: ExecRequest,
+    limiter: Optional[asyncio.Semaphore] = None,
+    timeout: Optional[float] = 60,
+    capture_limit: int = CAPTURE_LIMIT,
+) -> ExecResult:
+    """
+    Runs a command once the limiter has a slot free. The process is killed when it runs longer
+    than timeout, or when the awaiting task is cancelled.
+    :param request: The command to run
+    :param limiter: Optionally, a semaphore bounding how many commands run at once
+    :param timeout: The number of seconds the process may run, or None to wait indefinitely
+    :param capture_limit: The most bytes of output, and of errors, to keep
+    :return: The result, whether the command succeeded or not
+    :raises subprocess.TimeoutExpired: When the process ran for longer than timeout
+    """
+    if limiter is None:
+        limiter = asyncio.Semaphore(1)
+
+    async with limiter:
+        process = await asyncio.create_subprocess_exec(
+            *request.command,
+            stdin=subprocess.PIPE if request.input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if request.stream else subprocess.PIPE,
+            cwd=request.cwd,
+        )
+        prefix = None
+        if request.stream:
+            output_color = COLORS[process.pid % len(COLORS)]
+            print(
+                f"Executing: {output_color}{shlex.join(request.command)}{COLOR_RESET}"
+            )
+            prefix = (
+                f"{output_color}{_log_prefix(list(request.command))} |{COLOR_RESET}"
+            )
+
+        try:
+            return await asyncio.wait_for(
+                _communicate(process, request, prefix, capture_limit), timeout
+            )
+        except asyncio.TimeoutError:
+            await _kill(process)
+            raise subprocess.TimeoutExpired(request.command, timeout)
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+
+
+async def _communicate(
+    process: asyncio.subprocess.Process,
+    request: ExecRequest,
+    prefix: Optional[str],
+    capture_limit: int,
+) -> ExecResult:
+    readers = [_read(process.stdout, capture_limit, prefix)]
+    if process.stderr is not None:
+        readers.append(_read(process.stderr, capture_limit))
+    if request.input is not None:
+        # written while reading, as the process may not read all of it before writing output
+        readers.append(_write(process.stdin, request.input))
+    streams = await asyncio.gather(*readers)
+    returncode = await process.wait()
+
+    output, truncated = streams[0]
+    errors = b""
+    if process.stderr is not None:
+        errors, errors_truncated = streams[1]
+        truncated = truncated or errors_truncated
+    return ExecResult(list(request.command), returncode, output, errors, truncated)
+
+
+def run_all(
+    requests: Iterable[ExecRequest],
+    max_workers: int = 4,
+    timeout: Optional[float] = 60,
+    capture_limit: int = CAPTURE_LIMIT,
+) -> List[ExecResult]:
+    """
+    Runs many commands on an event loop, up to max_workers at once, and waits for all of them.
+    When one fails to start or times out, the others are killed and the error is raised.
+    :param requests: The commands to run
+    :param max_workers: The maximum number of processes to run at once
+    :param timeout: The number of seconds each process may run, or None to wait indefinitely
+    :param capture_limit: The most bytes of each command's output, and of its errors, to keep
+    :return: The results, in the order of the requests
+    """
+    requests = list(requests)
+    if not requests:
+        return []
+
+    async def gather() -> List[ExecResult]:
+        limiter = asyncio.Semaphore(max(1, max_workers))
+        return list(
+            await asyncio.gather(
+                *(
+                    run_async(request, limiter, timeout, capture_limit)
+                    for request in requests
+                )
+            )
+        )
+
+    # asyncio.run cancels the requests still running when one raises, which kills them
+    results = asyncio.run(gather())
+    sys.stdout.flush()
+    return results
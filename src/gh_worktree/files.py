@@ -0,0 +1,321 @@
+import codecs
+import errno
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from string import Template
+from typing import AnyStr
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+
+# the amount of a file read, scanned or substituted at once
+CHUNK_SIZE = 1024 * 1024
+
+# the start of anything `string.Template` would substitute: `$$`, `$name` or `${name}`
+PLACEHOLDER_RE = re.compile(rb"\$(?:\$|\{?[_a-z])", re.IGNORECASE)
+# the placeholders `string.Template` substitutes, capturing variable names
+IDENTIFIER_RE = re.compile(
+    rb"\$(?:\$|(?P<named>[_a-z][_a-z0-9]*)|\{(?P<braced>[_a-z][_a-z0-9]*)\})",
+    re.IGNORECASE,
+)
+# the longest variable name held back between chunks. Longer names are split, as no variable
+# is named like that.
+NAME_LIMIT = 256
+# what may follow the `$` of a placeholder which the next chunk could still change
+UNDECIDED_RE = re.compile(r"\{?(?:[_a-z][_a-z0-9]*)?", re.IGNORECASE | re.ASCII)
+UNDECIDED_BYTES_RE = re.compile(rb"\{?(?:[_a-z][_a-z0-9]*)?", re.IGNORECASE)
+
+# errors meaning a kernel-side copy isn't supported between the two files
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+# errors meaning a reflink or hardlink isn't possible between the two files
+UNLINKABLE_ERRNOS = UNSUPPORTED_ERRNOS | {errno.ENOTTY, errno.EPERM, errno.EMLINK}
+
+# from Linux's `include/uapi/linux/fs.h`: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# how files that need no substitution may be materialized, each falling back to the next
+STRATEGY_FALLBACKS = {
+    "hardlink": ("hardlink", "reflink", "copy"),
+    "reflink": ("reflink", "copy"),
+    "copy": ("copy",),
+}
+
+
+TemplateInfo = namedtuple("TemplateInfo", ["hash", "variables", "static"])
+
+
+def scan_template(path: Path) -> TemplateInfo:
+    """
+    Reads a file in chunks to hash its content and find the variables it references
+    :param path: The file to scan
+    :return: The file's sha256 hex digest, the sorted names of the variables it references, and
+        whether it's static, i.e. binary or without placeholders, so it needn't be substituted
+    """
+    digest = hashlib.sha256()
+    variables = set()
+    has_placeholders = False
+    is_binary = False
+    pending = b""
+
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            digest.update(chunk)
+            is_binary = is_binary or b"\0" in chunk
+            if not is_binary:
+                # only the undecided tail of the previous chunk is carried over, a few bytes
+                scanned = pending + chunk if pending else chunk
+                split_at = _safe_split(scanned) if chunk else len(scanned)
+                for match in IDENTIFIER_RE.finditer(scanned, 0, split_at):
+                    has_placeholders = True
+                    name = match.group("named") or match.group("braced")
+                    if name:
+                        variables.add(name.decode("ascii"))
+                pending = scanned[split_at:]
+            if not chunk:
+                break
+
+    if is_binary:
+        return TemplateInfo(digest.hexdigest(), [], True)
+    return TemplateInfo(digest.hexdigest(), sorted(variables), not has_placeholders)
+
+
+def is_template(path: Path) -> bool:
+    """
+    Scans a file for `string.Template` placeholders, without decoding it. Files containing a NUL
+    byte are considered binary and never templates.
+    :param path: The file to scan
+    :return: Whether the file needs substitution when copied
+    """
+    with path.open("rb") as f:
+        # a placeholder may be split across chunks, so the last bytes are kept for the next scan
+        previous = b""
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return False
+            if b"\0" in chunk:
+                return False
+            if PLACEHOLDER_RE.search(previous + chunk):
+                return True
+            previous = chunk[-2:]
+
+
+def _copy_file_range(src: BinaryIO, dest: BinaryIO) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    while os.copy_file_range(src.fileno(), dest.fileno(), CHUNK_SIZE * 64):
+        pass
+    return True
+
+
+def _sendfile(src: BinaryIO, dest: BinaryIO) -> bool:
+    if not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    while True:
+        sent = os.sendfile(dest.fileno(), src.fileno(), offset, CHUNK_SIZE * 64)
+        if not sent:
+            return True
+        offset += sent
+
+
+def copy_file(src_path: Path, dest_path: Path):
+    """
+    Copies a file's content, letting the kernel move the data when possible. Falls back from
+    `copy_file_range` to `sendfile` to a buffered copy, depending on platform and filesystem
+    support.
+    :param src_path: The file to copy
+    :param dest_path: The file to create or overwrite
+    """
+    with src_path.open("rb") as src, dest_path.open("wb") as dest:
+        for kernel_copy in (_copy_file_range, _sendfile):
+            try:
+                if kernel_copy(src, dest):
+                    return
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+            # start over, in case part of the file was copied before failing
+            src.seek(0)
+            dest.seek(0)
+            dest.truncate()
+
+        shutil.copyfileobj(src, dest, CHUNK_SIZE)
+
+
+def reflink_file(src_path: Path, dest_path: Path):
+    """
+    Clones a file with the `FICLONE` ioctl, so the copy shares the original's data until either
+    is modified. Supported by btrfs, XFS and other copy-on-write filesystems on Linux.
+    :raises OSError: When the platform or filesystem doesn't support it
+    """
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.ENOSYS, "Reflinks aren't supported on this platform")
+
+    with src_path.open("rb") as src, dest_path.open("wb") as dest:
+        fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+
+
+def materialize_file(src_path: Path, dest_path: Path, strategy: str = "copy") -> str:
+    """
+    Creates dest_path with the content of src_path, a file needing no substitution, using the
+    strategy or its fallbacks. A hardlink shares the original's inode, so writes through either
+    path affect both.
+    :param src_path: The file to materialize
+    :param dest_path: The file to create, which must not exist
+    :param strategy: One of `copy`, `reflink` or `hardlink`
+    :return: The strategy that was used
+    """
+    if strategy not in STRATEGY_FALLBACKS:
+        raise ValueError(f"Unknown template strategy: {strategy}")
+
+    for fallback in STRATEGY_FALLBACKS[strategy]:
+        try:
+            if fallback == "hardlink":
+                os.link(src_path, dest_path)
+            elif fallback == "reflink":
+                reflink_file(src_path, dest_path)
+            else:
+                copy_file(src_path, dest_path)
+            return fallback
+        except OSError as e:
+            if fallback == "copy" or e.errno not in UNLINKABLE_ERRNOS:
+                raise
+            if fallback == "reflink":
+                dest_path.unlink(missing_ok=True)
+
+
+def _safe_split(text: AnyStr) -> int:
+    """
+    Returns the position to split text at, so no placeholder straddles the split. Placeholders
+    can't contain a `$` other than their leading one(s), so only a trailing `$name` or `${name`
+    the next chunk could extend is held back, and at most NAME_LIMIT characters of its name.
+    """
+    if isinstance(text, bytes):
+        dollar, undecided_re = b"$", UNDECIDED_BYTES_RE
+    else:
+        dollar, undecided_re = "$", UNDECIDED_RE
+
+    last = text.rfind(dollar)
+    if last == -1:
+        return len(text)
+    run_start = last
+    while run_start > 0 and text[run_start - 1] == text[last]:
+        run_start -= 1
+    if (last - run_start) % 2:
+        # an even run of `$` is all escapes, however the next chunk starts
+        return len(text)
+
+    tail_start = last + 1
+    tail = text[tail_start:]
+    if len(tail) > NAME_LIMIT + 1 or not undecided_re.fullmatch(tail):
+        return len(text)
+    return last
+
+
+def iter_substituted(
+    src_path: Path, replacements: Mapping[str, str]
+) -> Iterator[bytes]:
+    """
+    Reads a template, substituting its placeholders with `string.Template.safe_substitute`
+    semantics, one chunk at a time. Bytes which aren't valid UTF-8 are passed through unchanged.
+    :param src_path: The template to read
+    :param replacements: The values of the template's variables
+    :return: An iterator of the rendered content's chunks
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+    pending = ""
+
+    with src_path.open("rb") as src:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            pending += decoder.decode(chunk, final=not chunk)
+            if not chunk:
+                break
+
+            split_at = _safe_split(pending)
+            if split_at > 0:
+                text = Template(pending[:split_at]).safe_substitute(replacements)
+                yield text.encode("utf-8", errors="surrogateescape")
+                pending = pending[split_at:]
+
+    text = Template(pending).safe_substitute(replacements)
+    yield text.encode("utf-8", errors="surrogateescape")
+
+
+def substitute_file(src_path: Path, dest_path: Path, replacements: Mapping[str, str]):
+    """
+    Copies a template, substituting its placeholders, one chunk at a time
+    :param src_path: The template to copy
+    :param dest_path: The file to create or overwrite
+    :param replacements: The values of the template's variables
+    """
+    with dest_path.open("wb") as dest:
+        for chunk in iter_substituted(src_path, replacements):
+            dest.write(chunk)
+
+
+def hash_chunks(chunks: Iterable[bytes]) -> str:
+    """Returns the sha256 hex digest of the content made up of chunks"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """Returns the sha256 hex digest of a file's content, reading it in chunks"""
+    with path.open("rb") as f:
+        return hash_chunks(iter(lambda: f.read(CHUNK_SIZE), b""))
+
+
+@contextmanager
+def lock_file(path: Path) -> Iterator[None]:
+    """
+    Holds an exclusive lock on path, creating it, until the context exits. Other processes
+    locking the same path wait for it. Without `fcntl`, no lock is taken.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomic(path: Path, data: AnyStr):
+    """
+    Writes a file through a temporary file that replaces it, so concurrent readers see either
+    the old content or the new, never a partial file
+    :param path: The file to create or overwrite, creating its directory if needed
+    :param data: The content, either text, written as UTF-8, or bytes
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # unique per thread, as threads of one process may write the same file
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    try:
+        if isinstance(data, bytes):
+            tmp_path.write_bytes(data)
+        else:
+            tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -1,14 +1,153 @@
 import json
+import os
 import subprocess
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from gh_worktree.context import Context
+from gh_worktree.response_cache import ResponseCache
+
+PR_FIELDS = [
+    "number",
+    "author",
+    "baseRefName",
+    "headRefName",
+    "headRepository",
+    "headRepositoryOwner",
+    "state",
+    "title",
+    "url",
+]
+
+# the GraphQL selection of PR_FIELDS, which `_normalize_pr` shapes like `gh pr view --json`.
+# Users' display names are left out, as the REST API has none for PRs cached from it.
+PR_GRAPHQL_FIELDS = """
+fragment PullRequestFields on PullRequest {
+  number
+  author { __typename login ... on User { id } ... on Bot { id } }
+  baseRefName
+  headRefName
+  headRepository { id name }
+  headRepositoryOwner { id login }
+  state
+  title
+  url
+}
+"""
+# the most PRs looked up by a single GraphQL request
+PR_BATCH_SIZE = 50
+# set to serve lookups from the response cache only, like `--offline`
+OFFLINE_ENVVAR = "GH_WORKTREE_OFFLINE"
+
+
+def _normalize_pr(node: dict) -> dict:
+    """
+    Reshapes a PR from a GraphQL response into the shape `gh pr view --json` outputs, less
+    users' display names
+    """
+    pr = dict(node)
+    author = node.get("author")
+    if author is not None:
+        is_bot = author.get("__typename") == "Bot"
+        pr["author"] = {
+            "id": author.get("id", ""),
+            "is_bot": is_bot,
+            # like `gh`, bot logins are prefixed, as they're GitHub App slugs
+            "login": f"app/{author['login']}" if is_bot else author["login"],
+        }
+    return pr
+
+
+def _pr_from_rest(pr: dict) -> dict:
+    """
+    Reshapes a PR from the REST API into the shape `gh pr view --json` outputs, less users'
+    display names, which the REST API doesn't include
+    """
+    user = pr.get("user") or {}
+    is_bot = user.get("type") == "Bot"
+    login = user.get("login", "")
+    if is_bot:
+        # the REST API suffixes bot logins, e.g. `dependabot[bot]`, where `gh` prefixes them
+        login = f"app/{login.removesuffix('[bot]')}"
+    head_repo = pr["head"].get("repo")
+    head_owner = (head_repo or {}).get("owner")
+    return {
+        "number": pr["number"],
+        "author": {
+            "id": user.get("node_id", ""),
+            "is_bot": is_bot,
+            "login": login,
+        },
+        "baseRefName": pr["base"]["ref"],
+        "headRefName": pr["head"]["ref"],
+        "headRepository": (
+            {"id": head_repo["node_id"], "name": head_repo["name"]}
+            if head_repo
+            else None
+        ),
+        "headRepositoryOwner": (
+            {"id": head_owner["node_id"], "login": head_owner["login"]}
+            if head_owner
+            else None
+        ),
+        "state": "MERGED" if pr.get("merged_at") else pr["state"].upper(),
+        "title": pr["title"],
+        "url": pr["html_url"],
+    }
+
+
+def _repo_from_rest(repo: dict) -> dict:
+    """Reshapes a repository from the REST API into the shape `gh repo view --json` outputs"""
+    return {
+        "defaultBranchRef": {"name": repo["default_branch"]},
+        "name": repo["name"],
+        "owner": {"id": repo["owner"]["node_id"], "login": repo["owner"]["login"]},
+        "url": repo["html_url"],
+        "isPrivate": repo["private"],
+    }
+
+
+def _parse_response(output: str) -> Tuple[Optional[int], Dict[str, str], str]:
+    """
+    Splits the output of `gh api --include` into the status code, the headers, with lowercase
+    names, and the body
+    """
+    head, _, body = output.replace("\r\n", "\n").partition("\n\n")
+    lines = head.splitlines()
+    status = None
+    if lines and lines[0].startswith("HTTP/"):
+        status_parts = lines[0].split()
+        if len(status_parts) > 1 and status_parts[1].isdigit():
+            status = int(status_parts[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, body
 
 
 class GithubCLI(object):
     def __init__(self, context: Context):
         self.context = context
+        # serve `pr_status`, `pr_statuses` and `repo_status` from the response cache only
+        self.offline = bool(os.environ.get(OFFLINE_ENVVAR))
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """The project's response cache, or None outside a project, e.g. during `init`"""
+        try:
+            return ResponseCache(self.context.config_dir / "cache")
+        except RuntimeError:
+            return None
+
+    @property
+    def cache_ttl(self) -> float:
+        return self.context.get_global_config().cache_ttl
 
     def _run(self, *command: str):
         result = subprocess.run(
@@ -20,26 +159,209 @@ class GithubCLI(object):
         )
         return result.stdout.strip()
 
+    def _graphql(self, query: str, **variables: str) -> dict:
+        """
+        Sends a GraphQL request through `gh api graphql`, returning the response's data. `gh`
+        exits with an error when any field failed, e.g. a PR that doesn't exist, but the data of
+        the other fields is still returned.
+        """
+        args = ["api", "graphql", "-f", f"query={query}"]
+        for name, value in variables.items():
+            args.extend(["-f", f"{name}={value}"])
+        try:
+            output = self._run(*args)
+        except subprocess.CalledProcessError as e:
+            try:
+                response = json.loads(e.stdout or "")
+            except ValueError:
+                response = {}
+            if not response.get("data"):
+                raise RuntimeError(
+                    f"GitHub GraphQL request failed: {(e.stderr or '').strip()}"
+                )
+            return response["data"]
+        return json.loads(output)["data"]
+
+    def _api(
+        self, path: str, etag: Optional[str] = None
+    ) -> Tuple[int, Optional[str], str]:
+        """
+        Sends a REST request through `gh api`, conditionally when given the ETag of the response
+        cached for it
+        :return: The status code, 200 or 304 (not modified), the response's ETag and its body
+        :raises RuntimeError: When the request failed
+        """
+        args = ["gh", "api", "--include", path]
+        if etag:
+            args.extend(["-H", f"If-None-Match: {etag}"])
+        result = subprocess.run(
+            args, capture_output=True, text=True, cwd=self.context.cwd
+        )
+        status, headers, body = _parse_response(result.stdout)
+        if status == 304 and etag:
+            return status, etag, ""
+        if result.returncode != 0 or status != 200:
+            message = (result.stderr or "").strip() or f"HTTP {status}"
+            raise RuntimeError(f"GitHub API request failed: gh api {path}: {message}")
+        return status, headers.get("etag"), body
+
+    def _cached(
+        self,
+        owner_repo: str,
+        kind: str,
+        key: str,
+        path: str,
+        normalize: Callable[[dict], dict],
+    ) -> dict:
+        """
+        Returns the response cached for `(owner_repo, kind, key)` while it's within the TTL,
+        otherwise revalidates it with its ETag, or fetches it, from the REST API path
+        """
+        cache = self.cache
+        if cache is None:
+            raise RuntimeError("The response cache is only available within a project")
+        cached = cache.get(owner_repo, kind, key)
+        if cached is not None and (self.offline or cached.is_fresh(self.cache_ttl)):
+            return cached.data
+        if self.offline:
+            raise RuntimeError(
+                f"Offline, and there's no cached {kind} {key} of {owner_repo}"
+            )
+
+        status, etag, body = self._api(path, etag=cached.etag if cached else None)
+        if status == 304:
+            return cache.put(owner_repo, kind, key, cached.data, etag).data
+        return cache.put(owner_repo, kind, key, normalize(json.loads(body)), etag).data
+
     def pr_status(self, pr_number: Union[int, str], owner_repo: Optional[str] = None):
-        fields = [
-            "number",
-            "author",
-            "baseRefName",
-            "headRefName",
-            "headRepository",
-            "headRepositoryOwner",
-            "state",
-            "title",
-            "url",
-        ]
-        args = ["pr", "view", "--json"]
+        """
+        Looks up a PR. With the repository given, the PR is cached in the project for the global
+        config's `cache_ttl`, then revalidated with its ETag, which doesn't count against the rate
+        limit when it's unchanged.
+        :param pr_number: The number of the PR
+        :param owner_repo: Optionally, the repository the PR belongs to, as `owner/name`,
+            otherwise it's the repository of the current directory
+        """
         if owner_repo:
-            args.extend(["--repo", owner_repo])
-        args.extend([",".join(fields), pr_number])
-        output = self._run("pr", "view", "--json", ",".join(fields), pr_number)
+            pr_number = str(int(pr_number))
+            return self._cached(
+                owner_repo,
+                "pr",
+                pr_number,
+                f"repos/{owner_repo}/pulls/{pr_number}",
+                _pr_from_rest,
+            )
+        output = self._run("pr", "view", "--json", ",".join(PR_FIELDS), str(pr_number))
         return json.loads(output)
 
-    def repo_status(self):
+    def pr_statuses(
+        self,
+        pr_numbers: Iterable[Union[int, str]],
+        owner_repo: str,
+        missing_ok: bool = False,
+    ) -> Dict[str, dict]:
+        """
+        Looks up many PRs with a single GraphQL request, rather than a `gh pr view` each. Only
+        more than PR_BATCH_SIZE PRs take further requests. PRs cached within the TTL aren't
+        requested, and the rest are cached, though without an ETag, as GraphQL has none.
+        :param pr_numbers: The numbers of the PRs to look up
+        :param owner_repo: The repository the PRs belong to, as `owner/name`
+        :param missing_ok: Whether to leave out the PRs that don't exist, or aren't cached when
+            offline, rather than raise
+        :return: A map of PR number, as a string, to the same fields `pr_status` returns
+        :raises RuntimeError: When any of the PRs don't exist, unless missing_ok
+        """
+        pr_numbers = list(
+            dict.fromkeys(str(int(pr_number)) for pr_number in pr_numbers)
+        )
+        owner, name = owner_repo.split("/", 1)
+        prs = self._cached_prs(pr_numbers, owner_repo)
+        remaining = [pr_number for pr_number in pr_numbers if pr_number not in prs]
+        if remaining and self.offline and missing_ok:
+            remaining = []
+        elif remaining and self.offline:
+            raise RuntimeError(
+                f"Offline, and there are no cached PRs of {owner_repo}: "
+                + ", ".join(f"#{pr_number}" for pr_number in remaining)
+            )
+        while remaining:
+            batch, remaining = remaining[:PR_BATCH_SIZE], remaining[PR_BATCH_SIZE:]
+            aliases = "\n".join(
+                f"  pr{pr_number}: pullRequest(number: {pr_number}) {{ ...PullRequestFields }}"
+                for pr_number in batch
+            )
+            query = (
+                "query($owner: String!, $name: String!) {\n"
+                f"repository(owner: $owner, name: $name) {{\n{aliases}\n}}\n"
+                f"}}\n{PR_GRAPHQL_FIELDS}"
+            )
+            repository = self._graphql(query, owner=owner, name=name)["repository"]
+            for pr_number in batch:
+                node = (repository or {}).get(f"pr{pr_number}")
+                if node is not None:
+                    prs[pr_number] = _normalize_pr(node)
+                    if self.cache is not None:
+                        self.cache.put(owner_repo, "pr", pr_number, prs[pr_number])
+
+        missing = [pr_number for pr_number in pr_numbers if pr_number not in prs]
+        if missing and not missing_ok:
+            raise RuntimeError(
+                f"Couldn't find PRs in {owner_repo}: "
+                + ", ".join(f"#{pr_number}" for pr_number in missing)
+            )
+        return {
+            pr_number: prs[pr_number] for pr_number in pr_numbers if pr_number in prs
+        }
+
+    def _cached_prs(self, pr_numbers: List[str], owner_repo: str) -> Dict[str, dict]:
+        """Returns the PRs cached within the TTL, or all cached PRs when offline"""
+        cache = self.cache
+        if cache is None:
+            return {}
+        prs = {}
+        for pr_number in pr_numbers:
+            cached = cache.get(owner_repo, "pr", pr_number)
+            if cached is not None and (self.offline or cached.is_fresh(self.cache_ttl)):
+                prs[pr_number] = cached.data
+        return prs
+
+    def pr_list(
+        self,
+        owner_repo: Optional[str] = None,
+        label: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """
+        Lists the open PRs matching the filters, in a single request
+        :param owner_repo: Optionally, the repository to list PRs of, as `owner/name`
+        :param label: Optionally, a label the PRs must have
+        :param search: Optionally, a GitHub search query the PRs must match, e.g.
+            `review-requested:@me`
+        :param limit: The maximum number of PRs to list
+        :return: The PRs, with the same fields `pr_status` returns
+        """
+        if self.offline:
+            raise RuntimeError("Offline, so PRs can't be listed")
+        args = ["pr", "list", "--json", ",".join(PR_FIELDS), "--limit", str(limit)]
+        if owner_repo:
+            args.extend(["--repo", owner_repo])
+        if label:
+            args.extend(["--label", label])
+        if search:
+            args.extend(["--search", search])
+        return json.loads(self._run(*args))
+
+    def repo_status(self, owner_repo: Optional[str] = None):
+        """
+        Looks up a repository. With the repository given, it's cached like `pr_status`.
+        :param owner_repo: Optionally, the repository as `owner/name`, otherwise it's the
+            repository of the current directory
+        """
+        if owner_repo:
+            return self._cached(
+                owner_repo, "repo", "repo", f"repos/{owner_repo}", _repo_from_rest
+            )
         fields = [
             "defaultBranchRef",
             "name",
@@ -1,20 +1,259 @@
+import io
+import random
 import re
+import shlex
+import subprocess
+import threading
 from collections import namedtuple
+from pathlib import Path
+from typing import Dict
+from typing import IO
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
 from gh_worktree.context import Context
+from gh_worktree.utils import COLOR_RESET
+from gh_worktree.utils import COLORS
 from gh_worktree.utils import iter_output
+from gh_worktree.utils import read_output
 from gh_worktree.utils import stream_exec
 
+STATUS_COMMAND = ["git", "status", "--porcelain=v2", "--branch", "-z"]
 TYPE_RE = re.compile(r"\((.*)\)")
+BRANCH_PREFIX_RE = re.compile(r"^refs/heads/")
+# a shared object cache never runs gc on its own, and its gc never prunes unreachable objects
+REFERENCE_CACHE_CONFIG = {"gc.auto": "0", "gc.pruneExpire": "never"}
 
 GitRemote = namedtuple("GitRemote", ["name", "uri", "type"])
+GitTreeEntry = namedtuple("GitTreeEntry", ["mode", "type", "object", "path"])
+GitObject = namedtuple("GitObject", ["object", "type", "size", "content"])
+GitWorktree = namedtuple(
+    "GitWorktree", ["path", "head", "branch", "bare", "detached", "locked", "prunable"]
+)
+GitStatus = namedtuple(
+    "GitStatus",
+    [
+        "branch",
+        "upstream",
+        "ahead",
+        "behind",
+        "staged",
+        "unstaged",
+        "untracked",
+        "conflicted",
+    ],
+)
+
+
+def parse_worktrees(output: bytes) -> List[GitWorktree]:
+    """
+    Parses the output of `git worktree list --porcelain -z`, where each attribute is terminated
+    by NUL, and each worktree's attributes are followed by an extra NUL
+    """
+    worktrees = []
+    attributes = {}
+    for field in output.decode("utf-8", errors="surrogateescape").split("\0"):
+        if field:
+            name, _, value = field.partition(" ")
+            attributes[name] = value
+            continue
+        if not attributes:
+            continue
+
+        branch = attributes.get("branch")
+        if branch is not None:
+            branch = BRANCH_PREFIX_RE.sub("", branch)
+        worktrees.append(
+            GitWorktree(
+                Path(attributes["worktree"]),
+                attributes.get("HEAD"),
+                branch,
+                "bare" in attributes,
+                "detached" in attributes,
+                "locked" in attributes,
+                "prunable" in attributes,
+            )
+        )
+        attributes = {}
+    return worktrees
+
+
+def parse_status(output: bytes) -> GitStatus:
+    """
+    Parses the output of `git status --porcelain=v2 --branch -z`, counting changed paths. The
+    branch is None when HEAD is detached, and ahead and behind are None without an upstream.
+    """
+    counts = {"staged": 0, "unstaged": 0, "untracked": 0, "conflicted": 0}
+    headers = {}
+    fields = iter(output.decode("utf-8", errors="surrogateescape").split("\0"))
+    for field in fields:
+        kind, _, rest = field.partition(" ")
+        if kind == "#":
+            name, _, value = rest.partition(" ")
+            headers[name] = value
+        elif kind in ("1", "2"):
+            staged, unstaged = rest[0], rest[1]
+            counts["staged"] += staged != "."
+            counts["unstaged"] += unstaged != "."
+            if kind == "2":
+                # renames and copies are followed by the original path
+                next(fields, None)
+        elif kind == "u":
+            counts["conflicted"] += 1
+        elif kind == "?":
+            counts["untracked"] += 1
+
+    branch = headers.get("branch.head")
+    ahead = behind = None
+    if "branch.ab" in headers:
+        ahead, behind = (abs(int(count)) for count in headers["branch.ab"].split(" "))
+    return GitStatus(
+        None if branch == "(detached)" else branch,
+        headers.get("branch.upstream"),
+        ahead,
+        behind,
+        **counts,
+    )
+
+
+class GitObjectReaderError(RuntimeError):
+    pass
+
+
+def _read_object(stream: IO[bytes], obj: str, check_only: bool) -> Optional[GitObject]:
+    """
+    Reads one `git cat-file --batch` or `--batch-check` response from stream
+    :param stream: The binary stream to read from
+    :param obj: The object name that was requested
+    :param check_only: Whether the response has no content, as with `--batch-check`
+    :return: The object, or None if git reports it missing
+    """
+    header_line = stream.readline()
+    if not header_line:
+        raise GitObjectReaderError(f"git cat-file exited while reading {obj}")
+
+    header = header_line.decode("utf-8").split()
+    if len(header) != 3:
+        # `<object> missing` or `<object> ambiguous`
+        return None
+
+    obj_hash, obj_type, size = header
+    content = None
+    if not check_only:
+        content = stream.read(int(size))
+        # each object's content is followed by a newline
+        if len(content) != int(size) or not stream.read(1):
+            raise GitObjectReaderError(f"git cat-file exited while reading {obj}")
+    return GitObject(obj_hash, obj_type, int(size), content)
+
+
+class GitObjectReader(object):
+    """
+    A long-lived `git cat-file --batch` (or `--batch-check`) coprocess, which answers many object
+    lookups at the cost of a single fork
+    """
+
+    def __init__(self, cwd: Path, check_only: bool = False):
+        self.cwd = cwd
+        self.check_only = check_only
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @property
+    def command(self) -> List[str]:
+        return ["git", "cat-file", "--batch-check" if self.check_only else "--batch"]
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                cwd=self.cwd,
+            )
+            output_color = COLORS[self._process.pid % len(COLORS)]
+            print(f"Executing: {output_color}{shlex.join(self.command)}{COLOR_RESET}")
+        return self._process
+
+    def _request(self, obj: str) -> Optional[GitObject]:
+        process = self._start()
+        try:
+            process.stdin.write(f"{obj}\n".encode("utf-8"))
+            process.stdin.flush()
+        except OSError as e:
+            raise GitObjectReaderError(
+                f"git cat-file exited while reading {obj}"
+            ) from e
+        return _read_object(process.stdout, obj, self.check_only)
+
+    def read(self, obj: str) -> Optional[GitObject]:
+        """
+        Looks up an object, restarting the coprocess once if it has died
+        :param obj: The object name, e.g. a hash or `rev:path`
+        :return: The object, or None if it doesn't exist
+        """
+        if "\n" in obj:
+            raise ValueError("Object name cannot contain a newline")
+
+        with self._lock:
+            try:
+                return self._request(obj)
+            except GitObjectReaderError:
+                self._close()
+            return self._request(obj)
+
+    def _close(self):
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+def _write_objects(stdin: IO[bytes], objects: List[str]):
+    """Feeds object names to a `git cat-file --batch` process, one per line"""
+    try:
+        for obj in objects:
+            stdin.write(f"{obj}\n".encode("utf-8"))
+        stdin.close()
+    except BrokenPipeError:
+        # the reader will surface the failure through the exit status
+        pass
+
+
+def _shallow_args(depth: Optional[int], shallow_since: Optional[str]) -> List[str]:
+    args = []
+    if depth is not None:
+        args.append(f"--depth={depth}")
+    if shallow_since is not None:
+        args.append(f"--shallow-since={shallow_since}")
+    return args
 
 
 class GitCLI(object):
     def __init__(self, context: Context):
         self.context = context
+        self._object_readers: Dict[Tuple[str, bool], GitObjectReader] = {}
+        # git reads every worktree's admin dir while adding or removing one, so it fails on dirs
+        # another process is still writing
+        self._worktree_lock = threading.Lock()
 
     def _stream_exec(self, *command: str):
         return_status = stream_exec(["git", *command], cwd=self.context.cwd)
@@ -27,8 +266,58 @@ class GitCLI(object):
         for line in iter_output(["git", *command], cwd=self.context.cwd):
             yield line
 
-    def clone(self, src: str, destination_dir: str):
-        self._stream_exec("clone", "--bare", src, destination_dir)
+    def clone(
+        self,
+        src: str,
+        destination_dir: str,
+        reference: Optional[str] = None,
+        filter_spec: Optional[str] = None,
+        depth: Optional[int] = None,
+        shallow_since: Optional[str] = None,
+    ):
+        """
+        Clones src as a bare repository
+        :param src: The URI of the repository
+        :param destination_dir: The directory to clone into
+        :param reference: Optionally, a local repository holding src's objects, which the clone
+            borrows through alternates instead of fetching and storing its own copies
+        :param filter_spec: Optionally, a partial clone filter, e.g. `blob:none`, leaving the
+            objects it omits to be fetched when they're first needed
+        :param depth: Optionally, the number of commits of history to clone
+        :param shallow_since: Optionally, a date to clone history since, e.g. `2024-01-01`
+        """
+        args = ["clone", "--bare"]
+        if reference is not None:
+            args.extend(["--reference", reference])
+        if filter_spec is not None:
+            args.append(f"--filter={filter_spec}")
+        args.extend(_shallow_args(depth, shallow_since))
+        self._stream_exec(*args, src, destination_dir)
+
+    def update_reference(self, src: str, reference_dir: Path):
+        """
+        Brings a bare repository used as a shared object cache up to date with src's branches
+        and tags, in one fetch, cloning it on first use. Projects borrow the cache's objects
+        through alternates, so gc never deletes objects from it, even once they're unreachable
+        from its own refs.
+        """
+        git_dir = f"--git-dir={reference_dir}"
+        cloned = not reference_dir.exists()
+        if cloned:
+            self._stream_exec("clone", "--bare", src, str(reference_dir))
+        for option, value in REFERENCE_CACHE_CONFIG.items():
+            # also applied to existing caches, in case they were created without it
+            self._stream_exec(git_dir, "config", option, value)
+        if cloned:
+            return
+        self._stream_exec(
+            git_dir,
+            "fetch",
+            "--prune",
+            src,
+            "+refs/heads/*:refs/heads/*",
+            "+refs/tags/*:refs/tags/*",
+        )
 
     def config(self, config_option: str, config_value: str):
         self._stream_exec("config", config_option, config_value)
@@ -38,14 +327,149 @@ class GitCLI(object):
             yield line
 
     def cat_file(self, branch_name: str, file_path: str):
-        for line in self._iter_output("cat-file", "-p", f"{branch_name}:{file_path}"):
+        git_object = self.read_object(f"{branch_name}:{file_path}")
+        if git_object is None:
+            raise RuntimeError(f"Could not read git object: {branch_name}:{file_path}")
+
+        for line in git_object.content.decode("utf-8").splitlines():
             yield line
 
-    def fetch(self, remote: Optional[str] = "origin", refspec: Optional[str] = None):
+    def _object_reader(self, check_only: bool = False) -> GitObjectReader:
+        # git resolves the repository from the working directory, so pool per directory
+        key = (str(self.context.cwd), check_only)
+        if key not in self._object_readers:
+            self._object_readers[key] = GitObjectReader(
+                self.context.cwd, check_only=check_only
+            )
+        return self._object_readers[key]
+
+    def _read_object_once(self, obj: str, check_only: bool) -> Optional[GitObject]:
+        """Fallback for when the coprocess can't be kept alive: one process per lookup"""
+        option = "--batch-check" if check_only else "--batch"
+        output = read_output(
+            ["git", "cat-file", option],
+            cwd=self.context.cwd,
+            input=f"{obj}\n".encode("utf-8"),
+        )
+        return _read_object(io.BytesIO(output), obj, check_only)
+
+    def read_object(self, obj: str) -> Optional[GitObject]:
+        """
+        Reads an object's type and content through the pooled `git cat-file --batch` coprocess
+        :param obj: The object name, e.g. a hash or `rev:path`
+        :return: The object, or None if it doesn't exist
+        """
+        try:
+            return self._object_reader().read(obj)
+        except GitObjectReaderError:
+            return self._read_object_once(obj, check_only=False)
+
+    def object_info(self, obj: str) -> Optional[GitObject]:
+        """
+        Reads an object's type and size, without its content, through the pooled
+        `git cat-file --batch-check` coprocess
+        :param obj: The object name, e.g. a hash or `rev:path`
+        :return: The object, with `content` set to None, or None if it doesn't exist
+        """
+        try:
+            return self._object_reader(check_only=True).read(obj)
+        except GitObjectReaderError:
+            return self._read_object_once(obj, check_only=True)
+
+    def close(self):
+        """Stops any pooled coprocesses"""
+        for reader in self._object_readers.values():
+            reader.close()
+        self._object_readers.clear()
+
+    def iter_tree(self, branch_name: str, file_path: str) -> Iterator[GitTreeEntry]:
+        """Recursively lists the tree entries under file_path, in a single process"""
+        output = read_output(
+            ["git", "ls-tree", "-r", "-z", branch_name, "--", file_path],
+            cwd=self.context.cwd,
+        )
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            info, path = record.split(b"\t", 1)
+            mode, obj_type, obj = info.decode("utf-8").split(" ")
+            yield GitTreeEntry(mode, obj_type, obj, path.decode("utf-8"))
+
+    def cat_file_batch(self, objects: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Reads the raw content of many objects through a single `git cat-file --batch` process
+        :param objects: The object names (hashes or `rev:path`) to read
+        :return: An iterator of (object hash, content) tuples, in the order requested
+        """
+        objects = list(objects)
+        if not objects:
+            return
+
+        command = ["git", "cat-file", "--batch"]
+        output_color = random.choice(COLORS)
+        print(f"Executing: {output_color}{shlex.join(command)}{COLOR_RESET}")
+
+        with subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.context.cwd,
+        ) as process:
+            # write from a thread so a full stdout pipe can't deadlock us
+            writer = threading.Thread(
+                target=_write_objects, args=(process.stdin, objects), daemon=True
+            )
+            writer.start()
+
+            for obj in objects:
+                git_object = _read_object(process.stdout, obj, check_only=False)
+                if git_object is None:
+                    process.kill()
+                    raise RuntimeError(f"Could not read git object: {obj}")
+                yield git_object.object, git_object.content
+
+            writer.join()
+
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"Command failed, with exit status {process.returncode}: {shlex.join(command)}"
+            )
+
+    def fetch(
+        self,
+        remote: Optional[str] = "origin",
+        refspec: Optional[str] = None,
+        depth: Optional[int] = None,
+        shallow_since: Optional[str] = None,
+    ):
+        args = ["fetch", *_shallow_args(depth, shallow_since), remote]
         if refspec is not None:
-            self._stream_exec("fetch", remote, refspec)
-        else:
-            self._stream_exec("fetch", remote)
+            args.append(refspec)
+        self._stream_exec(*args)
+
+    def fetch_objects(self, objects: List[str], remote: str = "origin"):
+        """
+        Fetches objects a partial clone omitted in one request, as git would otherwise fetch
+        them one request at a time as they're read. It's the fetch git makes of its promisor
+        remote, so nothing but the objects is fetched.
+        """
+        if not objects:
+            return
+        self._stream_exec(
+            "-c",
+            "fetch.negotiationAlgorithm=noop",
+            "fetch",
+            "--no-tags",
+            "--no-write-fetch-head",
+            "--recurse-submodules=no",
+            "--filter=blob:none",
+            remote,
+            *objects,
+        )
+
+    def fetch_many(self, remote: str, refspecs: List[str]):
+        """Fetches many refspecs from a remote in a single `git fetch`, i.e. one negotiation"""
+        self._stream_exec("fetch", remote, *refspecs)
 
     def remote(self) -> List[GitRemote]:
         remotes = []
@@ -55,21 +479,114 @@ class GitCLI(object):
             remotes.append(GitRemote(name, uri, re.sub(TYPE_RE, r"\1", remote_type)))
         return remotes
 
-    def add_worktree(self, name: str, base_ref: str):
-        """Create a new worktree branch off base_ref"""
+    def list_worktrees(self) -> List[GitWorktree]:
+        """Lists the repository's worktrees, including the bare repository, in one process"""
+        output = read_output(
+            ["git", "worktree", "list", "--porcelain", "-z"], cwd=self.context.cwd
+        )
+        return parse_worktrees(output)
+
+    def status(self, worktree_path: Path) -> GitStatus:
+        """
+        Reads a worktree's branch and changes. It runs in worktree_path rather than the context's
+        working directory, so many worktrees can be read concurrently.
+        """
+        output = read_output(STATUS_COMMAND, cwd=worktree_path, quiet=True)
+        return parse_status(output)
+
+    def statuses(
+        self, worktree_paths: List[Path], max_workers: int = 8
+    ) -> List[Optional[GitStatus]]:
+        """
+        Reads many worktrees' branches and changes, running up to max_workers `git status`
+        processes at once on one event loop
+        :return: The statuses in the order of the paths, with None for those git couldn't read
+        """
+        # asyncio is slow to import, and only `status` needs it
+        from gh_worktree.execution import ExecRequest
+        from gh_worktree.execution import run_all
+
+        results = run_all(
+            [ExecRequest(STATUS_COMMAND, cwd=path) for path in worktree_paths],
+            max_workers=max_workers,
+        )
+        return [
+            parse_status(result.output) if result.returncode == 0 else None
+            for result in results
+        ]
+
+    def rev_parse(self, ref: str) -> str:
+        """Returns the hash of the commit ref points to"""
+        output = read_output(
+            ["git", "rev-parse", "--verify", f"{ref}^{{commit}}"], cwd=self.context.cwd
+        )
+        return output.decode("utf-8").strip()
+
+    def merged_branches(self, ref: str) -> Set[str]:
+        """Returns the names of the local branches whose tips are reachable from ref"""
+        output = read_output(
+            [
+                "git",
+                "for-each-ref",
+                f"--merged={ref}",
+                "--format=%(refname:short)",
+                "refs/heads",
+            ],
+            cwd=self.context.cwd,
+        )
+        return set(output.decode("utf-8").splitlines())
+
+    def _add_worktree(
+        self, name: str, args: List[str], sparse_cones: Optional[List[str]]
+    ):
+        """
+        Runs `git worktree add` without checking out any files, applies the cones of a sparse
+        worktree, and only then checks out its files
+        """
+        with self._worktree_lock:
+            self._stream_exec("worktree", "add", "--no-checkout", *args)
+            if sparse_cones is not None:
+                # the first sparse worktree turns on per-worktree config, rewriting the shared
+                # config
+                self._stream_exec(
+                    "-C", name, "sparse-checkout", "set", "--cone", "--", *sparse_cones
+                )
+        # populating the worktree is most of the work, and it only touches the worktree
+        self._stream_exec("-C", name, "checkout")
+
+    def add_worktree(
+        self, name: str, base_ref: str, sparse_cones: Optional[List[str]] = None
+    ):
+        """
+        Create a new worktree branch off base_ref
+        :param name: The name of the worktree and its branch
+        :param base_ref: The ref to branch off
+        :param sparse_cones: Optionally, the directories to check out, in sparse-checkout's cone
+            mode, rather than the whole tree
+        """
         # Use -- to separate flags from positional arguments to prevent argument injection
-        self._stream_exec("worktree", "add", "-b", name, "--", name, base_ref)
+        self._add_worktree(name, ["-b", name, "--", name, base_ref], sparse_cones)
 
-    def open_worktree(self, name: str):
-        """Create a new worktree from an existing branch"""
+    def open_worktree(self, name: str, sparse_cones: Optional[List[str]] = None):
+        """
+        Create a new worktree from an existing branch
+        :param name: The name of the worktree and the branch
+        :param sparse_cones: Optionally, the directories to check out, in sparse-checkout's cone
+            mode, rather than the whole tree
+        """
         if ".." in name or name.startswith("/"):
             raise ValueError("Worktree name cannot contain '..' or start with '/'")
-        self._stream_exec("worktree", "add", "--", name)
+        self._add_worktree(name, ["--", name], sparse_cones)
 
     def remove_worktree(self, name: str, force: bool = False):
+        """
+        Removes a worktree and its files with `git worktree remove`, which refuses a worktree
+        that's locked, has submodules, or has modified or untracked files, unless forced
+        :param name: The name of the worktree
+        :param force: Whether to remove it even when it has modified or untracked files
+        """
         args = ["worktree", "remove"]
         if force:
             args.append("--force")
-        args.append("--")
-        args.append(name)
-        self._stream_exec(*args)
+        with self._worktree_lock:
+            self._stream_exec(*args, "--", name)
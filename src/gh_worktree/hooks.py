@@ -1,13 +1,31 @@
 import hashlib
 import os
+import re
 import stat
+import sys
+import threading
+import time
+import traceback
 from contextlib import contextmanager
 from enum import Enum
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
 
 from gh_worktree.context import Context
+from gh_worktree.jobs import HookJob
+from gh_worktree.jobs import HookJobs
 from gh_worktree.operator import ConfigOperator
+from gh_worktree.scheduler import run_graph
 from gh_worktree.utils import stream_exec
 
+AFTER_RE = re.compile(r"^#\s*after:(.*)$", re.IGNORECASE)
+# how many lines at the top of a hook script are searched for `after:` headers
+HEADER_LINES = 20
+
 
 class Hook(Enum):
     pre_init = 1
@@ -28,37 +46,258 @@ class HookExists(Exception):
     pass
 
 
+def _read_after(hook_file: str) -> List[str]:
+    """
+    Reads the names of the scripts a hook script must run after, from `# after: a, b` comment
+    lines at the top of the file
+    """
+    after = []
+    with open(hook_file, "r", encoding="utf-8", errors="replace") as f:
+        for _, line in zip(range(HEADER_LINES), f):
+            match = AFTER_RE.match(line.strip())
+            if match:
+                after.extend(name.strip() for name in match.group(1).split(","))
+    return [name for name in after if name]
+
+
 class Hooks(ConfigOperator):
     def __init__(self, context: Context):
         super().__init__(context)
         self.dir_name = "hooks"
+        # hooks fired concurrently mustn't prompt to allow the same file at once
+        self._plan_lock = threading.Lock()
+
+    def fire(
+        self,
+        hook: Hook,
+        *args,
+        skip_project: bool = False,
+        worktree: Optional[str] = None,
+    ) -> bool:
+        """
+        Runs the hook's files from the global and project config dirs
+        :param hook: The hook stage to run
+        :param args: The arguments to pass to each hook file
+        :param skip_project: Whether to only run the global hooks
+        :param worktree: The worktree the hook runs for. If the hook is one of the global config's
+            `background_hooks`, it runs detached, logging to the worktree's log file.
+        :return: Whether any hook files ran, or were started in the background
+        """
+        global_config = self.context.get_global_config()
+        with self._plan_lock:
+            plan = self._plan(
+                hook,
+                skip_project=skip_project,
+                parallel=hook.name in global_config.parallel_hooks,
+            )
+        if not plan:
+            return False
+
+        if worktree is not None and hook.name in global_config.background_hooks:
+            if self.runs_in_background(hook):
+                self._detach(hook, plan, args, worktree, global_config.hook_workers)
+                return True
+            print(f"Can't run {hook.name} in the background on this platform.")
+
+        return_statuses = self._run(plan, args, global_config.hook_workers)
+        self._raise_failures(hook, return_statuses)
+        return True
+
+    def runs_in_background(self, hook: Hook) -> bool:
+        """Whether the hook is detached when fired for a worktree, which forks the process"""
+        global_config = self.context.get_global_config()
+        return hook.name in global_config.background_hooks and hasattr(os, "fork")
+
+    def _run(
+        self, plan: Dict[str, Set[str]], args: Tuple, max_workers: int
+    ) -> Dict[str, int]:
+        return run_graph(
+            plan,
+            lambda hook_file: self._exec(hook_file, args),
+            max_workers=max_workers,
+            should_stop=lambda return_status: return_status != 0,
+        )
+
+    def _raise_failures(self, hook: Hook, return_statuses: Dict[str, int]):
+        failures = {
+            hook_file: return_status
+            for hook_file, return_status in return_statuses.items()
+            if return_status != 0
+        }
+        if len(failures) == 1:
+            raise RuntimeError(
+                f"Hook {hook.name} failed with exit code {failures.popitem()[1]}"
+            )
+        if failures:
+            failed = ", ".join(
+                f"{hook_file} (exit code {return_status})"
+                for hook_file, return_status in failures.items()
+            )
+            raise RuntimeError(f"Hook {hook.name} failed: {failed}")
+
+    def _detach(
+        self,
+        hook: Hook,
+        plan: Dict[str, Set[str]],
+        args: Tuple,
+        worktree: str,
+        max_workers: int,
+    ):
+        """
+        Forks a session-leading process to run the planned hook files, so the command can return
+        while they run. Allowlist prompts have already happened while planning.
+        """
+        jobs = HookJobs(self.context)
+        job = jobs.start(worktree, hook.name)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        # the child waits on this until the parent has recorded its pid, so the job never lacks
+        # one, and the parent's record never replaces the child's
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid != 0:
+            os.close(read_fd)
+            try:
+                job.update(pid=pid)
+                jobs.save(job)
+            finally:
+                os.close(write_fd)
+            print(
+                f"Running {hook.name} hooks in the background. "
+                f"To follow them, run: gh worktree status {worktree} --follow"
+            )
+            return
+
+        exit_code = 1
+        try:
+            os.close(write_fd)
+            # returns once the parent closes its end
+            os.read(read_fd, 1)
+            os.close(read_fd)
+            os.setsid()
+            self._redirect_output(jobs.log_path(worktree))
+            exit_code = self._run_job(jobs, job, plan, args, max_workers)
+        finally:
+            os._exit(exit_code)
 
-    def fire(self, hook: Hook, *args, skip_project: bool = False) -> bool:
-        fired = False
+    @staticmethod
+    def _redirect_output(log_path: Path):
+        """Points stdin at /dev/null and stdout and stderr at the log file"""
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_fd = os.open(str(log_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        null_fd = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(null_fd, 0)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        os.close(null_fd)
+        os.close(log_fd)
+
+    def _run_job(
+        self,
+        jobs: HookJobs,
+        job: HookJob,
+        plan: Dict[str, Set[str]],
+        args: Tuple,
+        max_workers: int,
+    ) -> int:
+        """
+        Runs the planned hook files, recording the job's progress and result
+        :return: The exit code for the background process
+        """
+        # the parent has saved the pid, but this copy of the record predates that
+        job.update(pid=os.getpid())
+        print(f"Running {job.hook} for {job.worktree}", flush=True)
+
+        return_statuses = {}
+        try:
+            return_statuses = self._run(plan, args, max_workers)
+            failed = any(return_statuses.values())
+        except Exception:
+            traceback.print_exc()
+            failed = True
+
+        job.update(
+            status="failed" if failed else "succeeded",
+            exit_codes=return_statuses,
+            finished_at=time.time(),
+        )
+        jobs.save(job)
+        print(f"{job.hook} {job.status}", flush=True)
+        return 1 if failed else 0
+
+    def _plan(
+        self, hook: Hook, skip_project: bool = False, parallel: bool = False
+    ) -> Dict[str, Set[str]]:
+        """
+        Orders the hook's runnable files into a graph of which files each must run after. In each
+        config dir, the `<hook>` file runs first, followed by the scripts in `<hook>.d/`, which
+        run concurrently unless ordered with an `# after: <script>, ...` header. A config dir's
+        files run after the previous one's, unless the hook is parallel-safe.
+
+        :return: A map of hook file path to the hook file paths it must run after
+        """
+        plan = {}
+        previous_files = set()
 
         for hooks_dir in self.iter_config_dirs(skip_project=skip_project):
-            hook_file = hooks_dir / hook.name
-            if not hook_file.exists():
-                continue
+            hook_file = self._runnable(hooks_dir / hook.name)
+            dir_files = set()
+            if hook_file:
+                plan[hook_file] = set(previous_files)
+                dir_files.add(hook_file)
 
-            # Ensure the hook file is executable
-            hook_file_str = str(hook_file)
-            if not os.access(hook_file_str, os.X_OK):
-                print(f"Hook {hook_file_str} is not executable. Skipping.")
-                continue
+            scripts = self._scripts(hooks_dir / f"{hook.name}.d")
+            for script in scripts.values():
+                after = previous_files | dir_files
+                for name in _read_after(script):
+                    if name not in scripts:
+                        print(
+                            f"Hook {script} runs after {name}, which won't run. Ignoring."
+                        )
+                        continue
+                    after.add(scripts[name])
+                plan[script] = after
 
-            if not self._check_allowed(hook_file_str):
-                print(f"Hook {hook_file_str} is not allowed to run. Skipping.")
+            if not parallel:
+                previous_files = dir_files | set(scripts.values())
+
+        return plan
+
+    def _scripts(self, scripts_dir: Path) -> Dict[str, str]:
+        """Returns a map of script name to path, for the runnable scripts in a `<hook>.d` dir"""
+        scripts = {}
+        if not scripts_dir.is_dir():
+            return scripts
+
+        for path in sorted(scripts_dir.iterdir()):
+            if path.name.startswith(".") or not path.is_file():
                 continue
+            script = self._runnable(path)
+            if script:
+                scripts[path.name] = script
+        return scripts
+
+    def _runnable(self, hook_file: Path) -> Optional[str]:
+        """Returns the hook file's path if it exists, is executable and is allowed to run"""
+        if not hook_file.exists():
+            return None
+
+        # Ensure the hook file is executable
+        hook_file_str = str(hook_file)
+        if not os.access(hook_file_str, os.X_OK):
+            print(f"Hook {hook_file_str} is not executable. Skipping.")
+            return None
+
+        if not self._check_allowed(hook_file_str):
+            print(f"Hook {hook_file_str} is not allowed to run. Skipping.")
+            return None
+
+        return hook_file_str
 
-            fired = True
-            command_args = [hook_file_str, *[str(arg) for arg in args]]
-            return_status = stream_exec(command_args, cwd=self.context.cwd)
-            if return_status != 0:
-                raise RuntimeError(
-                    f"Hook {hook.name} failed with exit code {return_status}"
-                )
-        return fired
+    def _exec(self, hook_file: str, args: Tuple) -> int:
+        command_args = [hook_file, *[str(arg) for arg in args]]
+        return stream_exec(command_args, cwd=self.context.cwd)
 
     def _check_allowed(self, hook_file: str) -> bool:
         with open(hook_file, "rb") as f:
@@ -81,17 +320,23 @@ class Hooks(ConfigOperator):
         return False
 
     @contextmanager
-    def add(self, hook: Hook):
+    def add(self, hook: Hook, binary: bool = False, script: Optional[str] = None):
         hooks_dir = self.context.config_dir / "hooks"
         hook_file = hooks_dir / hook.name
-        hooks_dir.mkdir(parents=True, exist_ok=True)
+        if script is not None:
+            hook_file = hooks_dir / f"{hook.name}.d" / script
+        hook_file.parent.mkdir(parents=True, exist_ok=True)
 
         if hook_file.exists():
             raise HookExists(f"Hook {hook_file} already exists.")
 
         # copy it to config
-        with hook_file.open("w", encoding="utf-8", newline="\n") as f:
-            yield f
+        if binary:
+            with hook_file.open("wb") as f:
+                yield f
+        else:
+            with hook_file.open("w", encoding="utf-8", newline="\n") as f:
+                yield f
 
         # allow exec
         hook_file.chmod(hook_file.stat().st_mode | stat.S_IEXEC)
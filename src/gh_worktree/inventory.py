@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from gh_worktree.config import Config
+from gh_worktree.context import Context
+from gh_worktree.files import write_atomic
+from gh_worktree.git import GitWorktree
+from gh_worktree.hooks import Hook
+from gh_worktree.jobs import HookJob
+from gh_worktree.jobs import HookJobs
+
+WorktreeEntry = namedtuple(
+    "WorktreeEntry",
+    [
+        "name",
+        "git",
+        "pr_number",
+        "base_ref",
+        "base_commit",
+        "created_at",
+        "hook",
+        "hook_status",
+    ],
+)
+
+
+class WorktreeIndex(Config):
+    """
+    What gh-worktree recorded about each worktree it created, by name: the PR it was checked out
+    from, the ref and commit it's based on, when it was created, and how its last hook finished
+    """
+
+    type: str = "worktree_index"
+
+    @property
+    def worktrees(self) -> Dict[str, dict]:
+        return self._data.get("worktrees", {})
+
+    def get(self, name: str) -> dict:
+        return self.worktrees.get(name, {})
+
+    def update_worktree(self, name: str, **kwargs):
+        self._data.setdefault("worktrees", {}).setdefault(name, {}).update(kwargs)
+
+    def discard(self, name: str) -> bool:
+        """Removes the worktree's entry, returning whether it had one"""
+        return self._data.get("worktrees", {}).pop(name, None) is not None
+
+    def save(self, fd):
+        # machine read, and read on every `list`, so it's kept compact
+        json.dump(self._data, fd, separators=(",", ":"))
+
+
+class Inventory(object):
+    """
+    Maintains the worktree index, `.gh/worktree/worktrees.json`, and joins it with the worktrees
+    git knows about
+    """
+
+    def __init__(self, context: Context):
+        self.context = context
+        # worktrees may be created concurrently, and each update rewrites the whole index
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.context.config_dir / "worktrees.json"
+
+    def load(self) -> WorktreeIndex:
+        """
+        Reads the index. It's read once per command, so it bypasses the config cache to avoid
+        copying it.
+        """
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                return WorktreeIndex.load(f)
+        except FileNotFoundError:
+            return WorktreeIndex()
+
+    def _save(self, index: WorktreeIndex):
+        """Writes the index atomically, so `list` never reads a partial file"""
+        write_atomic(self.index_path, index.dumps())
+
+    def update(self, name: str, **kwargs):
+        """Sets fields of the worktree's entry in the index"""
+        with self._lock:
+            index = self.load()
+            index.update_worktree(name, **kwargs)
+            self._save(index)
+
+    def record(
+        self,
+        name: str,
+        base_ref: Optional[str] = None,
+        pr_number: Optional[str] = None,
+        base_commit: Optional[str] = None,
+    ):
+        """
+        Records a worktree that was just created, replacing any entry of an earlier worktree with
+        the same name
+        :param name: The name of the worktree
+        :param base_ref: The ref the worktree was created from, e.g. `origin/main`
+        :param pr_number: The number of the PR the worktree was checked out from, if any
+        :param base_commit: The commit a new branch was created at, to tell whether it has any
+            commits of its own
+        """
+        with self._lock:
+            index = self.load()
+            index.discard(name)
+            index.update_worktree(
+                name,
+                base_ref=base_ref,
+                base_commit=base_commit,
+                pr_number=pr_number,
+                created_at=time.time(),
+            )
+            self._save(index)
+
+    @contextmanager
+    def track_hook(self, name: str, hook: Hook) -> Iterator[None]:
+        """Records whether the hook fired within the context succeeded, as the worktree's last"""
+        try:
+            yield
+        except RuntimeError:
+            self.update(name, hook=hook.name, hook_status="failed")
+            raise
+        self.update(name, hook=hook.name, hook_status="succeeded")
+
+    def discard(self, name: str):
+        with self._lock:
+            index = self.load()
+            if index.discard(name):
+                self._save(index)
+
+    def list(
+        self, worktrees: Dict[str, GitWorktree], jobs: HookJobs
+    ) -> List[WorktreeEntry]:
+        """
+        Joins the worktrees git knows about with their entries in the index. Entries of worktrees
+        that no longer exist are left out.
+        :param worktrees: The project's worktrees by name, as from `Runtime.get_worktrees`
+        :param jobs: The background hook jobs. A hook that ran in the background reports the
+            status of its job.
+        :return: The worktrees, sorted by name
+        """
+        index = self.load()
+        entries = []
+        for name in sorted(worktrees):
+            entry = index.get(name)
+            hook = entry.get("hook")
+            hook_status = entry.get("hook_status")
+            if hook is not None:
+                hook_status = self._job_state(jobs.job_path(name, hook)) or hook_status
+            entries.append(
+                WorktreeEntry(
+                    name,
+                    worktrees[name],
+                    entry.get("pr_number"),
+                    entry.get("base_ref"),
+                    entry.get("base_commit"),
+                    entry.get("created_at"),
+                    hook,
+                    hook_status,
+                )
+            )
+        return entries
+
+    @staticmethod
+    def _job_state(job_path: Path) -> Optional[str]:
+        try:
+            with job_path.open("r", encoding="utf-8") as f:
+                return HookJob.load(f).state
+        except (OSError, ValueError, KeyError):
+            return None
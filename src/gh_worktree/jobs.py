@@ -0,0 +1,135 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from gh_worktree.config import Config
+from gh_worktree.context import Context
+from gh_worktree.files import write_atomic
+
+
+class HookJob(Config):
+    """The record of a hook stage running in the background for a worktree"""
+
+    type: str = "hook_job"
+
+    @property
+    def hook(self) -> str:
+        return self._data.get("hook")
+
+    @property
+    def worktree(self) -> str:
+        return self._data.get("worktree")
+
+    @property
+    def status(self) -> str:
+        """One of `running`, `succeeded` or `failed`"""
+        return self._data.get("status", "running")
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._data.get("pid")
+
+    @property
+    def started_at(self) -> Optional[float]:
+        return self._data.get("started_at")
+
+    @property
+    def finished_at(self) -> Optional[float]:
+        return self._data.get("finished_at")
+
+    @property
+    def exit_codes(self) -> Dict[str, int]:
+        """The exit codes of the hook files that ran, by path"""
+        return self._data.get("exit_codes", {})
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the process running the job still exists"""
+        if self.pid is None:
+            # the record is written before the process starts
+            return True
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @property
+    def state(self) -> str:
+        """The job's status, or `interrupted` if it stopped without recording a result"""
+        if self.status == "running" and not self.is_alive:
+            return "interrupted"
+        return self.status
+
+
+class HookJobs(object):
+    """
+    Stores the records and logs of background hook jobs in the project's config directory:
+    `jobs/<worktree>/<hook>.json` and `logs/<worktree>.log`
+    """
+
+    def __init__(self, context: Context):
+        self.context = context
+
+    @property
+    def jobs_dir(self) -> Path:
+        return self.context.config_dir / "jobs"
+
+    @property
+    def logs_dir(self) -> Path:
+        return self.context.config_dir / "logs"
+
+    def job_path(self, worktree: str, hook: str) -> Path:
+        return self.jobs_dir / worktree / f"{hook}.json"
+
+    def log_path(self, worktree: str) -> Path:
+        return self.logs_dir / f"{worktree}.log"
+
+    def start(self, worktree: str, hook: str) -> HookJob:
+        """Records a new running job, replacing any previous record of the hook for the worktree"""
+        job = HookJob()
+        job.update(
+            hook=hook, worktree=worktree, status="running", started_at=time.time()
+        )
+        self.save(job)
+        return job
+
+    def save(self, job: HookJob):
+        """Writes the job record atomically, as it's read while the job runs"""
+        write_atomic(self.job_path(job.worktree, job.hook), job.dumps())
+
+    def list(self, worktree: Optional[str] = None) -> List[HookJob]:
+        """
+        Returns the recorded jobs, oldest first
+        :param worktree: Optionally, only return the jobs of this worktree
+        """
+        search_dir = self.jobs_dir if worktree is None else self.jobs_dir / worktree
+        if not search_dir.is_dir():
+            return []
+
+        jobs = []
+        for job_path in search_dir.rglob("*.json"):
+            if job_path.name.startswith("."):
+                continue
+            with job_path.open("r", encoding="utf-8") as f:
+                try:
+                    job = HookJob.load(f)
+                except (ValueError, KeyError):
+                    continue
+            if worktree is None or job.worktree == worktree:
+                jobs.append(job)
+
+        return sorted(jobs, key=lambda job: job.started_at or 0)
+
+    def discard(self, worktree: str):
+        """Removes the job records and log of a worktree"""
+        for job_path in self.jobs_dir.joinpath(worktree).glob("*.json"):
+            job_path.unlink()
+        log_path = self.log_path(worktree)
+        if log_path.exists():
+            log_path.unlink()
@@ -1,13 +1,39 @@
-from gh_worktree import __version__
+import importlib
+from typing import Type
+
+import gh_worktree
 from gh_worktree.command import Command
-from gh_worktree.commands.checkout import CheckoutCommand
-from gh_worktree.commands.create import CreateCommand
-from gh_worktree.commands.init import InitCommand
-from gh_worktree.commands.install import InstallCommand
-from gh_worktree.commands.remove import RemoveCommand
 from gh_worktree.runtime import Runtime
 
 
+class LazyCommand(object):
+    """
+    Defers importing and constructing a command until it's accessed, so invoking one command
+    doesn't pay for importing all of them
+    """
+
+    def __init__(self, module_name: str, class_name: str):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.attr_name = None
+
+    def __set_name__(self, owner, name: str):
+        self.attr_name = name
+
+    def load(self) -> Type[Command]:
+        module = importlib.import_module(self.module_name)
+        return getattr(module, self.class_name)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        command = self.load()(instance._runtime)
+        # cache on the instance, which takes precedence over this non-data descriptor
+        instance.__dict__[self.attr_name] = command
+        return command
+
+
 class WorktreeCommands(Command):
     """Github CLI extension for worktrees
 
@@ -16,27 +42,25 @@ class WorktreeCommands(Command):
 
     _name = "gh-worktree"
 
+    # names and aliases must match the command's `_name` and `_aliases`, with dashes as
+    # underscores, and a trailing underscore where the name would shadow a builtin
+    create = LazyCommand("gh_worktree.commands.create", "CreateCommand")
+    checkout = LazyCommand("gh_worktree.commands.checkout", "CheckoutCommand")
+    init = LazyCommand("gh_worktree.commands.init", "InitCommand")
+    install = LazyCommand("gh_worktree.commands.install", "InstallCommand")
+    list_ = LazyCommand("gh_worktree.commands.list", "ListCommand")
+    ls = LazyCommand("gh_worktree.commands.list", "ListCommand")
+    remove = LazyCommand("gh_worktree.commands.remove", "RemoveCommand")
+    rm = LazyCommand("gh_worktree.commands.remove", "RemoveCommand")
+    status = LazyCommand("gh_worktree.commands.status", "StatusCommand")
+    sync_templates = LazyCommand(
+        "gh_worktree.commands.sync_templates", "SyncTemplatesCommand"
+    )
+
     def __init__(self):
         runtime = Runtime()
         super().__init__(runtime)
-        self._add(CreateCommand(self._runtime))
-        self._add(CheckoutCommand(self._runtime))
-        self._add(InitCommand(self._runtime))
-        self._add(InstallCommand(self._runtime))
-        self._add(RemoveCommand(self._runtime))
-
-    def _add(self, command: Command):
-        """
-        Get around where Fire wants keyword flags if commands are set as callable attributes. This
-        approach allows positional arguments
-
-        :param command: The command instance
-        """
-        setattr(self, command._name, command)
-        setattr(self, command._name, command.__call__)
-        for alias in command._aliases:
-            setattr(self, alias, command.__call__)
 
     def version(self):
         """Outputs the version of gh-worktree"""
-        print(f"gh-worktree {__version__}")
+        print(f"gh-worktree {gh_worktree.__version__}")
@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+from typing import Optional
+
+from gh_worktree.config import Config
+from gh_worktree.files import write_atomic
+
+
+class CachedResponse(Config):
+    """A GitHub API response, with the ETag to revalidate it"""
+
+    type: str = "cached_response"
+
+    @property
+    def data(self) -> dict:
+        return self._data.get("data", {})
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._data.get("etag")
+
+    @property
+    def fetched_at(self) -> float:
+        return self._data.get("fetched_at", 0)
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Whether the response was fetched or revalidated less than ttl seconds ago"""
+        return time.time() - self.fetched_at < ttl
+
+
+class ResponseCache(object):
+    """
+    Stores GitHub API responses in the project's config directory, one file per
+    `(owner/repo, kind, id)`: `cache/<owner>/<repo>/<kind>-<id>.json`
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def path(self, owner_repo: str, kind: str, key: str) -> Path:
+        owner, name = owner_repo.split("/", 1)
+        return self.cache_dir / owner / name / f"{kind}-{key}.json"
+
+    def get(self, owner_repo: str, kind: str, key: str) -> Optional[CachedResponse]:
+        try:
+            with self.path(owner_repo, kind, key).open("r", encoding="utf-8") as f:
+                return CachedResponse.load(f)
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError):
+            # a corrupt entry is refetched
+            return None
+
+    def put(
+        self,
+        owner_repo: str,
+        kind: str,
+        key: str,
+        data: dict,
+        etag: Optional[str] = None,
+    ) -> CachedResponse:
+        """Stores a response fetched, or revalidated, just now"""
+        response = CachedResponse()
+        response.update(data=data, etag=etag, fetched_at=time.time())
+
+        # written atomically, as concurrent lookups may read it
+        write_atomic(self.path(owner_repo, kind, key), response.dumps())
+        return response
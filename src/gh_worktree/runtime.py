@@ -1,29 +1,111 @@
+from functools import cached_property
+from typing import Dict
 from typing import Optional
+from typing import TYPE_CHECKING
 
+from gh_worktree.config import RepositoryConfig
 from gh_worktree.context import Context
-from gh_worktree.gh import GithubCLI
-from gh_worktree.git import GitCLI
-from gh_worktree.git import GitRemote
-from gh_worktree.hooks import Hooks
-from gh_worktree.templates import Templates
+
+if TYPE_CHECKING:
+    from gh_worktree.gh import GithubCLI
+    from gh_worktree.git import GitCLI
+    from gh_worktree.git import GitRemote
+    from gh_worktree.git import GitWorktree
+    from gh_worktree.hooks import Hooks
+    from gh_worktree.inventory import Inventory
+    from gh_worktree.jobs import HookJobs
+    from gh_worktree.templates import Templates
 
 
 class Runtime(object):
-    __slots__ = ("context", "hooks", "git", "gh", "templates")
+    """
+    Holds the services commands operate with. Each is only imported and constructed when first
+    used, since some, like `Templates`, read configuration from disk, and `gh-worktree version`
+    or `--help` need none of them
+    """
 
     def __init__(self):
         self.context = Context()
-        self.hooks = Hooks(self.context)
-        self.git = GitCLI(self.context)
-        self.gh = GithubCLI(self.context)
-        self.templates = Templates(self.context)
 
-    def get_default_remote(self) -> Optional[GitRemote]:
+    @cached_property
+    def hooks(self) -> "Hooks":
+        from gh_worktree.hooks import Hooks
+
+        return Hooks(self.context)
+
+    @cached_property
+    def git(self) -> "GitCLI":
+        from gh_worktree.git import GitCLI
+
+        return GitCLI(self.context)
+
+    @cached_property
+    def gh(self) -> "GithubCLI":
+        from gh_worktree.gh import GithubCLI
+
+        return GithubCLI(self.context)
+
+    @cached_property
+    def jobs(self) -> "HookJobs":
+        from gh_worktree.jobs import HookJobs
+
+        return HookJobs(self.context)
+
+    @cached_property
+    def inventory(self) -> "Inventory":
+        from gh_worktree.inventory import Inventory
+
+        return Inventory(self.context)
+
+    @cached_property
+    def templates(self) -> "Templates":
+        from gh_worktree.templates import Templates
+
+        return Templates(self.context)
+
+    def close(self):
+        """Releases long-lived resources, like pooled git coprocesses"""
+        if "git" in self.__dict__:
+            self.git.close()
+
+    def get_worktrees(self) -> Dict[str, "GitWorktree"]:
+        """
+        Returns the project's worktrees, by name, i.e. their path relative to the project
+        directory. The bare repository, and worktrees outside the project directory, are excluded.
+        """
+        project_dir = self.context.project_dir
+        worktrees = {}
+        with self.context.use(project_dir):
+            for worktree in self.git.list_worktrees():
+                if worktree.bare or not worktree.path.is_relative_to(project_dir):
+                    continue
+                worktrees[worktree.path.relative_to(project_dir).as_posix()] = worktree
+        return worktrees
+
+    def refresh_config(self) -> RepositoryConfig:
+        """
+        Returns the project config, with the repository's details, like its default branch,
+        brought up to date from GitHub. The lookup is cached for the global config's
+        `cache_ttl`, so this is usually a file read. Offline, or when GitHub can't be reached,
+        the details saved in the config are used.
+        """
+        config = self.context.get_config()
+        if not config.owner or not config.name:
+            return config
+        try:
+            repo_data = self.gh.repo_status(f"{config.owner}/{config.name}")
+        except (RuntimeError, OSError):
+            return config
+        if config.update_repository(repo_data):
+            self.context.set_config(config)
+        return config
+
+    def get_default_remote(self) -> Optional["GitRemote"]:
         return self.get_remote(owner_name=self.context.get_config().owner)
 
     def get_remote(
         self, name: Optional[str] = None, owner_name: Optional[str] = None
-    ) -> Optional[GitRemote]:
+    ) -> Optional["GitRemote"]:
         remote_ref = None
         if owner_name:
             config = self.context.get_config()
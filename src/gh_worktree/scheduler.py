@@ -0,0 +1,99 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import TypeVar
+
+NodeT = TypeVar("NodeT", bound=Hashable)
+ResultT = TypeVar("ResultT")
+
+
+class CycleError(ValueError):
+    pass
+
+
+def _dependents(graph: Dict[NodeT, Set[NodeT]]) -> Dict[NodeT, List[NodeT]]:
+    """Inverts the graph, validating it has no unknown nodes or cycles"""
+    dependents = {node: [] for node in graph}
+    for node, dependencies in graph.items():
+        for dependency in dependencies:
+            if dependency not in graph:
+                raise ValueError(f"{node} depends on unknown node {dependency}")
+            dependents[dependency].append(node)
+
+    # Kahn's algorithm: nodes never reaching zero unfinished dependencies are in a cycle
+    remaining = {node: len(dependencies) for node, dependencies in graph.items()}
+    ready = [node for node, count in remaining.items() if count == 0]
+    while ready:
+        for dependent in dependents[ready.pop()]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    cycle = [str(node) for node, count in remaining.items() if count > 0]
+    if cycle:
+        raise CycleError(f"Dependency cycle between: {', '.join(cycle)}")
+
+    return dependents
+
+
+def run_graph(
+    graph: Dict[NodeT, Set[NodeT]],
+    func: Callable[[NodeT], ResultT],
+    max_workers: int,
+    should_stop: Optional[Callable[[ResultT], bool]] = None,
+) -> Dict[NodeT, ResultT]:
+    """
+    Runs func for every node of a dependency graph on a bounded thread pool. A node starts once
+    all of its dependencies have finished, so nodes without an ordering between them run
+    concurrently. Nodes become ready in the graph's insertion order.
+
+    :param graph: A map of each node to the set of nodes it must run after
+    :param func: The function to run for each node
+    :param max_workers: The maximum number of nodes to run at once
+    :param should_stop: Optionally, a check of a node's result that, when True, prevents any
+        further nodes from starting. Nodes already running are waited on.
+    :return: A map of node to result, for the nodes that ran
+    """
+    max_workers = max(1, max_workers)
+    dependents = _dependents(graph)
+    pending = {node: set(dependencies) for node, dependencies in graph.items()}
+    ready = deque(node for node, dependencies in pending.items() if not dependencies)
+    results: Dict[NodeT, ResultT] = {}
+    running: Dict[Future, NodeT] = {}
+    error: Optional[BaseException] = None
+    stopped = False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while running or (ready and not stopped):
+            while ready and not stopped and len(running) < max_workers:
+                node = ready.popleft()
+                running[executor.submit(func, node)] = node
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    stopped = True
+                    continue
+
+                results[node] = future.result()
+                if should_stop is not None and should_stop(results[node]):
+                    stopped = True
+
+                for dependent in dependents[node]:
+                    pending[dependent].discard(node)
+                    if not pending[dependent]:
+                        ready.append(dependent)
+
+    if error is not None:
+        raise error
+    return results
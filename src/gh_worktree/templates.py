@@ -1,16 +1,104 @@
+import json
 import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import cached_property
 from pathlib import Path
-from string import Template
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+from gh_worktree.config import Config
+from gh_worktree.config import config_cache
 from gh_worktree.context import Context
+from gh_worktree.files import hash_chunks
+from gh_worktree.files import hash_file
+from gh_worktree.files import is_template
+from gh_worktree.files import iter_substituted
+from gh_worktree.files import materialize_file
+from gh_worktree.files import scan_template
+from gh_worktree.files import substitute_file
+from gh_worktree.files import TemplateInfo
+from gh_worktree.files import write_atomic
 from gh_worktree.operator import ConfigOperator
 
 
+# how close a file's modification time may be to when it was indexed, before the index can't be
+# sure the file wasn't modified again within the filesystem's timestamp granularity
+RACY_NS = 2 * 10**9
+
+
 class TemplateExists(Exception):
     pass
 
 
+class TemplateRecord(Config):
+    """Which strategy each template file was materialized into a worktree with"""
+
+    type: str = "template_record"
+
+    @property
+    def files(self) -> Dict[str, str]:
+        """A map of each file's path, relative to the worktree, to its strategy"""
+        return self._data.get("files", {})
+
+    def add(self, relative_path: str, strategy: str):
+        self._data.setdefault("files", {})[relative_path] = strategy
+
+
+class TemplateIndex(Config):
+    """
+    What's known about each template file, by its absolute path: its content hash, the variables
+    it references and whether it's static. Entries are reused while the file's modification time
+    and size are unchanged.
+    """
+
+    type: str = "template_index"
+
+    @property
+    def files(self) -> Dict[str, dict]:
+        return self._data.get("files", {})
+
+    def lookup(self, path: str, stat: os.stat_result) -> Optional[TemplateInfo]:
+        entry = self.files.get(path)
+        if (
+            entry is None
+            or entry["mtime_ns"] != stat.st_mtime_ns
+            or entry["size"] != stat.st_size
+            # modified too close to when it was indexed to be sure it wasn't modified again
+            or entry["mtime_ns"] >= entry["indexed_at_ns"] - RACY_NS
+        ):
+            return None
+        return TemplateInfo(entry["hash"], entry["variables"], entry["static"])
+
+    def store(self, path: str, stat: os.stat_result, info: TemplateInfo):
+        self._data.setdefault("files", {})[path] = {
+            "hash": info.hash,
+            "variables": info.variables,
+            "static": info.static,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "indexed_at_ns": time.time_ns(),
+        }
+
+    def prune(self, paths: Iterable[str]) -> bool:
+        """Removes the entries of files other than those given, returning whether any were"""
+        paths = set(paths)
+        files = {path: entry for path, entry in self.files.items() if path in paths}
+        pruned = len(files) != len(self.files)
+        self._data["files"] = files
+        return pruned
+
+    def save(self, fd):
+        # machine read, and large enough for indentation to slow writing it considerably
+        json.dump(self._data, fd, separators=(",", ":"))
+
+
 class Templates(ConfigOperator):
     """
     Copies files from /templates directory into a worktree, replacing environment variables in the
@@ -20,43 +108,254 @@ class Templates(ConfigOperator):
     def __init__(self, context: Context):
         super().__init__(context)
         self.dir_name = "templates"
-        self.replacement_map = {}
+        self._index_lock = threading.Lock()
 
-        global_config = context.get_global_config()
+    @cached_property
+    def replacement_map(self) -> Dict[str, str]:
+        replacement_map = {}
+        global_config = self.context.get_global_config()
         for envvar_name in global_config.allowed_envvars:
-            self.replacement_map[envvar_name] = os.environ.get(envvar_name, "")
+            replacement_map[envvar_name] = os.environ.get(envvar_name, "")
+        return replacement_map
 
-    def copy(self, worktree_name: str):
-        config = self.context.get_config()
-        worktree_dir = self.context.project_dir / worktree_name
+    @property
+    def index_path(self) -> Path:
+        return self.context.config_dir / "template_index.json"
+
+    def update_index(self, paths: List[Path]) -> Dict[str, TemplateInfo]:
+        """
+        Scans the template files that changed since they were last indexed, saving the index. It's
+        read once per copy, so it bypasses the config cache to avoid copying it.
+        :param paths: The template files to index, replacing any others in the index
+        :return: A map of each file's absolute path to what's known about it
+        """
+        # worktrees checked out together copy templates from several threads
+        with self._index_lock:
+            return self._update_index(paths)
+
+    def _update_index(self, paths: List[Path]) -> Dict[str, TemplateInfo]:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                index = TemplateIndex.load(f)
+        except (FileNotFoundError, ValueError):
+            # a missing or unreadable index is rebuilt
+            index = TemplateIndex()
+        infos = {}
+        changed = False
+        for path in paths:
+            path_str = str(path)
+            stat = path.stat()
+            info = index.lookup(path_str, stat)
+            if info is None:
+                info = scan_template(path)
+                index.store(path_str, stat, info)
+                changed = True
+            infos[path_str] = info
+
+        if index.prune(infos) or changed:
+            # other processes may read it meanwhile
+            write_atomic(self.index_path, index.dumps())
+        return infos
 
-        self.replacement_map["REPO_NAME"] = config.name
-        self.replacement_map["REPO_DIR"] = str(self.context.project_dir)
-        self.replacement_map["WORKTREE_NAME"] = worktree_name
-        self.replacement_map["WORKTREE_DIR"] = str(worktree_dir)
+    def record_path(self, worktree_name: str) -> Path:
+        return self.context.config_dir / "materialized" / f"{worktree_name}.json"
 
+    def get_record(self, worktree_name: str) -> TemplateRecord:
+        """Returns the record of how templates were materialized into the worktree"""
+        return config_cache.load(TemplateRecord, self.record_path(worktree_name))
+
+    def discard_record(self, worktree_name: str):
+        self.record_path(worktree_name).unlink(missing_ok=True)
+
+    def replacements(self, worktree_name: str) -> Dict[str, str]:
+        """Returns the values of the variables available to the worktree's templates"""
+        config = self.context.get_config()
+        return {
+            **self.replacement_map,
+            "REPO_NAME": config.name,
+            "REPO_DIR": str(self.context.project_dir),
+            "WORKTREE_NAME": worktree_name,
+            "WORKTREE_DIR": str(self.context.project_dir / worktree_name),
+        }
+
+    def _collect(self) -> Tuple[List[Path], Dict[Path, Path]]:
+        """
+        Finds the global and project templates, with project templates taking precedence over
+        global templates at the same path
+        :return: A tuple of the relative directory paths, and a map of relative file paths to the
+            template files
+        """
+        dirs = []
+        files: Dict[Path, Path] = {}
         for templates_dir in self.iter_config_dirs():
             for path in templates_dir.rglob("*"):
                 relative_path = path.relative_to(templates_dir)
-                self._copy(worktree_dir, path, relative_path)
+                if path.is_dir():
+                    dirs.append(relative_path)
+                else:
+                    files[relative_path] = path
+        return dirs, files
 
-    def _copy(self, worktree_dir: Path, absolute_path: Path, relative_path: Path):
-        dest_path = worktree_dir / relative_path
+    def copy(self, worktree_name: str):
+        """
+        Materializes the global and project templates into the worktree. Directories are created
+        first, then files are copied concurrently.
+        :param worktree_name: The name of the worktree to copy the templates into
+        """
+        global_config = self.context.get_global_config()
+        worktree_dir = self.context.project_dir / worktree_name
+        replacements = self.replacements(worktree_name)
+        start = time.perf_counter()
 
-        if absolute_path.is_dir():
-            dest_path.mkdir(parents=True, exist_ok=True)
+        dirs, files = self._collect()
+        for relative_path in dirs:
+            (worktree_dir / relative_path).mkdir(parents=True, exist_ok=True)
+        if not files:
             return
 
-        print(f"Copying template {relative_path}")
-        with absolute_path.open("r", encoding="utf-8") as src:
-            with dest_path.open("w", encoding="utf-8") as dest:
-                content = src.read()
-                dest.write(Template(content).safe_substitute(self.replacement_map))
+        index = self.update_index(list(files.values()))
+        for relative_path, path in files.items():
+            self._warn_disallowed(relative_path, index[str(path)], replacements)
+
+        def copy_file(relative_path: Path) -> str:
+            return self._copy(
+                worktree_dir,
+                files[relative_path],
+                relative_path,
+                replacements,
+                global_config.template_strategy,
+                static=index[str(files[relative_path])].static,
+            )
+
+        # the files are independent, so they're mapped straight onto the pool
+        with ThreadPoolExecutor(max(1, global_config.template_workers)) as executor:
+            strategies = dict(zip(files, executor.map(copy_file, files)))
+
+        record = TemplateRecord()
+        for relative_path, strategy in strategies.items():
+            record.add(relative_path.as_posix(), strategy)
+        config_cache.save(record, self.record_path(worktree_name))
+
+        counts = Counter(strategies.values())
+        print(
+            f"Copied {len(strategies)} templates into {worktree_name} in"
+            f" {time.perf_counter() - start:.2f}s"
+            f" ({', '.join(f'{count} {name}' for name, count in sorted(counts.items()))})"
+        )
 
-        dest_path.chmod(absolute_path.stat().st_mode)
+    def sync(self, worktree_names: List[str]) -> Dict[str, Dict[Path, str]]:
+        """
+        Re-applies the templates to existing worktrees, concurrently. Only files whose rendered
+        content differs from what's in the worktree, by hash, are rewritten.
+        :param worktree_names: The names of the worktrees to sync
+        :return: A map of each worktree's name to the files rewritten in it, and the strategy
+            each was materialized with
+        """
+        global_config = self.context.get_global_config()
+        dirs, files = self._collect()
+        index = self.update_index(list(files.values()))
+
+        def sync_worktree(worktree_name: str) -> Dict[Path, str]:
+            worktree_dir = self.context.project_dir / worktree_name
+            replacements = self.replacements(worktree_name)
+            for relative_path in dirs:
+                (worktree_dir / relative_path).mkdir(parents=True, exist_ok=True)
+
+            strategies = {}
+            for relative_path, path in files.items():
+                info = index[str(path)]
+                if self._is_synced(
+                    worktree_dir / relative_path, path, info, replacements
+                ):
+                    continue
+                strategies[relative_path] = self._copy(
+                    worktree_dir,
+                    path,
+                    relative_path,
+                    replacements,
+                    global_config.template_strategy,
+                    static=info.static,
+                )
+
+            if strategies:
+                record = self.get_record(worktree_name)
+                for relative_path, strategy in strategies.items():
+                    record.add(relative_path.as_posix(), strategy)
+                config_cache.save(record, self.record_path(worktree_name))
+            return strategies
+
+        with ThreadPoolExecutor(max(1, global_config.template_workers)) as executor:
+            return dict(
+                zip(worktree_names, executor.map(sync_worktree, worktree_names))
+            )
+
+    @staticmethod
+    def _is_synced(
+        dest_path: Path,
+        absolute_path: Path,
+        info: TemplateInfo,
+        replacements: Dict[str, str],
+    ) -> bool:
+        """Whether the worktree's file has the template's rendered content and mode"""
+        if not dest_path.is_file():
+            return False
+        if dest_path.samefile(absolute_path):
+            # hardlinked, which is only right while the template needs no substitution
+            return info.static
+        if dest_path.stat().st_mode != absolute_path.stat().st_mode:
+            return False
+        if info.static:
+            expected_hash = info.hash
+        else:
+            expected_hash = hash_chunks(iter_substituted(absolute_path, replacements))
+        return hash_file(dest_path) == expected_hash
+
+    def _copy(
+        self,
+        worktree_dir: Path,
+        absolute_path: Path,
+        relative_path: Path,
+        replacements: Dict[str, str],
+        strategy: str = "copy",
+        static: Optional[bool] = None,
+    ) -> str:
+        """
+        Materializes a template file into the worktree, substituting its variables if it has
+        any, otherwise using the strategy
+        :param static: Whether the file is known to need no substitution, or None to scan it
+        :return: The strategy used, or `substitute` for templates
+        """
+        dest_path = worktree_dir / relative_path
+
+        # never write through an existing file, which may be hardlinked to a template
+        dest_path.unlink(missing_ok=True)
+        if static is None:
+            static = not is_template(absolute_path)
+        if not static:
+            used = "substitute"
+            substitute_file(absolute_path, dest_path, replacements)
+        else:
+            used = materialize_file(absolute_path, dest_path, strategy)
+
+        # a hardlink shares its mode with the template already
+        if used != "hardlink":
+            dest_path.chmod(absolute_path.stat().st_mode)
+        return used
+
+    @staticmethod
+    def _warn_disallowed(
+        relative_path: Path, info: TemplateInfo, replacements: Dict[str, str]
+    ):
+        disallowed = [name for name in info.variables if name not in replacements]
+        if disallowed:
+            print(
+                f"Template {relative_path} references variables that aren't allowed, and won't be"
+                f" replaced: {', '.join(disallowed)}. To allow them, add them to `allowed_envvars`"
+                " in your global config."
+            )
 
     @contextmanager
-    def add(self, relative_path: str):
+    def add(self, relative_path: str, binary: bool = False, mode: Optional[int] = None):
         template_file = self.context.project_dir / relative_path
         template_file.parent.mkdir(parents=True, exist_ok=True)
 
@@ -64,5 +363,12 @@ class Templates(ConfigOperator):
             raise TemplateExists(f"Template {relative_path} already exists.")
 
         # copy it to config
-        with template_file.open("w", encoding="utf-8") as f:
-            yield f
+        if binary:
+            with template_file.open("wb") as f:
+                yield f
+        else:
+            with template_file.open("w", encoding="utf-8") as f:
+                yield f
+
+        if mode is not None:
+            template_file.chmod(mode)
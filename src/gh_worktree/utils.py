@@ -1,14 +1,22 @@
+import codecs
+import io
 import random
 import shlex
 import subprocess
+import tempfile
 from pathlib import Path
+from typing import IO
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Union
 
 # Simple ANSI colors for the prefix
 COLORS = ["\033[92m", "\033[94m", "\033[95m", "\033[96m", "\033[93m"]
 COLOR_RESET = "\033[0m"
+# the most bytes of a line `iter_output` holds, longer lines are yielded in parts
+LINE_LIMIT = 1024 * 1024
 
 
 def find_up(name: str, start_path: Union[str, Path]) -> Path:
@@ -31,6 +39,16 @@ def find_up(name: str, start_path: Union[str, Path]) -> Path:
     raise RuntimeError(f"Could not find {name} in {start_path} ancestors")
 
 
+def print_table(rows: List[Sequence[str]]):
+    """
+    Prints rows as left-aligned columns separated by two spaces
+    :param rows: The rows to print, the first of which is usually a header
+    """
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
 def _log_prefix(command: List[str]) -> str:
     """
     Returns a prefix string for visibility, via logging, into the command being executed
@@ -79,29 +97,96 @@ def stream_exec(
 
 
 def iter_output(
-    command: List[str], wait_time: int = 60, cwd: Optional[Union[str, Path]] = None
-):
+    command: List[str],
+    wait_time: int = 60,
+    cwd: Optional[Union[str, Path]] = None,
+    binary: bool = False,
+) -> Iterator[Union[str, bytes]]:
     """
-    Executes a command in a subprocess and iterates its output after completion
+    Executes a command in a subprocess and iterates its output lines as they're written. Only a
+    line at a time is held in memory, and lines longer than LINE_LIMIT are yielded in parts.
+    When the iteration stops early, e.g. by breaking out of a loop or from `any()`, the process
+    is killed.
     :param command: The command to execute as a list of strings
-    :param wait_time: The number of seconds to wait for the process to finish
+    :param wait_time: The number of seconds to wait for the process to finish, once its output
+        is exhausted
     :param cwd: The working directory to execute the command in
+    :param binary: Whether to yield the lines as bytes, rather than decoding and echoing them
+    :raises subprocess.CalledProcessError: Once the output is exhausted, when the process failed
     """
     output_color = random.choice(COLORS)
     print(f"Executing: {output_color}{shlex.join(command)}{COLOR_RESET}")
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    # stderr goes to a file, so it can't fill a pipe and block the process while stdout is read
+    with (
+        tempfile.TemporaryFile() as stderr,
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            cwd=cwd,
+        ) as process,
+    ):
+        try:
+            for line in iter(lambda: process.stdout.readline(LINE_LIMIT), b""):
+                if line.endswith(b"\n"):
+                    line = line[:-1]
+                if binary:
+                    yield line
+                    continue
+
+                text = decoder.decode(line).rstrip("\r")
+                print(
+                    f"{output_color}{_log_prefix(command)} |{COLOR_RESET} {text}",
+                    flush=True,
+                )
+                yield text
+
+            if process.wait(wait_time) != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode, command, stderr=_read_tail(stderr)
+                )
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+def _read_tail(f: IO[bytes], limit: int = LINE_LIMIT) -> bytes:
+    """Reads the last limit bytes of a file"""
+    size = f.seek(0, io.SEEK_END)
+    f.seek(max(0, size - limit))
+    return f.read()
+
+
+def read_output(
+    command: List[str],
+    wait_time: int = 60,
+    cwd: Optional[Union[str, Path]] = None,
+    input: Optional[bytes] = None,
+    quiet: bool = False,
+) -> bytes:
+    """
+    Executes a command in a subprocess and returns its raw output after completion
+    :param command: The command to execute as a list of strings
+    :param wait_time: The number of seconds to wait for the process to finish
+    :param cwd: The working directory to execute the command in
+    :param input: Optional bytes to send to the process's stdin
+    :param quiet: Whether to skip echoing the command, e.g. when it's one of many run at once
+    :return: The raw bytes written to stdout
+    """
+    if not quiet:
+        output_color = random.choice(COLORS)
+        print(f"Executing: {output_color}{shlex.join(command)}{COLOR_RESET}")
 
     result = subprocess.run(
         command,
+        input=input,
         capture_output=True,
-        text=True,
         check=True,
         timeout=wait_time,
         cwd=cwd,
     )
-
-    for line in result.stdout.splitlines():
-        print(
-            f"{output_color}{_log_prefix(command)} |{COLOR_RESET} {line}",
-            flush=True,
-        )
-        yield line
+    return result.stdout
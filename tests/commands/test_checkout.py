@@ -1,4 +1,9 @@
+import io
+import json
+import threading
 from contextlib import contextmanager
+from contextlib import nullcontext
+from contextlib import redirect_stdout
 from pathlib import Path
 from types import SimpleNamespace
 from unittest import TestCase
@@ -22,6 +27,9 @@ class StubContext:
     def get_config(self):
         return self._config
 
+    def get_global_config(self):
+        return SimpleNamespace(checkout_workers=4)
+
     @contextmanager
     def use(self, cwd):
         yield
@@ -35,18 +43,32 @@ class CheckoutCommandTestCase(TestCase):
             name="repo",
         )
         self.context = StubContext(Path("/repo"), self.config)
-        self.hooks = SimpleNamespace(fire=Mock())
-        self.git = SimpleNamespace(open_worktree=Mock(), fetch=Mock())
-        self.gh = SimpleNamespace(pr_status=Mock())
+        self.hooks = SimpleNamespace(
+            fire=Mock(), runs_in_background=Mock(return_value=False)
+        )
+        self.git = SimpleNamespace(
+            open_worktree=Mock(), fetch=Mock(), fetch_many=Mock()
+        )
+        self.gh = SimpleNamespace(
+            pr_status=Mock(),
+            pr_statuses=Mock(return_value={}),
+            pr_list=Mock(),
+            offline=False,
+        )
         self.templates = SimpleNamespace(copy=Mock())
+        self.inventory = SimpleNamespace(
+            record=Mock(), track_hook=Mock(return_value=nullcontext())
+        )
         self.runtime = SimpleNamespace(
             context=self.context,
             hooks=self.hooks,
             git=self.git,
             gh=self.gh,
             templates=self.templates,
+            inventory=self.inventory,
             get_remote=Mock(return_value=GitRemote("origin", "uri", "fetch")),
             get_default_remote=Mock(return_value=GitRemote("origin", "uri", "fetch")),
+            get_worktrees=Mock(return_value={"existing": None}),
         )
         self.command = CheckoutCommand(self.runtime)
 
@@ -57,10 +79,16 @@ class CheckoutCommandTestCase(TestCase):
 
         self.git.fetch.assert_called_once_with("origin", "feature:feature")
         self.runtime.get_remote.assert_called_once_with(owner_name="octo")
-        self.git.open_worktree.assert_called_once_with("feature")
+        self.git.open_worktree.assert_called_once_with("feature", sparse_cones=None)
+        self.inventory.record.assert_called_once_with(
+            "feature", base_ref="origin/feature", pr_number=None
+        )
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_checkout, "feature", ANY)
-        self.hooks.fire.assert_any_call(Hook.post_checkout, "feature", ANY)
+        self.inventory.track_hook.assert_called_once_with("feature", Hook.post_checkout)
+        self.hooks.fire.assert_any_call(
+            Hook.post_checkout, "feature", ANY, worktree="feature"
+        )
 
     def test_call__uses_remote_and_branch_name(self):
         self.command("feature", remote="aremote")
@@ -68,10 +96,12 @@ class CheckoutCommandTestCase(TestCase):
         self.assertTrue(self.context.assert_called)
 
         self.git.fetch.assert_called_once_with("aremote", "feature:feature")
-        self.git.open_worktree.assert_called_once_with("feature")
+        self.git.open_worktree.assert_called_once_with("feature", sparse_cones=None)
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_checkout, "feature", ANY)
-        self.hooks.fire.assert_any_call(Hook.post_checkout, "feature", ANY)
+        self.hooks.fire.assert_any_call(
+            Hook.post_checkout, "feature", ANY, worktree="feature"
+        )
 
     def test_call__uses_pr_number(self):
         self.gh.pr_status.return_value = {
@@ -83,10 +113,27 @@ class CheckoutCommandTestCase(TestCase):
         self.assertTrue(self.context.assert_called)
         self.gh.pr_status.assert_called_once_with("1234", owner_repo="octo/repo")
         self.runtime.get_remote.assert_called_once_with(owner_name="octo")
-        self.git.open_worktree.assert_called_once_with("feature")
+        self.git.open_worktree.assert_called_once_with("feature", sparse_cones=None)
+        self.inventory.record.assert_called_once_with(
+            "feature", base_ref="origin/feature", pr_number="1234"
+        )
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_checkout, "feature", ANY)
-        self.hooks.fire.assert_any_call(Hook.post_checkout, "feature", ANY)
+        self.hooks.fire.assert_any_call(
+            Hook.post_checkout, "feature", ANY, worktree="feature"
+        )
+
+    def test_call__offline(self):
+        self.gh.pr_status.return_value = {"headRefName": "feature"}
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command("1234", offline=True)
+
+        self.assertTrue(self.gh.offline)
+        self.git.fetch.assert_not_called()
+        self.git.open_worktree.assert_called_once_with("feature", sparse_cones=None)
+        self.assertEqual(out.getvalue(), "Offline, using the local branch feature\n")
 
     def test_call__uses_pr_url(self):
         self.gh.pr_status.return_value = {
@@ -98,10 +145,34 @@ class CheckoutCommandTestCase(TestCase):
         self.assertTrue(self.context.assert_called)
         self.gh.pr_status.assert_called_once_with("1234", owner_repo="octo/repo")
         self.runtime.get_remote.assert_called_once_with(owner_name="octo")
-        self.git.open_worktree.assert_called_once_with("feature")
+        self.git.open_worktree.assert_called_once_with("feature", sparse_cones=None)
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_checkout, "feature", ANY)
-        self.hooks.fire.assert_any_call(Hook.post_checkout, "feature", ANY)
+        self.hooks.fire.assert_any_call(
+            Hook.post_checkout, "feature", ANY, worktree="feature"
+        )
+
+    def test_call__sparse(self):
+        self.config.sparse_cones = Mock(return_value=["web", "shared/ui"])
+
+        self.command("feature", sparse="frontend")
+
+        self.config.sparse_cones.assert_called_once_with("frontend")
+        self.git.open_worktree.assert_called_once_with(
+            "feature", sparse_cones=["web", "shared/ui"]
+        )
+
+    def test_call__several_prs_sparse(self):
+        self.config.sparse_cones = Mock(return_value=["web"])
+        self.gh.pr_statuses.return_value = {
+            "1": {"number": 1, "headRefName": "one"},
+            "2": {"number": 2, "headRefName": "two"},
+        }
+
+        self._call("1", "2", sparse="frontend")
+
+        self.git.open_worktree.assert_any_call("one", sparse_cones=["web"])
+        self.git.open_worktree.assert_any_call("two", sparse_cones=["web"])
 
     def test_call__raises_on_missing_remote(self):
         self.runtime.get_remote.return_value = None
@@ -112,3 +183,143 @@ class CheckoutCommandTestCase(TestCase):
     def test_call__rejects_invalid_pull_url(self):
         with self.assertRaises(ValueError, msg="Couldn't parse input. Must be"):
             self.command("https://github.com/octo/repo/issues/12")
+
+    def _call(self, *args, **kwargs) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command(*args, **kwargs)
+        return out.getvalue()
+
+    def _opened(self):
+        return sorted(args[0] for args, _ in self.git.open_worktree.call_args_list)
+
+    def test_call__several_prs(self):
+        self.gh.pr_statuses.return_value = {
+            "1": {"number": 1, "headRefName": "one"},
+            "2": {"number": 2, "headRefName": "two"},
+            "3": {"number": 3, "headRefName": "existing"},
+        }
+
+        output = self._call("1", "https://github.com/octo/repo/pull/2", "3")
+
+        self.gh.pr_statuses.assert_called_once_with(["1", "2", "3"], "octo/repo")
+        self.gh.pr_status.assert_not_called()
+        self.gh.pr_list.assert_not_called()
+        self.git.fetch_many.assert_called_once_with(
+            "origin", ["pull/1/head:one", "pull/2/head:two"]
+        )
+        self.git.fetch.assert_not_called()
+        self.assertEqual(self._opened(), ["one", "two"])
+        self.inventory.record.assert_any_call(
+            "two", base_ref="origin/two", pr_number="2"
+        )
+        self.hooks.fire.assert_any_call(
+            Hook.post_checkout, "one", "origin/one", worktree="one"
+        )
+        self.assertEqual(
+            output,
+            "Skipping #3, worktree existing already exists\n"
+            "Checked out #1 as one\n"
+            "Checked out #2 as two\n",
+        )
+
+    def test_call__selectors(self):
+        self.gh.pr_list.return_value = [
+            {"number": 5, "headRefName": "five"},
+            {"number": 1, "headRefName": "one"},
+        ]
+        self.gh.pr_statuses.return_value = {"1": {"number": 1, "headRefName": "one"}}
+
+        self._call("1", label="needs-qa", review_requested="@me")
+
+        self.gh.pr_list.assert_called_once_with(
+            "octo/repo", label="needs-qa", search="review-requested:@me"
+        )
+        self.git.fetch_many.assert_called_once_with(
+            "origin", ["pull/1/head:one", "pull/5/head:five"]
+        )
+        self.assertEqual(self._opened(), ["five", "one"])
+
+    def test_call__several_prs_reports_failures(self):
+        self.gh.pr_statuses.return_value = {
+            "1": {"number": 1, "headRefName": "one"},
+            "2": {"number": 2, "headRefName": "two"},
+        }
+
+        def open_worktree(name, sparse_cones=None):
+            if name == "one":
+                raise RuntimeError("Command failed, with exit status 128")
+
+        self.git.open_worktree.side_effect = open_worktree
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            with self.assertRaisesRegex(RuntimeError, "Failed to check out 1 of 2 PRs"):
+                self.command("1", "2")
+
+        self.assertEqual(
+            out.getvalue(),
+            "Failed to check out #1: Command failed, with exit status 128\n"
+            "Checked out #2 as two\n",
+        )
+
+    def test_call__several_prs_reports_any_error(self):
+        self.gh.pr_statuses.return_value = {
+            "1": {"number": 1, "headRefName": "one"},
+            "2": {"number": 2, "headRefName": "two"},
+        }
+        self.templates.copy.side_effect = lambda name: (
+            json.loads("{") if name == "one" else None
+        )
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            with self.assertRaisesRegex(RuntimeError, "Failed to check out 1 of 2 PRs"):
+                self.command("1", "2")
+
+        self.assertIn("Failed to check out #1: Expecting property name", out.getvalue())
+        self.assertIn("Checked out #2 as two\n", out.getvalue())
+
+    def test_call__several_prs_defers_background_hooks(self):
+        self.hooks.runs_in_background.return_value = True
+        self.gh.pr_statuses.return_value = {
+            "1": {"number": 1, "headRefName": "one"},
+            "2": {"number": 2, "headRefName": "two"},
+        }
+        thread_names = []
+        self.hooks.fire.side_effect = lambda hook, *args, **kwargs: (
+            thread_names.append(threading.current_thread().name)
+            if hook == Hook.post_checkout
+            else None
+        )
+
+        self._call("1", "2")
+
+        self.hooks.runs_in_background.assert_called_once_with(Hook.post_checkout)
+        self.assertEqual(thread_names, [threading.main_thread().name] * 2)
+
+    def test_call__several_prs_offline(self):
+        self.gh.pr_statuses.return_value = {"1": {"number": 1, "headRefName": "one"}}
+
+        self._call("1", "2", offline=True)
+
+        self.assertTrue(self.gh.offline)
+        self.git.fetch_many.assert_not_called()
+        self.assertEqual(self._opened(), ["one"])
+
+    def test_call__several_prs_validation(self):
+        with self.assertRaisesRegex(ValueError, "Specify a branch"):
+            self.command()
+        with self.assertRaisesRegex(ValueError, "Remote name isn't allowed"):
+            self.command("1", "2", remote="upstream")
+        with self.assertRaisesRegex(ValueError, "Only PR numbers or URLs of octo/repo"):
+            self.command("1", "a-branch")
+        with self.assertRaisesRegex(ValueError, "Only PR numbers or URLs of octo/repo"):
+            self.command("1", "https://github.com/other/repo/pull/2")
+        self.gh.pr_statuses.assert_not_called()
+
+    def test_call__nothing_to_check_out(self):
+        self.gh.pr_list.return_value = []
+
+        self.assertEqual(self._call(label="none"), "No PRs to check out.\n")
+        self.git.fetch_many.assert_not_called()
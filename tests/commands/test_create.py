@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from contextlib import nullcontext
 from pathlib import Path
 from types import SimpleNamespace
 from unittest import TestCase
@@ -31,14 +32,21 @@ class CreateCommandTestCase(TestCase):
         self.config = SimpleNamespace(default_branch="main")
         self.context = StubContext(Path("/repo"), self.config)
         self.hooks = SimpleNamespace(fire=Mock())
-        self.git = SimpleNamespace(fetch=Mock(), add_worktree=Mock())
+        self.git = SimpleNamespace(
+            fetch=Mock(), add_worktree=Mock(), rev_parse=Mock(return_value="abc123")
+        )
         self.templates = SimpleNamespace(copy=Mock())
+        self.inventory = SimpleNamespace(
+            record=Mock(), track_hook=Mock(return_value=nullcontext())
+        )
         self.runtime = SimpleNamespace(
             context=self.context,
             hooks=self.hooks,
             git=self.git,
             templates=self.templates,
+            inventory=self.inventory,
             get_remote=Mock(return_value=GitRemote("origin", "uri", "fetch")),
+            refresh_config=Mock(return_value=self.config),
         )
         self.command = CreateCommand(self.runtime)
 
@@ -46,12 +54,22 @@ class CreateCommandTestCase(TestCase):
         self.command("feature")
 
         self.assertTrue(self.context.assert_called)
+        self.runtime.refresh_config.assert_called_once_with()
         self.runtime.get_remote.assert_called_once_with()
         self.git.fetch.assert_called_once_with("origin")
-        self.git.add_worktree.assert_called_once_with("feature", "origin/main")
+        self.git.add_worktree.assert_called_once_with(
+            "feature", "origin/main", sparse_cones=None
+        )
+        self.git.rev_parse.assert_called_once_with("refs/heads/feature")
+        self.inventory.record.assert_called_once_with(
+            "feature", base_ref="origin/main", base_commit="abc123"
+        )
+        self.inventory.track_hook.assert_called_once_with("feature", Hook.post_create)
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_create, "feature", "origin/main")
-        self.hooks.fire.assert_any_call(Hook.post_create, "feature", "origin/main")
+        self.hooks.fire.assert_any_call(
+            Hook.post_create, "feature", "origin/main", worktree="feature"
+        )
 
     def test_call__respects_explicit_remote_and_ref(self):
         self.command("feature", "upstream/dev")
@@ -59,10 +77,14 @@ class CreateCommandTestCase(TestCase):
         self.assertTrue(self.context.assert_called)
         self.runtime.get_remote.assert_not_called()
         self.git.fetch.assert_called_once_with("upstream")
-        self.git.add_worktree.assert_called_once_with("feature", "upstream/dev")
+        self.git.add_worktree.assert_called_once_with(
+            "feature", "upstream/dev", sparse_cones=None
+        )
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(Hook.pre_create, "feature", "upstream/dev")
-        self.hooks.fire.assert_any_call(Hook.post_create, "feature", "upstream/dev")
+        self.hooks.fire.assert_any_call(
+            Hook.post_create, "feature", "upstream/dev", worktree="feature"
+        )
 
     def test_call__handles_ref_with_slashes(self):
         self.command("feature", "upstream/some/nested/branch")
@@ -71,12 +93,25 @@ class CreateCommandTestCase(TestCase):
         self.runtime.get_remote.assert_not_called()
         self.git.fetch.assert_called_once_with("upstream")
         self.git.add_worktree.assert_called_once_with(
-            "feature", "upstream/some/nested/branch"
+            "feature", "upstream/some/nested/branch", sparse_cones=None
         )
         self.templates.copy.assert_called_once_with("feature")
         self.hooks.fire.assert_any_call(
             Hook.pre_create, "feature", "upstream/some/nested/branch"
         )
         self.hooks.fire.assert_any_call(
-            Hook.post_create, "feature", "upstream/some/nested/branch"
+            Hook.post_create,
+            "feature",
+            "upstream/some/nested/branch",
+            worktree="feature",
+        )
+
+    def test_call__sparse(self):
+        self.config.sparse_cones = Mock(return_value=["web", "shared/ui"])
+
+        self.command("feature", sparse="frontend")
+
+        self.config.sparse_cones.assert_called_once_with("frontend")
+        self.git.add_worktree.assert_called_once_with(
+            "feature", "origin/main", sparse_cones=["web", "shared/ui"]
         )
@@ -9,6 +9,7 @@ from unittest.mock import Mock
 from gh_worktree.commands.init import InitCommand
 from gh_worktree.commands.init import normalize
 from gh_worktree.commands.init import RepositoryTarget
+from gh_worktree.git import GitTreeEntry
 from gh_worktree.hooks import Hook
 
 
@@ -16,6 +17,10 @@ class StubContext:
     def __init__(self, cwd, config_dir):
         self.cwd = cwd
         self.config_dir = config_dir
+        self.global_config = SimpleNamespace(reference_cache=None)
+
+    def get_global_config(self):
+        return self.global_config
 
     @contextmanager
     def use(self, cwd):
@@ -72,6 +77,12 @@ class RepositoryTargetTestCase(TestCase):
         target = RepositoryTarget("octo/repo")
         self.assertEqual(target.path, "octo/repo.git")
 
+    def test_host(self):
+        self.assertEqual(RepositoryTarget("octo/repo").host, "github.com")
+        self.assertEqual(
+            RepositoryTarget("git@github.com:octo/repo.git").host, "github.com"
+        )
+
     def test_owner(self):
         target = RepositoryTarget("https://github.com/octo/repo.git")
         self.assertEqual(target.owner, "octo")
@@ -101,10 +112,12 @@ class InitCommandTestCase(TestCase):
         self.templates = SimpleNamespace(add=MagicMock())
         self.git = SimpleNamespace(
             clone=Mock(),
+            update_reference=Mock(),
             config=Mock(),
             fetch=Mock(),
-            ls_tree=Mock(return_value=iter([])),
-            cat_file=Mock(return_value=iter([])),
+            fetch_objects=Mock(),
+            iter_tree=Mock(return_value=iter([])),
+            cat_file_batch=Mock(return_value=iter([])),
         )
         self.gh = SimpleNamespace(
             repo_status=Mock(
@@ -133,12 +146,20 @@ class InitCommandTestCase(TestCase):
         command("octo/repo", str(self.project_dir))
 
         self.git.clone.assert_called_once_with(
-            "https://github.com/octo/repo.git", ".bare"
+            "https://github.com/octo/repo.git",
+            ".bare",
+            reference=None,
+            filter_spec=None,
+            depth=None,
+            shallow_since=None,
         )
+        self.git.update_reference.assert_not_called()
         self.git.config.assert_called_once_with(
             "remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*"
         )
-        self.git.fetch.assert_called_once_with()
+        self.git.fetch.assert_called_once_with(depth=None, shallow_since=None)
+        self.git.fetch_objects.assert_not_called()
+        self.gh.repo_status.assert_called_once_with("octo/repo")
 
         gitdir_file = self.tmp_path / self.project_dir / ".git"
         self.assertEqual(gitdir_file.read_text(), "gitdir: ./.bare")
@@ -157,53 +178,181 @@ class InitCommandTestCase(TestCase):
             self.tmp_path / self.project_dir,
         )
 
+    def test_call__reference_cache(self):
+        cache_dir = self.tmp_path / "cache"
+        reference_dir = cache_dir / "github.com" / "octo" / "repo.git"
+
+        command = InitCommand(self.runtime)
+        command("octo/repo", str(self.project_dir), reference_cache=str(cache_dir))
+
+        self.git.update_reference.assert_called_once_with(
+            "https://github.com/octo/repo.git", reference_dir
+        )
+        self.git.clone.assert_called_once_with(
+            "https://github.com/octo/repo.git",
+            ".bare",
+            reference=str(reference_dir),
+            filter_spec=None,
+            depth=None,
+            shallow_since=None,
+        )
+        self.assertTrue((cache_dir / "github.com" / "octo" / "repo.git.lock").exists())
+
+    def test_call__reference_cache_from_global_config(self):
+        self.context.global_config.reference_cache = str(self.tmp_path / "cache")
+
+        command = InitCommand(self.runtime)
+        command("octo/repo", str(self.project_dir))
+
+        self.git.clone.assert_called_once_with(
+            "https://github.com/octo/repo.git",
+            ".bare",
+            reference=str(self.tmp_path / "cache" / "github.com" / "octo" / "repo.git"),
+            filter_spec=None,
+            depth=None,
+            shallow_since=None,
+        )
+
     def test_call__installs_hooks(self):
+        self.git.iter_tree.return_value = iter(
+            [
+                GitTreeEntry(
+                    "100755", "blob", "abc123", ".gh/worktree/hooks/post_checkout"
+                ),
+                GitTreeEntry("100644", "blob", "def456", ".gh/worktree/hooks/unknown"),
+            ]
+        )
+        self.git.cat_file_batch.return_value = iter([("abc123", b"echo 'hello'\n")])
+
+        mock_f = self.runtime.hooks.add.return_value.__enter__.return_value
 
-        def ls_tree_side_effect(branch, path):
-            if path.endswith("post_checkout"):
-                return iter(["100755 blob ...    post_checkout"])
-            return iter([])
+        command = InitCommand(self.runtime)
+        command("octo/repo", str(self.project_dir))
 
-        self.git.ls_tree.side_effect = ls_tree_side_effect
-        self.git.cat_file.return_value = iter(["echo 'hello'"])
+        self.git.iter_tree.assert_called_once_with("main", ".gh/worktree")
+        self.git.cat_file_batch.assert_called_once_with(["abc123"])
+        self.runtime.hooks.add.assert_called_once_with(
+            Hook.post_checkout, binary=True, script=None
+        )
+        mock_f.write.assert_called_once_with(b"echo 'hello'\n")
+
+    def test_call__partial_shallow_clone(self):
+        self.git.iter_tree.return_value = iter(
+            [
+                GitTreeEntry(
+                    "100755", "blob", "abc123", ".gh/worktree/hooks/post_checkout"
+                ),
+                GitTreeEntry("100644", "blob", "def456", ".gh/worktree/templates/.env"),
+            ]
+        )
+        self.git.cat_file_batch.return_value = iter(
+            [("abc123", b"echo 'hello'\n"), ("def456", b"A=1\n")]
+        )
+
+        command = InitCommand(self.runtime)
+        command(
+            "octo/repo",
+            str(self.project_dir),
+            filter_="blob:none",
+            depth="50",
+            shallow_since="2024-01-01",
+        )
 
+        self.git.clone.assert_called_once_with(
+            "https://github.com/octo/repo.git",
+            ".bare",
+            reference=None,
+            filter_spec="blob:none",
+            depth=50,
+            shallow_since="2024-01-01",
+        )
+        self.git.fetch.assert_called_once_with(depth=50, shallow_since="2024-01-01")
+        # only the hooks and templates are fetched, in one request
+        self.git.fetch_objects.assert_called_once_with(["abc123", "def456"])
+
+    def test_call__invalid_depth(self):
+        command = InitCommand(self.runtime)
+        with self.assertRaisesRegex(ValueError, "Invalid depth: 0"):
+            command("octo/repo", str(self.project_dir), depth="0")
+
+        self.assertFalse((self.tmp_path / self.project_dir).exists())
+        self.git.clone.assert_not_called()
+
+    def test_call__installs_hook_dir_scripts(self):
+        self.git.iter_tree.return_value = iter(
+            [
+                GitTreeEntry(
+                    "100755", "blob", "abc123", ".gh/worktree/hooks/post_create.d/deps"
+                ),
+                GitTreeEntry(
+                    "100755",
+                    "blob",
+                    "def456",
+                    ".gh/worktree/hooks/post_create.d/nested/deps",
+                ),
+                GitTreeEntry(
+                    "100755", "blob", "fed789", ".gh/worktree/hooks/unknown.d/deps"
+                ),
+            ]
+        )
+        self.git.cat_file_batch.return_value = iter([("abc123", b"make deps\n")])
         mock_f = self.runtime.hooks.add.return_value.__enter__.return_value
 
         command = InitCommand(self.runtime)
         command("octo/repo", str(self.project_dir))
 
-        mock_f.write.assert_called_once_with("echo 'hello'\n")
+        self.git.cat_file_batch.assert_called_once_with(["abc123"])
+        self.runtime.hooks.add.assert_called_once_with(
+            Hook.post_create, binary=True, script="deps"
+        )
+        mock_f.write.assert_called_once_with(b"make deps\n")
 
     def test_call__installs_templates(self):
-        self.git.ls_tree.return_value = iter(
-            ["100755 blob ...\t.gh/worktree/templates/example.txt"]
+        self.git.iter_tree.return_value = iter(
+            [
+                GitTreeEntry(
+                    "100755", "blob", "abc123", ".gh/worktree/templates/example.sh"
+                ),
+                GitTreeEntry(
+                    "100644", "blob", "def456", ".gh/worktree/templates/image.png"
+                ),
+                GitTreeEntry(
+                    "160000", "commit", "fed789", ".gh/worktree/templates/submodule"
+                ),
+            ]
+        )
+        self.git.cat_file_batch.return_value = iter(
+            [("abc123", b"echo hello"), ("def456", b"\x89PNG\r\n\x00")]
         )
-        self.git.cat_file.return_value = iter(["hello"])
         mock_f = self.runtime.templates.add.return_value.__enter__.return_value
 
         command = InitCommand(self.runtime)
         command("octo/repo", str(self.project_dir))
 
-        self.runtime.templates.add.assert_called_once_with(
-            ".gh/worktree/templates/example.txt"
+        self.git.cat_file_batch.assert_called_once_with(["abc123", "def456"])
+        self.runtime.templates.add.assert_any_call(
+            ".gh/worktree/templates/example.sh", binary=True, mode=0o755
+        )
+        self.runtime.templates.add.assert_any_call(
+            ".gh/worktree/templates/image.png", binary=True, mode=0o644
         )
-        mock_f.write.assert_called_once_with("hello\n")
+        self.assertEqual(self.runtime.templates.add.call_count, 2)
+        mock_f.write.assert_any_call(b"echo hello")
+        mock_f.write.assert_any_call(b"\x89PNG\r\n\x00")
 
     def test_add_templates__skips_existing(self):
         from gh_worktree.templates import TemplateExists
 
-        config = SimpleNamespace(default_branch="main")
-        self.git.ls_tree.return_value = iter(
-            ["100755 blob ...\t.gh/worktree/templates/example.txt"]
+        entry = GitTreeEntry(
+            "100644", "blob", "abc123", ".gh/worktree/templates/example.txt"
         )
         self.runtime.templates.add.side_effect = TemplateExists(
             "Template .gh/worktree/templates/example.txt already exists."
         )
 
         command = InitCommand(self.runtime)
-        command._add_templates(config)
+        command._add_templates([entry], {"abc123": b"hello"})
 
         self.runtime.templates.add.assert_called_once_with(
-            ".gh/worktree/templates/example.txt"
+            ".gh/worktree/templates/example.txt", binary=True, mode=0o644
         )
-        self.git.cat_file.assert_not_called()
@@ -0,0 +1,84 @@
+import io
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from unittest import TestCase
+from unittest.mock import Mock
+
+from gh_worktree.commands.list import ListCommand
+from gh_worktree.git import GitWorktree
+from gh_worktree.inventory import Inventory
+from gh_worktree.jobs import HookJobs
+
+
+class StubContext:
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+        self.assert_called = False
+
+    def assert_within_project(self):
+        self.assert_called = True
+
+
+class ListCommandTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.context = StubContext(self.tmp_path / ".gh" / "worktree")
+        self.inventory = Inventory(self.context)
+        self.runtime = SimpleNamespace(
+            context=self.context,
+            inventory=self.inventory,
+            jobs=HookJobs(self.context),
+            get_worktrees=Mock(return_value={}),
+        )
+        self.command = ListCommand(self.runtime)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _call(self) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command()
+        return out.getvalue()
+
+    def test_call__no_worktrees(self):
+        self.assertEqual(self._call(), "No worktrees.\n")
+        self.assertTrue(self.context.assert_called)
+
+    @mock.patch("gh_worktree.inventory.time.time", return_value=1700000000)
+    @mock.patch("gh_worktree.commands.list.datetime")
+    def test_call__lists_worktrees(self, mock_datetime, mock_time):
+        mock_datetime.fromtimestamp.return_value.strftime.return_value = (
+            "2023-11-14 22:13"
+        )
+        self.runtime.get_worktrees.return_value = {
+            "feature": GitWorktree(
+                self.tmp_path / "feature",
+                "abc1234",
+                "feature",
+                False,
+                False,
+                False,
+                False,
+            ),
+            "manual": GitWorktree(
+                self.tmp_path / "manual", "def5678901", None, False, True, False, True
+            ),
+        }
+        self.inventory.record("feature", base_ref="origin/feature", pr_number="12")
+        self.inventory.update("feature", hook="post_checkout", hook_status="succeeded")
+
+        self.assertEqual(
+            self._call(),
+            "NAME     BRANCH                            PR   BASE            CREATED"
+            "           HOOK\n"
+            "feature  feature                           #12  origin/feature  2023-11-14 22:13"
+            "  post_checkout succeeded\n"
+            "manual   (detached at def5678) (prunable)  -    -               -"
+            "                 -\n",
+        )
+        mock_datetime.fromtimestamp.assert_called_once_with(1700000000)
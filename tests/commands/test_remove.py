@@ -1,17 +1,38 @@
+import io
+import os
+import shutil
 import tempfile
+import time
 from contextlib import contextmanager
+from contextlib import redirect_stdout
 from pathlib import Path
 from types import SimpleNamespace
 from unittest import TestCase
+from unittest.mock import call
 from unittest.mock import Mock
 
+from gh_worktree.commands.remove import parse_duration
 from gh_worktree.commands.remove import RemoveCommand
+from gh_worktree.git import GitRemote
+from gh_worktree.git import GitWorktree
 from gh_worktree.hooks import Hook
+from gh_worktree.inventory import Inventory
 
 
 class StubContext:
     def __init__(self, project_dir):
         self.project_dir = project_dir
+        self.config_dir = project_dir / ".gh" / "worktree"
+        self.assert_called = False
+
+    def assert_within_project(self):
+        self.assert_called = True
+
+    def get_config(self):
+        return SimpleNamespace(default_branch="main", owner="octo", name="repo")
+
+    def get_global_config(self):
+        return SimpleNamespace(remove_workers=4)
 
     @contextmanager
     def use(self, cwd):
@@ -21,37 +42,236 @@ class StubContext:
 class RemoveCommandTestCase(TestCase):
     def setUp(self):
         self.tmp_dir = tempfile.TemporaryDirectory()
-        self.tmp_path = Path(self.tmp_dir.name)
+        self.project_dir = Path(self.tmp_dir.name)
+        self.context = StubContext(self.project_dir)
+        self.worktrees = {}
+        for name in ("feature", "sprint-1", "sprint-2"):
+            path = self.project_dir / name
+            path.mkdir()
+            (path / ".git").write_text(f"gitdir: .bare/worktrees/{name}\n")
+            self.worktrees[name] = GitWorktree(
+                path, "abc123", name, False, False, False, False
+            )
+        self.inventory = Inventory(self.context)
+        self.inventory_discard = Mock(wraps=self.inventory.discard)
+        self.inventory.discard = self.inventory_discard
+        self.hooks = SimpleNamespace(fire=Mock())
+        self.git = SimpleNamespace(
+            remove_worktree=Mock(),
+            merged_branches=Mock(),
+            rev_parse=Mock(return_value="def456"),
+        )
+        self.gh = SimpleNamespace(pr_statuses=Mock(), offline=False)
+        self.jobs = SimpleNamespace(
+            discard=Mock(), job_path=lambda worktree, hook: self.project_dir / "none"
+        )
+        self.templates = SimpleNamespace(discard_record=Mock())
+        self.runtime = SimpleNamespace(
+            context=self.context,
+            hooks=self.hooks,
+            git=self.git,
+            gh=self.gh,
+            jobs=self.jobs,
+            templates=self.templates,
+            inventory=self.inventory,
+            get_worktrees=Mock(return_value=self.worktrees),
+            get_default_remote=Mock(return_value=GitRemote("origin", "uri", "fetch")),
+            refresh_config=self.context.get_config,
+        )
+        self.command = RemoveCommand(self.runtime)
 
     def tearDown(self):
         self.tmp_dir.cleanup()
 
-    def test_call__raises_when_missing(self):
-        context = StubContext(self.tmp_path)
-        runtime = SimpleNamespace(
-            context=context,
-            hooks=SimpleNamespace(fire=Mock()),
-            git=SimpleNamespace(remove_worktree=Mock()),
-        )
+    def _call(self, *args, **kwargs) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command(*args, **kwargs)
+        return out.getvalue()
+
+    def _removed(self):
+        return sorted(args[0] for args, _ in self.git.remove_worktree.call_args_list)
 
-        command = RemoveCommand(runtime)
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("90m"), 90 * 60)
+        self.assertEqual(parse_duration("14d"), 14 * 24 * 60 * 60)
+        self.assertEqual(parse_duration("2w"), 14 * 24 * 60 * 60)
+        with self.assertRaisesRegex(ValueError, "Invalid duration: soon"):
+            parse_duration("soon")
 
+    def test_call__raises_when_missing(self):
         with self.assertRaisesRegex(ValueError, "Worktree missing does not exist"):
-            command("missing")
+            self.command("missing")
+        with self.assertRaisesRegex(ValueError, "No worktrees match other-"):
+            self.command("other-*")
+        with self.assertRaisesRegex(ValueError, "Specify the worktrees to remove"):
+            self.command()
+
+        self.git.remove_worktree.assert_not_called()
 
     def test_call__runs_hooks_and_git(self):
-        project_dir = self.tmp_path / "project"
-        project_dir.mkdir()
-        (project_dir / "feature").mkdir()
+        output = self._call("feature", force=True)
+
+        self.assertTrue(self.context.assert_called)
+        self.git.remove_worktree.assert_called_once_with("feature", force=True)
+        self.hooks.fire.assert_any_call(Hook.pre_remove, "feature")
+        self.hooks.fire.assert_any_call(Hook.post_remove, "feature")
+        self.jobs.discard.assert_called_once_with("feature")
+        self.templates.discard_record.assert_called_once_with("feature")
+        self.inventory_discard.assert_called_once_with("feature")
+        self.assertEqual(output, "Removed feature\n")
+
+    def test_call__globs(self):
+        output = self._call("sprint-*", "sprint-1")
+
+        self.assertEqual(self._removed(), ["sprint-1", "sprint-2"])
+        self.assertEqual(output, "Removed sprint-1\nRemoved sprint-2\n")
+
+    def test_call__reports_failures(self):
+        def remove_worktree(name, force):
+            if name == "sprint-1":
+                raise RuntimeError("Command failed, with exit status 128")
+
+        self.git.remove_worktree.side_effect = remove_worktree
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            with self.assertRaisesRegex(RuntimeError, "Failed to remove 1 of 2"):
+                self.command("sprint-*")
+
+        self.assertEqual(
+            out.getvalue(),
+            "Failed to remove sprint-1: Command failed, with exit status 128\n"
+            "Removed sprint-2\n",
+        )
+        self.assertNotIn(call(Hook.post_remove, "sprint-1"), self.hooks.fire.mock_calls)
+
+    def test_call__reports_any_error(self):
+        def discard_record(name):
+            if name == "sprint-1":
+                raise ValueError("Invalid config type: unknown")
+
+        self.templates.discard_record.side_effect = discard_record
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            with self.assertRaisesRegex(RuntimeError, "Failed to remove 1 of 2"):
+                self.command("sprint-*")
+
+        self.assertEqual(
+            out.getvalue(),
+            "Failed to remove sprint-1: Invalid config type: unknown\n"
+            "Removed sprint-2\n",
+        )
+
+    def test_call__merged(self):
+        self.git.merged_branches.return_value = {"main", "feature", "sprint-2"}
+
+        self._call(merged=True)
+
+        self.git.merged_branches.assert_called_once_with("origin/main")
+        self.assertEqual(self._removed(), ["feature", "sprint-2"])
 
-        context = StubContext(project_dir)
-        hooks = SimpleNamespace(fire=Mock())
-        git = SimpleNamespace(remove_worktree=Mock())
-        runtime = SimpleNamespace(context=context, hooks=hooks, git=git)
+    def test_call__merged_skips_default_branch(self):
+        path = self.project_dir / "main"
+        path.mkdir()
+        (path / ".git").write_text("gitdir: .bare/worktrees/main\n")
+        self.worktrees["main"] = GitWorktree(
+            path, "def456", "main", False, False, False, False
+        )
+        self.git.merged_branches.return_value = {"main", "sprint-2"}
+
+        self._call(merged=True, include_unchanged=True)
+
+        self.assertEqual(self._removed(), ["sprint-2"])
+
+    def test_call__merged_skips_unchanged_branches(self):
+        self.git.merged_branches.return_value = {"feature", "sprint-1", "sprint-2"}
+        # created at its current tip, so it has no commits of its own
+        self.inventory.record("feature", base_commit="abc123")
+        # created earlier, since when the branch has gained commits
+        self.inventory.record("sprint-1", base_commit="0ld000")
+        # not recorded, and at the default branch's tip
+        self.worktrees["sprint-2"] = self.worktrees["sprint-2"]._replace(head="def456")
+
+        self._call(merged=True)
+
+        self.git.rev_parse.assert_called_once_with("origin/main")
+        self.assertEqual(self._removed(), ["sprint-1"])
+
+    def test_call__merged_include_unchanged(self):
+        self.git.merged_branches.return_value = {"feature", "sprint-1"}
+        self.inventory.record("feature", base_commit="abc123")
+
+        self._call(merged=True, include_unchanged=True)
+
+        self.assertEqual(self._removed(), ["feature", "sprint-1"])
+
+    def test_call__pr_closed(self):
+        self.inventory.record("sprint-1", pr_number="1")
+        self.inventory.record("sprint-2", pr_number="2")
+        self.gh.pr_statuses.return_value = {
+            "1": {"state": "MERGED"},
+            "2": {"state": "OPEN"},
+        }
+
+        self._call("sprint-*", pr_closed=True)
+
+        self.gh.pr_statuses.assert_called_once_with(
+            ["1", "2"], "octo/repo", missing_ok=True
+        )
+        self.assertEqual(self._removed(), ["sprint-1"])
+
+    def test_call__pr_closed_skips_missing_prs(self):
+        self.inventory.record("sprint-1", pr_number="1")
+        self.inventory.record("sprint-2", pr_number="2")
+        # PR 1 was deleted
+        self.gh.pr_statuses.return_value = {"2": {"state": "CLOSED"}}
+
+        output = self._call("sprint-*", pr_closed=True)
+
+        self.assertEqual(self._removed(), ["sprint-2"])
+        self.assertEqual(
+            output, "Skipping sprint-1, couldn't find PR #1\nRemoved sprint-2\n"
+        )
+
+    def test_call__pr_closed_offline(self):
+        self.inventory.record("sprint-1", pr_number="1")
+        self.gh.pr_statuses.return_value = {"1": {"state": "CLOSED"}}
+
+        self._call("sprint-1", pr_closed=True, offline=True)
+
+        self.assertTrue(self.gh.offline)
+        self.assertEqual(self._removed(), ["sprint-1"])
+
+    def test_call__older_than(self):
+        self.inventory.record("feature")
+        # not recorded, so aged by the worktree's `.git` file
+        day_ago = time.time() - 24 * 60 * 60
+        os.utime(self.project_dir / "sprint-1" / ".git", (day_ago, day_ago))
+
+        output = self._call(older_than="12h")
+
+        self.assertEqual(self._removed(), ["sprint-1"])
+        self.assertEqual(output, "Removed sprint-1\n")
+
+    def test_call__older_than_skips_deleted_directories(self):
+        self.inventory.record("feature")
+        day_ago = time.time() - 24 * 60 * 60
+        os.utime(self.project_dir / "sprint-1" / ".git", (day_ago, day_ago))
+        # deleted by hand, so git lists it as prunable
+        shutil.rmtree(self.project_dir / "sprint-2")
+
+        output = self._call(older_than="12h")
+
+        self.assertEqual(self._removed(), ["sprint-1"])
+        self.assertEqual(
+            output,
+            "Skipping sprint-2, its directory no longer exists\nRemoved sprint-1\n",
+        )
 
-        command = RemoveCommand(runtime)
-        command("feature", force=True)
+    def test_call__nothing_matches_filters(self):
+        self.git.merged_branches.return_value = {"main"}
 
-        git.remove_worktree.assert_called_once_with("feature", force=True)
-        hooks.fire.assert_any_call(Hook.pre_remove, "feature")
-        hooks.fire.assert_any_call(Hook.post_remove, "feature")
+        self.assertEqual(self._call(merged=True), "No worktrees to remove.\n")
+        self.git.remove_worktree.assert_not_called()
@@ -0,0 +1,166 @@
+import io
+import re
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from unittest import TestCase
+from unittest.mock import Mock
+
+from gh_worktree.commands.status import format_duration
+from gh_worktree.commands.status import StatusCommand
+from gh_worktree.git import GitStatus
+from gh_worktree.git import GitWorktree
+from gh_worktree.inventory import Inventory
+from gh_worktree.jobs import HookJobs
+
+
+class StubContext:
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+        self.assert_called = False
+        self.global_config = SimpleNamespace(status_workers=4)
+
+    def get_global_config(self):
+        return self.global_config
+
+    def assert_within_project(self):
+        self.assert_called = True
+
+
+class StatusCommandTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.context = StubContext(self.tmp_path / ".gh" / "worktree")
+        self.jobs = HookJobs(self.context)
+        self.inventory = Inventory(self.context)
+        self.git = SimpleNamespace(statuses=Mock())
+        self.runtime = SimpleNamespace(
+            context=self.context,
+            jobs=self.jobs,
+            inventory=self.inventory,
+            git=self.git,
+            get_worktrees=Mock(return_value={}),
+        )
+        self.command = StatusCommand(self.runtime)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _call(self, *args, **kwargs) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command(*args, **kwargs)
+        return out.getvalue()
+
+    def _finish(self, worktree: str, hook: str, status: str):
+        job = self.jobs.start(worktree, hook)
+        job.update(status=status, finished_at=job.started_at + 75)
+        self.jobs.save(job)
+
+    def _write_log(self, worktree: str, content: str):
+        log_path = self.jobs.log_path(worktree)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.write_text(content)
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(5.5), "5s")
+        self.assertEqual(format_duration(75), "1m 15s")
+
+    def test_call__no_jobs(self):
+        self.assertEqual(self._call(hooks=True), "No background hooks have run.\n")
+        self.assertTrue(self.context.assert_called)
+
+    def test_call__dashboard_no_worktrees(self):
+        self.assertEqual(self._call(), "No worktrees.\n")
+        self.git.statuses.assert_not_called()
+
+    def test_call__dashboard(self):
+        def worktree(name, prunable=False):
+            path = self.tmp_path / name
+            return GitWorktree(path, "abc1234def", name, False, False, False, prunable)
+
+        self.runtime.get_worktrees.return_value = {
+            "clean": worktree("clean"),
+            "dirty": worktree("dirty"),
+            "gone": worktree("gone", prunable=True),
+        }
+        self.inventory.record("dirty", pr_number="12")
+        self.inventory.update("dirty", hook="post_checkout", hook_status="failed")
+        statuses = {
+            self.tmp_path / "clean": GitStatus("clean", None, None, None, 0, 0, 0, 0),
+            self.tmp_path / "dirty": GitStatus(None, "origin/dirty", 2, 1, 1, 0, 3, 0),
+        }
+        self.git.statuses.side_effect = lambda paths, max_workers: [
+            statuses[path] for path in paths
+        ]
+
+        lines = self._call().splitlines()
+
+        self.assertEqual(
+            lines[0].split(), ["NAME", "BRANCH", "UPSTREAM", "CHANGES", "PR", "HOOK"]
+        )
+        self.assertEqual(lines[1].split(), ["clean", "clean", "-", "clean", "-", "-"])
+        self.assertEqual(
+            re.split(r"\s{2,}", lines[2]),
+            [
+                "dirty",
+                "(detached at abc1234)",
+                "+2 -1",
+                "1 staged, 3 untracked",
+                "#12",
+                "post_checkout failed",
+            ],
+        )
+        self.assertEqual(lines[3].split(), ["gone", "gone", "-", "missing", "-", "-"])
+        self.git.statuses.assert_called_once_with(
+            [self.tmp_path / "clean", self.tmp_path / "dirty"], max_workers=4
+        )
+
+    def test_call__lists_jobs(self):
+        self._finish("feature", "post_create", "succeeded")
+        self._finish("other", "post_checkout", "failed")
+
+        lines = self._call(hooks=True).splitlines()
+
+        self.assertEqual(
+            lines[0].split(), ["WORKTREE", "HOOK", "STATUS", "STARTED", "DURATION"]
+        )
+        self.assertEqual(lines[1].split()[:3], ["feature", "post_create", "succeeded"])
+        self.assertEqual(lines[1].split()[-2:], ["1m", "15s"])
+        self.assertEqual(lines[2].split()[:3], ["other", "post_checkout", "failed"])
+        self.assertEqual(len(lines), 3)
+
+    def test_call__worktree_prints_log(self):
+        self._finish("feature", "post_create", "succeeded")
+        self._finish("other", "post_create", "succeeded")
+        self._write_log("feature", "installing\ndone\n")
+
+        output = self._call("feature")
+
+        self.assertNotIn("other", output)
+        self.assertTrue(output.endswith("installing\ndone\n"))
+
+    @mock.patch("gh_worktree.commands.status.time.sleep")
+    def test_call__follow(self, mock_sleep):
+        job = self.jobs.start("feature", "post_create")
+        self._write_log("feature", "installing\n")
+
+        def finish(_):
+            with self.jobs.log_path("feature").open("a") as f:
+                f.write("done\n")
+            job.update(status="succeeded")
+            self.jobs.save(job)
+
+        mock_sleep.side_effect = finish
+
+        output = self._call("feature", follow=True)
+
+        mock_sleep.assert_called_once()
+        self.assertTrue(output.endswith("installing\ndone\n"))
+
+    def test_call__follow_requires_worktree(self):
+        with self.assertRaisesRegex(ValueError, "worktree name is required"):
+            self.command(follow=True)
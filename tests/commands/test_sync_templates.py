@@ -0,0 +1,83 @@
+import io
+import tempfile
+from contextlib import contextmanager
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock
+
+from gh_worktree.commands.sync_templates import SyncTemplatesCommand
+
+
+class StubContext:
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self.assert_called = False
+
+    def assert_within_project(self):
+        self.assert_called = True
+
+    @contextmanager
+    def use(self, cwd):
+        yield
+
+
+class SyncTemplatesCommandTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_dir = Path(self.tmp_dir.name)
+        (self.project_dir / "feature").mkdir()
+        (self.project_dir / "other").mkdir()
+        self.context = StubContext(self.project_dir)
+        self.templates = SimpleNamespace(
+            sync=Mock(
+                side_effect=lambda names: {
+                    name: (
+                        {Path("b.txt"): "copy", Path("a.txt"): "substitute"}
+                        if name == "feature"
+                        else {}
+                    )
+                    for name in names
+                }
+            )
+        )
+        self.runtime = SimpleNamespace(
+            context=self.context,
+            templates=self.templates,
+            get_worktrees=Mock(return_value={"feature": None, "other": None}),
+        )
+        self.command = SyncTemplatesCommand(self.runtime)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_call__worktree_names(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.command("feature", "other")
+
+        self.assertTrue(self.context.assert_called)
+        self.templates.sync.assert_called_once_with(["feature", "other"])
+        self.runtime.get_worktrees.assert_not_called()
+        self.assertEqual(
+            out.getvalue(),
+            "feature: updated 2 files\n  a.txt\n  b.txt\nother: up to date\n",
+        )
+
+    def test_call__all(self):
+        with redirect_stdout(io.StringIO()):
+            self.command(all_=True)
+
+        self.templates.sync.assert_called_once_with(["feature", "other"])
+
+    def test_call__requires_worktrees(self):
+        with self.assertRaisesRegex(ValueError, "Specify the worktrees to sync"):
+            self.command()
+
+        with self.assertRaisesRegex(ValueError, "not both"):
+            self.command("feature", all_=True)
+
+        with self.assertRaisesRegex(ValueError, "Worktree missing does not exist"):
+            self.command("feature", "missing")
+        self.templates.sync.assert_not_called()
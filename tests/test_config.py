@@ -0,0 +1,216 @@
+import io
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.commands.checkout import CheckoutCommand
+from gh_worktree.config import ConfigCache
+from gh_worktree.config import GlobalConfig
+from gh_worktree.config import RepositoryConfig
+from gh_worktree.context import Context
+from gh_worktree.git import GitRemote
+
+
+class ConfigCacheTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.file_path = self.tmp_path / "config.json"
+        self.file_path.write_text(json.dumps({"type": "repository", "name": "repo"}))
+        self.cache = ConfigCache()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load__parses_once(self):
+        for _ in range(3):
+            config = self.cache.load(RepositoryConfig, self.file_path)
+            self.assertEqual(config.name, "repo")
+        self.assertEqual(self.cache.parse_count(self.file_path), 1)
+
+    def test_load__returns_copies(self):
+        config = self.cache.load(RepositoryConfig, self.file_path)
+        config.update(name="changed")
+        self.assertEqual(self.cache.load(RepositoryConfig, self.file_path).name, "repo")
+
+    def test_load__reparses_when_file_changes(self):
+        self.cache.load(RepositoryConfig, self.file_path)
+        self.file_path.write_text(json.dumps({"type": "repository", "name": "other"}))
+        # ensure the signature changes even on filesystems with coarse timestamps
+        stat = self.file_path.stat()
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(
+            self.cache.load(RepositoryConfig, self.file_path).name, "other"
+        )
+        self.assertEqual(self.cache.parse_count(self.file_path), 2)
+
+    def test_load__parses_once_across_threads(self):
+        barrier = threading.Barrier(8)
+
+        def load(_):
+            barrier.wait()
+            return self.cache.load(RepositoryConfig, self.file_path).name
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = list(executor.map(load, range(8)))
+
+        self.assertEqual(names, ["repo"] * 8)
+        self.assertEqual(self.cache.parse_count(self.file_path), 1)
+
+    def test_load__missing_file(self):
+        config = self.cache.load(GlobalConfig, self.tmp_path / "missing.json")
+        self.assertIsInstance(config, GlobalConfig)
+        self.assertEqual(self.cache.parse_count(self.tmp_path / "missing.json"), 0)
+
+    def test_load__wrong_type(self):
+        with self.assertRaisesRegex(ValueError, "Invalid config type"):
+            self.cache.load(GlobalConfig, self.file_path)
+
+    def test_save__writes_through(self):
+        config = GlobalConfig()
+        config.allow_hook("/hook", "abc")
+        file_path = self.tmp_path / "global" / "config.json"
+
+        self.cache.save(config, file_path)
+
+        self.assertEqual(
+            json.loads(file_path.read_text())["allowed_hooks"], {"/hook": "abc"}
+        )
+        loaded = self.cache.load(GlobalConfig, file_path)
+        self.assertEqual(loaded.allowed_hooks, {"/hook": "abc"})
+        self.assertEqual(self.cache.parse_count(file_path), 0)
+
+
+class ContextConfigTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        (self.tmp_path / ".bare").mkdir()
+        self.context = Context()
+        self.context.cwd = self.tmp_path
+
+        cache_patcher = mock.patch("gh_worktree.context.config_cache", ConfigCache())
+        self.cache = cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_config__parsed_once(self):
+        config = RepositoryConfig()
+        config.update(name="repo")
+        file_path = self.context.config_dir / "config.json"
+        file_path.parent.mkdir(parents=True)
+        with file_path.open("w", encoding="utf-8") as f:
+            config.save(f)
+
+        for _ in range(4):
+            self.assertEqual(self.context.get_config().name, "repo")
+        self.assertEqual(self.cache.parse_count(file_path), 1)
+
+    def test_set_config__write_through(self):
+        config = RepositoryConfig()
+        config.update(name="repo")
+        self.context.set_config(config)
+
+        self.assertEqual(self.context.get_config().name, "repo")
+        self.assertEqual(
+            self.cache.parse_count(self.context.config_dir / "config.json"), 0
+        )
+
+
+class CommandConfigTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.project_dir = self.tmp_path / "project"
+        (self.project_dir / ".bare").mkdir(parents=True)
+        self.config_path = self.project_dir / ".gh" / "worktree" / "config.json"
+        self.global_config_path = self.tmp_path / ".gh" / "worktree" / "config.json"
+        for file_path, data in (
+            (
+                self.config_path,
+                {
+                    "type": "repository",
+                    "url": "https://github.com/octo/repo",
+                    "owner": "octo",
+                    "name": "repo",
+                },
+            ),
+            (self.global_config_path, {"type": "global", "checkout_workers": 4}),
+        ):
+            file_path.parent.mkdir(parents=True)
+            file_path.write_text(json.dumps(data))
+
+        self.context = Context()
+        self.context.cwd = self.project_dir
+        # `Context.use` changes back to its cwd, which is removed with the project
+        self.addCleanup(os.chdir, os.getcwd())
+        cache_patcher = mock.patch("gh_worktree.context.config_cache", ConfigCache())
+        self.cache = cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_checkout__parses_config_once(self):
+        def open_worktree(name, sparse_cones=None):
+            # like hooks and templates, which read config from the checkout workers
+            self.context.get_config()
+            self.context.get_global_config()
+
+        prs = {str(n): {"number": n, "headRefName": f"pr-{n}"} for n in range(1, 9)}
+        runtime = SimpleNamespace(
+            context=self.context,
+            hooks=SimpleNamespace(
+                fire=mock.Mock(), runs_in_background=mock.Mock(return_value=False)
+            ),
+            git=SimpleNamespace(
+                open_worktree=mock.Mock(side_effect=open_worktree),
+                fetch_many=mock.Mock(),
+            ),
+            gh=SimpleNamespace(pr_statuses=mock.Mock(return_value=prs), offline=False),
+            templates=SimpleNamespace(copy=mock.Mock()),
+            inventory=SimpleNamespace(
+                record=mock.Mock(), track_hook=mock.Mock(return_value=nullcontext())
+            ),
+            get_remote=mock.Mock(return_value=GitRemote("origin", "uri", "fetch")),
+            get_worktrees=mock.Mock(return_value={}),
+        )
+
+        with redirect_stdout(io.StringIO()):
+            CheckoutCommand(runtime)(*prs)
+
+        self.assertEqual(runtime.git.open_worktree.call_count, 8)
+        self.assertEqual(self.cache.parse_count(self.config_path), 1)
+        self.assertEqual(self.cache.parse_count(self.global_config_path), 1)
+
+
+class RepositoryConfigTestCase(TestCase):
+    def test_sparse_cones(self):
+        config = RepositoryConfig()
+        config.update(sparse_profiles={"frontend": ["web", "shared/ui"]})
+
+        self.assertEqual(config.sparse_cones("frontend"), ["web", "shared/ui"])
+
+    def test_sparse_cones__unknown_profile(self):
+        config = RepositoryConfig()
+        config.update(sparse_profiles={"frontend": ["web"], "backend": ["api"]})
+
+        with self.assertRaisesRegex(
+            ValueError, "Unknown sparse profile docs. .*: backend, frontend$"
+        ):
+            config.sparse_cones("docs")
+
+    def test_sparse_cones__no_profiles(self):
+        with self.assertRaisesRegex(ValueError, "config: none$"):
+            RepositoryConfig().sparse_cones("docs")
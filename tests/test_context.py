@@ -0,0 +1,116 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.context import Context
+from gh_worktree.context import ProjectPaths
+from gh_worktree.context import resolve_paths
+
+
+class ResolvePathsTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # resolve, since the temp dir may be behind a symlink (e.g. macOS)
+        self.tmp_path = Path(self.tmp_dir.name).resolve()
+
+        # root/
+        #   .gh/
+        #   project/
+        #     .bare/
+        #     .gh/
+        #     worktree/
+        #       .gh/
+        #       subdir/
+        self.root = self.tmp_path / "root"
+        self.project_dir = self.root / "project"
+        self.worktree_dir = self.project_dir / "worktree"
+        (self.root / ".gh").mkdir(parents=True)
+        (self.project_dir / ".bare").mkdir(parents=True)
+        (self.project_dir / ".gh").mkdir()
+        (self.worktree_dir / ".gh").mkdir(parents=True)
+        (self.worktree_dir / "subdir").mkdir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_within_project(self):
+        expected = ProjectPaths(self.project_dir, self.root / ".gh" / "worktree")
+        self.assertEqual(resolve_paths(self.project_dir), expected)
+        self.assertEqual(resolve_paths(self.worktree_dir / "subdir"), expected)
+
+    def test_outside_project(self):
+        outside_dir = self.root / "outside" / "nested"
+        outside_dir.mkdir(parents=True)
+        self.assertEqual(
+            resolve_paths(outside_dir),
+            ProjectPaths(None, self.root / ".gh" / "worktree"),
+        )
+
+    def test_outside_project__ignores_own_gh_dir(self):
+        # `.gh` in cwd itself is a project config, not a global one
+        self.assertEqual(
+            resolve_paths(self.root).global_config_dir,
+            Path.home() / ".gh" / "worktree",
+        )
+
+    def test_default_global_config_dir(self):
+        (self.root / ".gh").rmdir()
+        self.assertEqual(
+            resolve_paths(self.worktree_dir),
+            ProjectPaths(self.project_dir, Path.home() / ".gh" / "worktree"),
+        )
+
+
+class ContextPathsTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name).resolve()
+        self.project_dir = self.tmp_path / "project"
+        (self.project_dir / ".bare").mkdir(parents=True)
+        self.context = Context()
+        self.context.cwd = self.project_dir
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_paths__cached_per_cwd(self):
+        with mock.patch(
+            "gh_worktree.context.resolve_paths", wraps=resolve_paths
+        ) as mock_resolve:
+            self.assertEqual(self.context.project_dir, self.project_dir)
+            self.assertEqual(
+                self.context.config_dir, self.project_dir / ".gh" / "worktree"
+            )
+            self.context.global_config_dir
+            self.context.assert_within_project()
+
+        mock_resolve.assert_called_once_with(self.project_dir)
+
+    def test_paths__not_cached_outside_project(self):
+        new_project_dir = self.tmp_path / "new"
+        new_project_dir.mkdir()
+        self.context.cwd = new_project_dir
+
+        with self.assertRaises(AssertionError):
+            self.context.assert_within_project()
+
+        (new_project_dir / ".bare").mkdir()
+        self.assertEqual(self.context.project_dir, new_project_dir)
+
+    def test_use__switches_and_invalidates(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        other_dir = self.tmp_path / "other"
+        (other_dir / ".bare").mkdir(parents=True)
+
+        self.assertEqual(self.context.project_dir, self.project_dir)
+        with self.context.use(other_dir):
+            self.assertEqual(self.context.project_dir, other_dir)
+        self.assertEqual(self.context.project_dir, self.project_dir)
+        self.assertEqual(list(self.context._paths), [self.project_dir])
+
+    def test_project_dir__outside_project(self):
+        self.context.cwd = self.tmp_path
+        with self.assertRaisesRegex(RuntimeError, "Could not find .bare"):
+            self.context.project_dir
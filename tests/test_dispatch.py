@@ -0,0 +1,278 @@
+import io
+from typing import Optional
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.command import Command
+from gh_worktree.dispatch import Dispatcher
+from gh_worktree.dispatch import DispatchError
+from gh_worktree.dispatch import get_parameters
+from gh_worktree.dispatch import parse_args
+from gh_worktree.dispatch import parse_docstring
+
+
+class StubCreateCommand(Command):
+    _name = "create"
+
+    def __call__(self, worktree_name: str, *base_ref: Optional[str]):
+        """
+        Create a new worktree.
+
+        More details.
+
+        :param worktree_name: The name of the worktree
+        :param base_ref: The base reference
+        """
+        self._runtime.calls.append(("create", worktree_name, base_ref))
+
+
+class StubRemoveCommand(Command):
+    _name = "remove"
+    _aliases = ["rm"]
+
+    def __call__(self, worktree_name: str, force: bool = False):
+        """Remove a worktree"""
+        self._runtime.calls.append(("remove", worktree_name, force))
+
+
+class StubCheckoutCommand(Command):
+    _name = "checkout"
+
+    def __call__(self, branch_or_pr: str, remote: Optional[str] = None):
+        """Checkout a branch"""
+        self._runtime.calls.append(("checkout", branch_or_pr, remote))
+
+
+class StubSyncTemplatesCommand(Command):
+    _name = "sync-templates"
+
+    def __call__(self, *worktree_names: str, all_: bool = False):
+        """
+        Sync templates
+
+        :param all_: Whether to sync every worktree
+        """
+        self._runtime.calls.append(("sync-templates", worktree_names, all_))
+
+
+class StubCommand(object):
+    """Non-data descriptor constructing a command, like `gh_worktree.main.LazyCommand`"""
+
+    def __init__(self, command_cls):
+        self.command_cls = command_cls
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.command_cls(instance._runtime)
+
+
+class StubCommands(Command):
+    """Stub command group
+
+    Longer description.
+    """
+
+    create = StubCommand(StubCreateCommand)
+    checkout = StubCommand(StubCheckoutCommand)
+    remove = StubCommand(StubRemoveCommand)
+    rm = StubCommand(StubRemoveCommand)
+    sync_templates = StubCommand(StubSyncTemplatesCommand)
+
+    def list_(self):
+        """Lists the worktrees"""
+        self._runtime.calls.append(("list",))
+
+    def version(self):
+        """Outputs the version"""
+        self._runtime.calls.append(("version",))
+
+
+class GetParametersTestCase(TestCase):
+    def test_varargs(self):
+        command = StubCreateCommand(None)
+        parameters = get_parameters(command.__call__)
+        self.assertEqual(
+            [(p.name, p.is_varargs) for p in parameters],
+            [("worktree_name", False), ("base_ref", True)],
+        )
+
+    def test_defaults(self):
+        def func(a, b=1, *, c, d=False):
+            pass
+
+        parameters = get_parameters(func)
+        self.assertEqual([p.name for p in parameters], ["a", "b", "c", "d"])
+        self.assertEqual(parameters[1].default, 1)
+        self.assertEqual(parameters[3].default, False)
+
+
+class ParseArgsTestCase(TestCase):
+    def setUp(self):
+        self.create = get_parameters(StubCreateCommand(None).__call__)
+        self.remove = get_parameters(StubRemoveCommand(None).__call__)
+        self.checkout = get_parameters(StubCheckoutCommand(None).__call__)
+
+    def test_positional_and_varargs(self):
+        self.assertEqual(parse_args(self.create, ["feature"]), (["feature"], {}))
+        self.assertEqual(
+            parse_args(self.create, ["feature", "upstream/main"]),
+            (["feature", "upstream/main"], {}),
+        )
+
+    def test_switch(self):
+        for args in (["feature", "--force"], ["--force", "feature"], ["feature", "-f"]):
+            self.assertEqual(
+                parse_args(self.remove, args), (["feature"], {"force": True})
+            )
+        self.assertEqual(
+            parse_args(self.remove, ["feature", "--noforce"]),
+            (["feature"], {"force": False}),
+        )
+        self.assertEqual(
+            parse_args(self.remove, ["feature", "--force=false"]),
+            (["feature"], {"force": False}),
+        )
+
+    def test_value_flag(self):
+        for args in (
+            ["feature", "--remote", "upstream"],
+            ["--remote=upstream", "feature"],
+        ):
+            self.assertEqual(
+                parse_args(self.checkout, args), (["feature"], {"remote": "upstream"})
+            )
+
+    def test_positional_as_flag(self):
+        self.assertEqual(
+            parse_args(self.remove, ["--worktree-name", "feature"]),
+            ([], {"worktree_name": "feature"}),
+        )
+
+    def test_separator(self):
+        self.assertEqual(parse_args(self.remove, ["--", "--force"]), (["--force"], {}))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(DispatchError, "Missing required argument"):
+            parse_args(self.remove, [])
+        with self.assertRaisesRegex(DispatchError, "Unknown flag: --bogus"):
+            parse_args(self.remove, ["feature", "--bogus"])
+        with self.assertRaisesRegex(DispatchError, "Unexpected arguments: other"):
+            parse_args(self.checkout, ["feature", "upstream", "other"])
+        with self.assertRaisesRegex(DispatchError, "expects a value"):
+            parse_args(self.checkout, ["feature", "--remote"])
+        with self.assertRaisesRegex(DispatchError, "expects a boolean"):
+            parse_args(self.remove, ["feature", "--force=maybe"])
+
+
+class ParseDocstringTestCase(TestCase):
+    def test_parse(self):
+        doc = parse_docstring(StubCreateCommand.__call__.__doc__)
+        self.assertEqual(doc.summary, "Create a new worktree.")
+        self.assertEqual(doc.description, "More details.")
+        self.assertEqual(
+            doc.params,
+            {
+                "worktree_name": "The name of the worktree",
+                "base_ref": "The base reference",
+            },
+        )
+
+    def test_empty(self):
+        self.assertEqual(parse_docstring(None), ("", "", {}))
+
+    def test_param_continuation(self):
+        doc = parse_docstring(
+            """
+            Summary.
+
+            :param first: The first line
+                continues here
+            :param second: Another
+            """
+        )
+        self.assertEqual(doc.description, "")
+        self.assertEqual(
+            doc.params,
+            {"first": "The first line continues here", "second": "Another"},
+        )
+
+
+class DispatcherTestCase(TestCase):
+    def setUp(self):
+        self.runtime = mock.Mock(calls=[])
+        self.out = io.StringIO()
+        self.dispatcher = Dispatcher(
+            "worktree", StubCommands(self.runtime), out=self.out
+        )
+
+    def test_command_names(self):
+        self.assertEqual(
+            self.dispatcher.command_names,
+            ["checkout", "create", "list", "remove", "rm", "sync-templates", "version"],
+        )
+
+    def test_call__dispatches(self):
+        self.assertEqual(self.dispatcher(["create", "feature", "main"]), 0)
+        self.assertEqual(self.dispatcher(["rm", "feature", "--force"]), 0)
+        self.assertEqual(self.dispatcher(["version"]), 0)
+        self.assertEqual(
+            self.runtime.calls,
+            [
+                ("create", "feature", ("main",)),
+                ("remove", "feature", True),
+                ("version",),
+            ],
+        )
+
+    def test_call__dashed_command(self):
+        self.assertEqual(self.dispatcher(["sync-templates", "--all"]), 0)
+        self.assertEqual(self.dispatcher(["sync_templates", "a", "--noall"]), 0)
+        self.assertEqual(
+            self.runtime.calls,
+            [("sync-templates", (), True), ("sync-templates", ("a",), False)],
+        )
+
+    def test_call__trailing_underscore_command(self):
+        self.assertEqual(self.dispatcher(["list"]), 0)
+        self.assertEqual(self.runtime.calls, [("list",)])
+
+        self.assertEqual(self.dispatcher(["list", "--help"]), 0)
+        self.assertIn("worktree list - Lists the worktrees", self.out.getvalue())
+
+    def test_call__dashed_command_help(self):
+        self.assertEqual(self.dispatcher([]), 0)
+        self.assertIn("     sync-templates\n", self.out.getvalue())
+        self.assertNotIn("sync_templates", self.out.getvalue())
+
+        self.assertEqual(self.dispatcher(["sync_templates", "--help"]), 0)
+        output = self.out.getvalue()
+        self.assertIn("worktree sync-templates - Sync templates", output)
+        self.assertIn("    --all\n        Default: False", output)
+
+    def test_call__group_help(self):
+        self.assertEqual(self.dispatcher([]), 0)
+        output = self.out.getvalue()
+        self.assertIn("worktree - Stub command group", output)
+        self.assertIn("rm (alias of remove)", output)
+        self.assertIn("Outputs the version", output)
+
+    def test_call__command_help(self):
+        self.assertEqual(self.dispatcher(["create", "--help"]), 0)
+        output = self.out.getvalue()
+        self.assertIn("worktree create WORKTREE_NAME [BASE_REF]...", output)
+        self.assertIn("The name of the worktree", output)
+        self.assertEqual(self.runtime.calls, [])
+
+    @mock.patch("sys.stderr", new_callable=io.StringIO)
+    def test_call__unknown_command(self, mock_stderr):
+        self.assertEqual(self.dispatcher(["bogus"]), 2)
+        self.assertIn("Unknown command: bogus", mock_stderr.getvalue())
+
+    @mock.patch("sys.stderr", new_callable=io.StringIO)
+    def test_call__usage_error(self, mock_stderr):
+        self.assertEqual(self.dispatcher(["remove"]), 2)
+        self.assertIn(
+            "Missing required argument: worktree_name", mock_stderr.getvalue()
+        )
+        self.assertEqual(self.runtime.calls, [])
@@ -0,0 +1,125 @@
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import TestCase
+
+from gh_worktree.execution import ExecRequest
+from gh_worktree.execution import run_all
+
+
+def _python(code: str):
+    return [sys.executable, "-c", code]
+
+
+class RunAllTestCase(TestCase):
+    def test_run_all__captures_in_order(self):
+        results = run_all(
+            [
+                ExecRequest(_python("import time; time.sleep(0.2); print('slow')")),
+                ExecRequest(_python("import sys; print('fast'); sys.exit(3)")),
+                ExecRequest(_python("import sys; sys.stderr.write('oops')")),
+            ]
+        )
+
+        self.assertEqual(
+            [result.output for result in results], [b"slow\n", b"fast\n", b""]
+        )
+        self.assertEqual([result.returncode for result in results], [0, 3, 0])
+        self.assertEqual(results[2].errors, b"oops")
+        with self.assertRaises(subprocess.CalledProcessError):
+            results[1].check_returncode()
+
+    def test_run_all__limits_concurrency(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_path = Path(tmp_dir) / "log"
+            code = (
+                "import sys, time\n"
+                "with open(sys.argv[1], 'a') as f: f.write('start\\n')\n"
+                "time.sleep(0.05)\n"
+                "with open(sys.argv[1], 'a') as f: f.write('end\\n')\n"
+            )
+            run_all(
+                [ExecRequest([*_python(code), str(log_path)]) for _ in range(4)],
+                max_workers=1,
+            )
+
+            self.assertEqual(log_path.read_text().split(), ["start", "end"] * 4)
+
+    def test_run_all__bounds_capture(self):
+        (result,) = run_all(
+            [
+                ExecRequest(
+                    _python(
+                        "import sys; sys.stdout.write('x' * 3000000); "
+                        "sys.stderr.write('y' * 3000000)"
+                    )
+                )
+            ],
+            capture_limit=1024,
+        )
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.output, b"x" * 1024)
+        self.assertEqual(result.errors, b"y" * 1024)
+        self.assertTrue(result.truncated)
+
+    def test_run_all__input(self):
+        (result,) = run_all(
+            [
+                ExecRequest(
+                    _python("import sys; sys.stdout.write(sys.stdin.read().upper())"),
+                    input=b"abc" * 100000,
+                )
+            ]
+        )
+
+        self.assertEqual(result.output, b"ABC" * 100000)
+        self.assertFalse(result.truncated)
+
+    def test_run_all__streams_lines(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            (result,) = run_all(
+                [
+                    ExecRequest(
+                        _python(
+                            "import sys; print('one', flush=True); "
+                            "sys.stderr.write('two\\n'); sys.stdout.write('three')"
+                        ),
+                        stream=True,
+                    )
+                ]
+            )
+
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("Executing: "))
+        self.assertEqual(
+            [line.rsplit("|\033[0m ", 1)[1] for line in lines[1:]],
+            ["one", "two", "three"],
+        )
+        self.assertEqual(result.errors, b"")
+
+    def test_run_all__timeout_kills(self):
+        start = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_all([ExecRequest(_python("import time; time.sleep(30)"))], timeout=0.2)
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_run_all__failure_cancels_others(self):
+        start = time.monotonic()
+        with self.assertRaises(FileNotFoundError):
+            run_all(
+                [
+                    ExecRequest(_python("import time; time.sleep(30)")),
+                    ExecRequest(["gh-worktree-missing-command"]),
+                ],
+                timeout=None,
+            )
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_run_all__empty(self):
+        self.assertEqual(run_all([]), [])
@@ -0,0 +1,281 @@
+import errno
+import hashlib
+import os
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+from string import Template
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.files import copy_file
+from gh_worktree.files import hash_chunks
+from gh_worktree.files import hash_file
+from gh_worktree.files import is_template
+from gh_worktree.files import iter_substituted
+from gh_worktree.files import materialize_file
+from gh_worktree.files import reflink_file
+from gh_worktree.files import scan_template
+from gh_worktree.files import substitute_file
+from gh_worktree.files import write_atomic
+
+
+class FilesTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.src = self.tmp_path / "src"
+        self.dest = self.tmp_path / "dest"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_is_template(self):
+        cases = {
+            b"plain text\n": False,
+            b"costs $5\n": False,
+            b"${NAME}\n": True,
+            b"$NAME\n": True,
+            b"$$\n": True,
+            b"\x89PNG\x00$NAME": False,
+        }
+        for content, expected in cases.items():
+            with self.subTest(content=content):
+                self.src.write_bytes(content)
+                self.assertEqual(is_template(self.src), expected)
+
+    @mock.patch("gh_worktree.files.CHUNK_SIZE", 4)
+    def test_is_template__placeholder_across_chunks(self):
+        self.src.write_bytes(b"abc${NAME}")
+        self.assertTrue(is_template(self.src))
+
+    def test_copy_file(self):
+        self.src.write_bytes(b"\x00\x01binary" * 1000)
+        self.dest.write_bytes(b"previous content that is longer" * 1000)
+
+        copy_file(self.src, self.dest)
+
+        self.assertEqual(self.dest.read_bytes(), self.src.read_bytes())
+
+    @mock.patch("gh_worktree.files.os.sendfile", side_effect=OSError(errno.EINVAL, ""))
+    @mock.patch(
+        "gh_worktree.files.os.copy_file_range",
+        side_effect=OSError(errno.EXDEV, ""),
+        create=True,
+    )
+    def test_copy_file__falls_back(self, mock_copy_file_range, mock_sendfile):
+        self.src.write_bytes(b"content")
+
+        copy_file(self.src, self.dest)
+
+        mock_copy_file_range.assert_called_once()
+        mock_sendfile.assert_called_once()
+        self.assertEqual(self.dest.read_bytes(), b"content")
+
+    @mock.patch(
+        "gh_worktree.files.os.copy_file_range",
+        side_effect=OSError(errno.ENOSPC, ""),
+        create=True,
+    )
+    def test_copy_file__raises(self, mock_copy_file_range):
+        self.src.write_bytes(b"content")
+
+        with self.assertRaises(OSError):
+            copy_file(self.src, self.dest)
+
+    def test_substitute_file(self):
+        self.src.write_text("name: ${NAME}, dir: $DIR, cost: $$5, keep: $OTHER ${\n")
+
+        substitute_file(self.src, self.dest, {"NAME": "repo", "DIR": "/repo"})
+
+        self.assertEqual(
+            self.dest.read_text(),
+            "name: repo, dir: /repo, cost: $5, keep: $OTHER ${\n",
+        )
+
+    def test_substitute_file__matches_template_across_chunks(self):
+        content = "α $NAME-$$NAME ${NAME}x $$$NAME\n$ $NAM$NAME ${NAME" * 3
+        replacements = {"NAME": "value", "NAM": "short"}
+        expected = Template(content).safe_substitute(replacements)
+        self.src.write_text(content)
+
+        for chunk_size in (1, 2, 3, 5, 8, 13):
+            with self.subTest(chunk_size=chunk_size):
+                with mock.patch("gh_worktree.files.CHUNK_SIZE", chunk_size):
+                    substitute_file(self.src, self.dest, replacements)
+                self.assertEqual(self.dest.read_text(), expected)
+
+    def test_substitute_file__matches_template_on_random_content(self):
+        rng = random.Random(0)
+        replacements = {"a": "1", "ab": "2", "_b": "3"}
+        for _ in range(200):
+            content = "".join(
+                rng.choice("$${}ab_1 ") for _ in range(rng.randint(0, 40))
+            )
+            self.src.write_text(content)
+            for chunk_size in (1, 2, 3, 7):
+                with self.subTest(content=content, chunk_size=chunk_size):
+                    with mock.patch("gh_worktree.files.CHUNK_SIZE", chunk_size):
+                        substitute_file(self.src, self.dest, replacements)
+                    self.assertEqual(
+                        self.dest.read_text(),
+                        Template(content).safe_substitute(replacements),
+                    )
+
+    @mock.patch("gh_worktree.files.CHUNK_SIZE", 1024)
+    def test_iter_substituted__streams_after_early_placeholder(self):
+        self.src.write_text("home: $HOME\n" + "plain text\n" * 10000)
+
+        chunks = list(iter_substituted(self.src, {"HOME": "/home"}))
+
+        # one chunk per read, none holding back the rest of the file
+        self.assertEqual(len(chunks), self.src.stat().st_size // 1024 + 2)
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 1024)
+        self.assertEqual(b"".join(chunks), b"home: /home\n" + b"plain text\n" * 10000)
+
+    @mock.patch("gh_worktree.files.CHUNK_SIZE", 4)
+    def test_iter_substituted__holds_back_unterminated_placeholders(self):
+        self.src.write_text("$$$$$$$$ ${NAME $NAME")
+
+        chunks = list(iter_substituted(self.src, {"NAME": "repo"}))
+
+        # escapes are decided as soon as they're paired, and `${NAME` once it's followed by a space
+        self.assertEqual(chunks, [b"$$", b"$$", b" ", b"${NAME ", b"repo"])
+
+    def test_substitute_file__preserves_invalid_utf8(self):
+        self.src.write_bytes(b"\xff\xfe $NAME \xc3\n")
+
+        substitute_file(self.src, self.dest, {"NAME": "repo"})
+
+        self.assertEqual(self.dest.read_bytes(), b"\xff\xfe repo \xc3\n")
+
+    def test_materialize_file__hardlink(self):
+        self.src.write_bytes(b"content")
+
+        self.assertEqual(materialize_file(self.src, self.dest, "hardlink"), "hardlink")
+        self.assertTrue(self.dest.samefile(self.src))
+
+    @mock.patch(
+        "gh_worktree.files.reflink_file", side_effect=OSError(errno.EOPNOTSUPP, "")
+    )
+    @mock.patch("gh_worktree.files.os.link", side_effect=OSError(errno.EXDEV, ""))
+    def test_materialize_file__falls_back_to_copy(self, mock_link, mock_reflink_file):
+        self.src.write_bytes(b"content")
+
+        self.assertEqual(materialize_file(self.src, self.dest, "hardlink"), "copy")
+        mock_link.assert_called_once_with(self.src, self.dest)
+        mock_reflink_file.assert_called_once_with(self.src, self.dest)
+        self.assertEqual(self.dest.read_bytes(), b"content")
+        self.assertFalse(self.dest.samefile(self.src))
+
+    @mock.patch("gh_worktree.files.reflink_file")
+    def test_materialize_file__reflink(self, mock_reflink_file):
+        self.assertEqual(materialize_file(self.src, self.dest, "reflink"), "reflink")
+        mock_reflink_file.assert_called_once_with(self.src, self.dest)
+
+    @mock.patch("gh_worktree.files.reflink_file", side_effect=OSError(errno.EIO, ""))
+    def test_materialize_file__raises(self, mock_reflink_file):
+        with self.assertRaises(OSError):
+            materialize_file(self.src, self.dest, "reflink")
+
+    def test_materialize_file__unknown_strategy(self):
+        with self.assertRaisesRegex(ValueError, "Unknown template strategy: symlink"):
+            materialize_file(self.src, self.dest, "symlink")
+
+    def test_reflink_file(self):
+        self.src.write_bytes(b"content")
+
+        try:
+            reflink_file(self.src, self.dest)
+        except OSError as e:
+            self.skipTest(f"Reflinks aren't supported here: {e}")
+
+        self.assertEqual(self.dest.read_bytes(), b"content")
+
+    def test_scan_template(self):
+        content = b"${NAME} $DIR $$ ${ $1 ${NAME}\n"
+        self.src.write_bytes(content)
+
+        info = scan_template(self.src)
+
+        self.assertEqual(info.hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(info.variables, ["DIR", "NAME"])
+        self.assertFalse(info.static)
+
+    def test_scan_template__static(self):
+        cases = {
+            b"costs $5 ${\n": True,
+            b"$$\n": False,
+            b"\x89PNG\x00$NAME": True,
+        }
+        for content, static in cases.items():
+            with self.subTest(content=content):
+                self.src.write_bytes(content)
+                info = scan_template(self.src)
+                self.assertEqual(info.static, static)
+                self.assertEqual(info.variables, [])
+
+    def test_scan_template__across_chunks(self):
+        content = b"$NAME-$$OTHER ${BRACED}x $$$LONG_NAME\n$ $A$B"
+        self.src.write_bytes(content)
+
+        for chunk_size in (1, 2, 3, 5, 8):
+            with self.subTest(chunk_size=chunk_size):
+                with mock.patch("gh_worktree.files.CHUNK_SIZE", chunk_size):
+                    info = scan_template(self.src)
+                self.assertEqual(
+                    info.variables, ["A", "B", "BRACED", "LONG_NAME", "NAME"]
+                )
+                self.assertEqual(info.hash, hashlib.sha256(content).hexdigest())
+
+    @mock.patch("gh_worktree.files.CHUNK_SIZE", 1024)
+    def test_scan_template__bounded_after_early_placeholder(self):
+        self.src.write_text("home: $HOME\n" + "plain text\n" * 100000)
+
+        tracemalloc.start()
+        try:
+            info = scan_template(self.src)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(info.variables, ["HOME"])
+        # a few chunks, rather than the 1 MiB file
+        self.assertLess(peak, 64 * 1024)
+
+    def test_write_atomic(self):
+        path = self.tmp_path / "nested" / "file.json"
+
+        write_atomic(path, "text")
+        self.assertEqual(path.read_text(), "text")
+        write_atomic(path, b"bytes")
+        self.assertEqual(path.read_bytes(), b"bytes")
+        self.assertEqual(os.listdir(path.parent), ["file.json"])
+
+    def test_write_atomic__keeps_old_content_on_failure(self):
+        path = self.tmp_path / "file.json"
+        path.write_text("old")
+
+        with mock.patch("gh_worktree.files.os.replace", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                write_atomic(path, "new")
+
+        self.assertEqual(path.read_text(), "old")
+        self.assertEqual(os.listdir(self.tmp_path), ["file.json"])
+
+    def test_hash_file(self):
+        self.src.write_bytes(b"content")
+        self.assertEqual(hash_file(self.src), hashlib.sha256(b"content").hexdigest())
+
+    @mock.patch("gh_worktree.files.CHUNK_SIZE", 3)
+    def test_iter_substituted(self):
+        self.src.write_text("$NAME and ${NAME}\n")
+
+        chunks = list(iter_substituted(self.src, {"NAME": "repo"}))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), b"repo and repo\n")
+        self.assertEqual(
+            hash_chunks(chunks), hashlib.sha256(b"repo and repo\n").hexdigest()
+        )
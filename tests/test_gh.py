@@ -1,11 +1,14 @@
 import json
+import os
 import subprocess
+import tempfile
 from pathlib import Path
 from types import SimpleNamespace
 from unittest import mock
 from unittest import TestCase
 
 from gh_worktree.gh import GithubCLI
+from gh_worktree.gh import PR_FIELDS
 
 
 class GithubCLITestCase(TestCase):
@@ -46,3 +49,310 @@ class GithubCLITestCase(TestCase):
             result = cli.repo_status()
 
         self.assertEqual(result, payload)
+
+    def test_pr_list__filters(self):
+        payload = [{"number": 5, "headRefName": "five"}]
+
+        def fake_run(command, capture_output, text, check, cwd):
+            self.assertEqual(command[:4], ["gh", "pr", "list", "--json"])
+            self.assertEqual(
+                command[5:],
+                [
+                    "--limit",
+                    "100",
+                    "--repo",
+                    "octo/repo",
+                    "--label",
+                    "needs-qa",
+                    "--search",
+                    "review-requested:@me",
+                ],
+            )
+            return SimpleNamespace(stdout=json.dumps(payload))
+
+        with mock.patch.object(subprocess, "run", side_effect=fake_run):
+            result = GithubCLI(self.context).pr_list(
+                "octo/repo", label="needs-qa", search="review-requested:@me"
+            )
+
+        self.assertEqual(result, payload)
+
+
+FAKE_GH = """#!/usr/bin/env python3
+import json
+import os
+import sys
+
+with open(os.environ["FAKE_GH_CALLS"], "a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+with open(os.environ["FAKE_GH_RESPONSE"]) as f:
+    sys.stdout.write(f.read())
+sys.exit(int(os.environ.get("FAKE_GH_EXIT", "0")))
+"""
+
+
+def _rest_pr(number: int, merged: bool = False) -> dict:
+    return {
+        "number": number,
+        "user": {"login": "dependabot[bot]", "node_id": "B_1", "type": "Bot"},
+        "base": {"ref": "main"},
+        "head": {
+            "ref": f"branch-{number}",
+            "repo": {
+                "node_id": "R_1",
+                "name": "repo",
+                "owner": {"node_id": "U_1", "login": "octocat"},
+            },
+        },
+        "state": "closed" if merged else "open",
+        "merged_at": "2026-01-01T00:00:00Z" if merged else None,
+        "title": f"PR {number}",
+        "html_url": f"https://github.com/octo/repo/pull/{number}",
+    }
+
+
+def _graphql_pr(number: int, author_type: str = "User") -> dict:
+    return {
+        "number": number,
+        "author": {"__typename": author_type, "login": "octocat", "id": "U_1"},
+        "baseRefName": "main",
+        "headRefName": f"branch-{number}",
+        "headRepository": {"id": "R_1", "name": "repo"},
+        "headRepositoryOwner": {"id": "U_1", "login": "octocat"},
+        "state": "OPEN",
+        "title": f"PR {number}",
+        "url": f"https://github.com/octo/repo/pull/{number}",
+    }
+
+
+class GithubCLIFakeExecutableTestCase(TestCase):
+    """Runs `GithubCLI` against a fake `gh` executable on PATH"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        gh_path = self.tmp_path / "gh"
+        gh_path.write_text(FAKE_GH)
+        gh_path.chmod(0o755)
+        self.calls_path = self.tmp_path / "calls"
+        self.response_path = self.tmp_path / "response"
+        self.environ = mock.patch.dict(
+            os.environ,
+            {
+                "PATH": f"{self.tmp_path}{os.pathsep}{os.environ['PATH']}",
+                "FAKE_GH_CALLS": str(self.calls_path),
+                "FAKE_GH_RESPONSE": str(self.response_path),
+            },
+        )
+        self.environ.start()
+        self.cache_ttl = 300
+        self.context = SimpleNamespace(
+            cwd=self.tmp_path,
+            config_dir=self.tmp_path / "project" / ".gh" / "worktree",
+            get_global_config=lambda: SimpleNamespace(cache_ttl=self.cache_ttl),
+        )
+        self.cli = GithubCLI(self.context)
+
+    def tearDown(self):
+        self.environ.stop()
+        self.tmp_dir.cleanup()
+
+    def _respond(self, response: dict, exit_code: int = 0):
+        self.response_path.write_text(json.dumps(response))
+        os.environ["FAKE_GH_EXIT"] = str(exit_code)
+
+    def _respond_http(self, status: str, headers=(), body=None, exit_code: int = 0):
+        """Responds like `gh api --include`"""
+        lines = [f"HTTP/2.0 {status}", *headers, "", json.dumps(body) if body else ""]
+        self.response_path.write_text("\r\n".join(lines))
+        os.environ["FAKE_GH_EXIT"] = str(exit_code)
+
+    def _calls(self):
+        return [json.loads(line) for line in self.calls_path.read_text().splitlines()]
+
+    def test_pr_statuses__single_request(self):
+        self._respond(
+            {
+                "data": {
+                    "repository": {
+                        "pr12": _graphql_pr(12),
+                        "pr34": _graphql_pr(34, author_type="Bot"),
+                    }
+                }
+            }
+        )
+
+        prs = self.cli.pr_statuses([12, "34", "12"], "octo/repo")
+
+        (call,) = self._calls()
+        self.assertEqual(call[:2], ["api", "graphql"])
+        self.assertIn("owner=octo", call)
+        self.assertIn("name=repo", call)
+        query = next(arg for arg in call if arg.startswith("query="))
+        self.assertIn("pr12: pullRequest(number: 12)", query)
+        self.assertIn("pr34: pullRequest(number: 34)", query)
+
+        self.assertEqual(list(prs), ["12", "34"])
+        self.assertEqual(set(prs["12"]), set(PR_FIELDS))
+        self.assertEqual(prs["12"]["headRefName"], "branch-12")
+        self.assertEqual(
+            prs["12"]["author"],
+            {"id": "U_1", "is_bot": False, "login": "octocat"},
+        )
+        self.assertEqual(prs["34"]["author"]["login"], "app/octocat")
+        self.assertTrue(prs["34"]["author"]["is_bot"])
+
+    @mock.patch("gh_worktree.gh.PR_BATCH_SIZE", 2)
+    def test_pr_statuses__batches(self):
+        self._respond(
+            {"data": {"repository": {f"pr{n}": _graphql_pr(n) for n in (1, 2, 3)}}}
+        )
+
+        prs = self.cli.pr_statuses([1, 2, 3], "octo/repo")
+
+        self.assertEqual(list(prs), ["1", "2", "3"])
+        self.assertEqual(len(self._calls()), 2)
+
+    def test_pr_statuses__missing(self):
+        self._respond(
+            {
+                "data": {"repository": {"pr1": _graphql_pr(1), "pr2": None}},
+                "errors": [{"message": "Could not resolve to a PullRequest"}],
+            },
+            exit_code=1,
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "Couldn't find PRs in octo/repo: #2"):
+            self.cli.pr_statuses([1, 2], "octo/repo")
+
+    def test_pr_statuses__missing_ok(self):
+        self._respond(
+            {
+                "data": {"repository": {"pr1": _graphql_pr(1), "pr2": None}},
+                "errors": [{"message": "Could not resolve to a PullRequest"}],
+            },
+            exit_code=1,
+        )
+
+        prs = self.cli.pr_statuses([1, 2], "octo/repo", missing_ok=True)
+
+        self.assertEqual(list(prs), ["1"])
+
+    def test_pr_statuses__failure(self):
+        self._respond({"message": "Bad credentials"}, exit_code=1)
+
+        with self.assertRaisesRegex(RuntimeError, "GraphQL request failed"):
+            self.cli.pr_statuses([1], "octo/repo")
+
+    def test_pr_statuses__empty(self):
+        self.assertEqual(self.cli.pr_statuses([], "octo/repo"), {})
+        self.assertFalse(self.calls_path.exists())
+
+    def test_pr_status__cached(self):
+        self._respond_http("200 OK", ['Etag: W/"abc"'], _rest_pr(12, merged=True))
+
+        pr = self.cli.pr_status(12, owner_repo="octo/repo")
+        self.assertEqual(self.cli.pr_status("12", owner_repo="octo/repo"), pr)
+
+        self.assertEqual(
+            self._calls(), [["api", "--include", "repos/octo/repo/pulls/12"]]
+        )
+        self.assertEqual(set(pr), set(PR_FIELDS))
+        self.assertEqual(pr["state"], "MERGED")
+        self.assertEqual(pr["headRefName"], "branch-12")
+        self.assertEqual(pr["headRepositoryOwner"], {"id": "U_1", "login": "octocat"})
+        self.assertEqual(
+            pr["author"],
+            {"id": "B_1", "is_bot": True, "login": "app/dependabot"},
+        )
+        self.assertTrue(
+            (
+                self.context.config_dir / "cache" / "octo" / "repo" / "pr-12.json"
+            ).exists()
+        )
+
+    def test_pr_status__revalidates(self):
+        self.cache_ttl = 0
+        self._respond_http("200 OK", ['Etag: W/"abc"'], _rest_pr(12))
+        pr = self.cli.pr_status(12, owner_repo="octo/repo")
+
+        self._respond_http("304 Not Modified", exit_code=1)
+
+        self.assertEqual(self.cli.pr_status(12, owner_repo="octo/repo"), pr)
+        self.assertEqual(
+            self._calls()[1],
+            [
+                "api",
+                "--include",
+                "repos/octo/repo/pulls/12",
+                "-H",
+                'If-None-Match: W/"abc"',
+            ],
+        )
+
+    def test_pr_status__failure(self):
+        self._respond_http("404 Not Found", body={"message": "Not Found"}, exit_code=1)
+
+        with self.assertRaisesRegex(RuntimeError, "GitHub API request failed"):
+            self.cli.pr_status(12, owner_repo="octo/repo")
+
+    def test_pr_status__offline(self):
+        self.cli.offline = True
+        with self.assertRaisesRegex(RuntimeError, "no cached pr 12 of octo/repo"):
+            self.cli.pr_status(12, owner_repo="octo/repo")
+
+        self.cli.offline = False
+        self.cache_ttl = 0
+        self._respond_http("200 OK", body=_rest_pr(12))
+        pr = self.cli.pr_status(12, owner_repo="octo/repo")
+
+        self.cli.offline = True
+        # stale, but served all the same
+        self.assertEqual(self.cli.pr_status(12, owner_repo="octo/repo"), pr)
+        self.assertEqual(len(self._calls()), 1)
+
+    def test_pr_statuses__cached(self):
+        self._respond({"data": {"repository": {"pr1": _graphql_pr(1)}}})
+        self.cli.pr_statuses([1], "octo/repo")
+        self._respond({"data": {"repository": {"pr2": _graphql_pr(2)}}})
+
+        prs = self.cli.pr_statuses([2, 1], "octo/repo")
+
+        self.assertEqual(list(prs), ["2", "1"])
+        query = next(arg for arg in self._calls()[1] if arg.startswith("query="))
+        self.assertIn("pr2: pullRequest", query)
+        self.assertNotIn("pr1: pullRequest", query)
+
+    def test_pr_statuses__offline(self):
+        self._respond({"data": {"repository": {"pr1": _graphql_pr(1)}}})
+        self.cli.pr_statuses([1], "octo/repo")
+        self.cli.offline = True
+
+        self.assertEqual(list(self.cli.pr_statuses([1], "octo/repo")), ["1"])
+        with self.assertRaisesRegex(RuntimeError, "no cached PRs of octo/repo: #2"):
+            self.cli.pr_statuses([1, 2], "octo/repo")
+        self.assertEqual(
+            list(self.cli.pr_statuses([1, 2], "octo/repo", missing_ok=True)), ["1"]
+        )
+        with self.assertRaisesRegex(RuntimeError, "Offline"):
+            self.cli.pr_list("octo/repo")
+        self.assertEqual(len(self._calls()), 1)
+
+    def test_repo_status__cached(self):
+        self._respond_http(
+            "200 OK",
+            body={
+                "default_branch": "main",
+                "name": "repo",
+                "owner": {"node_id": "U_1", "login": "octo"},
+                "html_url": "https://github.com/octo/repo",
+                "private": False,
+            },
+        )
+
+        repo = self.cli.repo_status("octo/repo")
+
+        self.assertEqual(repo["defaultBranchRef"], {"name": "main"})
+        self.assertEqual(repo["owner"]["login"], "octo")
+        self.assertEqual(self.cli.repo_status("octo/repo"), repo)
+        self.assertEqual(self._calls(), [["api", "--include", "repos/octo/repo"]])
@@ -1,10 +1,49 @@
+import io
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from types import SimpleNamespace
+from typing import Dict
+from typing import List
+from typing import Tuple
 from unittest import mock
+from unittest import skipUnless
 from unittest import TestCase
 
+from gh_worktree.execution import ExecRequest
+from gh_worktree.execution import ExecResult
 from gh_worktree.git import GitCLI
+from gh_worktree.git import GitObject
+from gh_worktree.git import GitObjectReader
+from gh_worktree.git import GitObjectReaderError
 from gh_worktree.git import GitRemote
+from gh_worktree.git import GitStatus
+from gh_worktree.git import GitTreeEntry
+from gh_worktree.git import GitWorktree
+from gh_worktree.git import parse_status
+
+
+class FakeBatchProcess:
+    def __init__(self, output: bytes, returncode: int = 0):
+        self.stdin = io.BytesIO()
+        self.stdin.close = lambda: None
+        self.stdout = io.BytesIO(output)
+        self.returncode = returncode
+        self.killed = False
+
+    def kill(self):
+        self.killed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
 
 
 class GitCLITestCase(TestCase):
@@ -49,6 +88,79 @@ class GitCLITestCase(TestCase):
             ["git", "clone", "--bare", "src_uri", "dest_dir"], cwd=Path("/test/tmp")
         )
 
+    def test_clone__reference(self):
+        self.cli.clone("src_uri", "dest_dir", reference="/cache/repo.git")
+        self.mock_stream_exec.assert_called_once_with(
+            ["git", "clone", "--bare", "--reference", "/cache/repo.git"]
+            + ["src_uri", "dest_dir"],
+            cwd=Path("/test/tmp"),
+        )
+
+    def test_clone__partial_shallow(self):
+        self.cli.clone(
+            "src_uri",
+            "dest_dir",
+            filter_spec="blob:none",
+            depth=10,
+            shallow_since="2024-01-01",
+        )
+        self.mock_stream_exec.assert_called_once_with(
+            ["git", "clone", "--bare", "--filter=blob:none", "--depth=10"]
+            + ["--shallow-since=2024-01-01", "src_uri", "dest_dir"],
+            cwd=Path("/test/tmp"),
+        )
+
+    def test_fetch_objects(self):
+        self.cli.fetch_objects([])
+        self.mock_stream_exec.assert_not_called()
+
+        self.cli.fetch_objects(["abc", "def"])
+        self.mock_stream_exec.assert_called_once_with(
+            [
+                "git",
+                "-c",
+                "fetch.negotiationAlgorithm=noop",
+                "fetch",
+                "--no-tags",
+                "--no-write-fetch-head",
+                "--recurse-submodules=no",
+                "--filter=blob:none",
+                "origin",
+                "abc",
+                "def",
+            ],
+            cwd=Path("/test/tmp"),
+        )
+
+    def test_update_reference(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            reference_dir = Path(tmp_dir) / "repo.git"
+            self.cli.update_reference("src_uri", reference_dir)
+            git_dir = f"--git-dir={reference_dir}"
+            self.assertEqual(
+                [args[0] for args, _ in self.mock_stream_exec.call_args_list],
+                [
+                    ["git", "clone", "--bare", "src_uri", str(reference_dir)],
+                    ["git", git_dir, "config", "gc.auto", "0"],
+                    ["git", git_dir, "config", "gc.pruneExpire", "never"],
+                ],
+            )
+
+            reference_dir.mkdir()
+            self.cli.update_reference("src_uri", reference_dir)
+            self.mock_stream_exec.assert_called_with(
+                [
+                    "git",
+                    f"--git-dir={reference_dir}",
+                    "fetch",
+                    "--prune",
+                    "src_uri",
+                    "+refs/heads/*:refs/heads/*",
+                    "+refs/tags/*:refs/tags/*",
+                ],
+                cwd=Path("/test/tmp"),
+            )
+
     def test_config(self):
         self.cli.config("user.name", "foo")
         self.mock_stream_exec.assert_called_once_with(
@@ -65,12 +177,91 @@ class GitCLITestCase(TestCase):
         self.assertEqual(lines, ["line1", "line2"])
 
     def test_cat_file(self):
-        self.mock_iter_output.return_value = ["content"]
-        lines = list(self.cli.cat_file("main", "file.txt"))
-        self.mock_iter_output.assert_called_once_with(
-            ["git", "cat-file", "-p", "main:file.txt"], cwd=Path("/test/tmp")
+        with mock.patch.object(self.cli, "read_object") as mock_read_object:
+            mock_read_object.return_value = GitObject(
+                "abc123", "blob", 14, b"line1\nline2\n"
+            )
+            lines = list(self.cli.cat_file("main", "file.txt"))
+        mock_read_object.assert_called_once_with("main:file.txt")
+        self.assertEqual(lines, ["line1", "line2"])
+
+    def test_cat_file__missing(self):
+        with mock.patch.object(self.cli, "read_object", return_value=None):
+            with self.assertRaisesRegex(RuntimeError, "main:file.txt"):
+                list(self.cli.cat_file("main", "file.txt"))
+
+    def test_read_object__falls_back_when_coprocess_dies(self):
+        reader = mock.Mock()
+        reader.read.side_effect = GitObjectReaderError("died")
+        self.cli._object_readers[(str(self.context.cwd), False)] = reader
+
+        with mock.patch("gh_worktree.git.read_output") as mock_read_output:
+            mock_read_output.return_value = b"abc123 blob 2\nhi\n"
+            git_object = self.cli.read_object("main:file.txt")
+
+        mock_read_output.assert_called_once_with(
+            ["git", "cat-file", "--batch"],
+            cwd=Path("/test/tmp"),
+            input=b"main:file.txt\n",
         )
-        self.assertEqual(lines, ["content"])
+        self.assertEqual(git_object, GitObject("abc123", "blob", 2, b"hi"))
+
+    def test_close(self):
+        reader = mock.Mock()
+        self.cli._object_readers[(str(self.context.cwd), True)] = reader
+        self.cli.close()
+        reader.close.assert_called_once_with()
+        self.assertEqual(self.cli._object_readers, {})
+
+    @mock.patch("gh_worktree.git.read_output")
+    def test_iter_tree(self, mock_read_output):
+        mock_read_output.return_value = (
+            b"100755 blob abc123\t.gh/worktree/hooks/post_create\0"
+            b"100644 blob def456\t.gh/worktree/templates/with\ttab.txt\0"
+        )
+        entries = list(self.cli.iter_tree("main", ".gh/worktree"))
+        mock_read_output.assert_called_once_with(
+            ["git", "ls-tree", "-r", "-z", "main", "--", ".gh/worktree"],
+            cwd=Path("/test/tmp"),
+        )
+        self.assertEqual(
+            entries,
+            [
+                GitTreeEntry(
+                    "100755", "blob", "abc123", ".gh/worktree/hooks/post_create"
+                ),
+                GitTreeEntry(
+                    "100644", "blob", "def456", ".gh/worktree/templates/with\ttab.txt"
+                ),
+            ],
+        )
+
+    @mock.patch("gh_worktree.git.subprocess.Popen")
+    def test_cat_file_batch(self, mock_popen):
+        process = FakeBatchProcess(
+            b"abc123 blob 6\nhello\n\n" b"def456 blob 3\n\x00\xff\n\n"
+        )
+        mock_popen.return_value = process
+
+        contents = list(self.cli.cat_file_batch(["abc123", "def456"]))
+
+        self.assertEqual(mock_popen.call_args[0][0], ["git", "cat-file", "--batch"])
+        self.assertEqual(process.stdin.getvalue(), b"abc123\ndef456\n")
+        self.assertEqual(contents, [("abc123", b"hello\n"), ("def456", b"\x00\xff\n")])
+
+    @mock.patch("gh_worktree.git.subprocess.Popen")
+    def test_cat_file_batch__missing(self, mock_popen):
+        process = FakeBatchProcess(b"abc123 missing\n")
+        mock_popen.return_value = process
+
+        with self.assertRaisesRegex(RuntimeError, "Could not read git object: abc123"):
+            list(self.cli.cat_file_batch(["abc123"]))
+        self.assertTrue(process.killed)
+
+    @mock.patch("gh_worktree.git.subprocess.Popen")
+    def test_cat_file_batch__empty(self, mock_popen):
+        self.assertEqual(list(self.cli.cat_file_batch([])), [])
+        mock_popen.assert_not_called()
 
     def test_fetch(self):
         self.cli.fetch()
@@ -78,9 +269,16 @@ class GitCLITestCase(TestCase):
             ["git", "fetch", "origin"], cwd=Path("/test/tmp")
         )
 
-        self.cli.fetch(remote="upstream", refspec="master")
+        self.cli.fetch(remote="upstream", refspec="master", depth=1)
         self.mock_stream_exec.assert_called_with(
-            ["git", "fetch", "upstream", "master"], cwd=Path("/test/tmp")
+            ["git", "fetch", "--depth=1", "upstream", "master"], cwd=Path("/test/tmp")
+        )
+
+    def test_fetch_many(self):
+        self.cli.fetch_many("origin", ["pull/1/head:one", "pull/2/head:two"])
+        self.mock_stream_exec.assert_called_once_with(
+            ["git", "fetch", "origin", "pull/1/head:one", "pull/2/head:two"],
+            cwd=Path("/test/tmp"),
         )
 
     def test_remote(self):
@@ -102,15 +300,53 @@ class GitCLITestCase(TestCase):
 
     def test_add_worktree(self):
         self.cli.add_worktree("new-branch", "main")
-        self.mock_stream_exec.assert_called_once_with(
-            ["git", "worktree", "add", "-b", "new-branch", "--", "new-branch", "main"],
-            cwd=Path("/test/tmp"),
+        self.assertEqual(
+            [args[0] for args, _ in self.mock_stream_exec.call_args_list],
+            [
+                [
+                    "git",
+                    "worktree",
+                    "add",
+                    "--no-checkout",
+                    "-b",
+                    "new-branch",
+                    "--",
+                    "new-branch",
+                    "main",
+                ],
+                ["git", "-C", "new-branch", "checkout"],
+            ],
         )
 
     def test_open_worktree(self):
         self.cli.open_worktree("existing-branch")
-        self.mock_stream_exec.assert_called_once_with(
-            ["git", "worktree", "add", "--", "existing-branch"], cwd=Path("/test/tmp")
+        self.assertEqual(
+            [args[0] for args, _ in self.mock_stream_exec.call_args_list],
+            [
+                ["git", "worktree", "add", "--no-checkout", "--", "existing-branch"],
+                ["git", "-C", "existing-branch", "checkout"],
+            ],
+        )
+
+    def test_open_worktree__sparse(self):
+        self.cli.open_worktree("existing-branch", sparse_cones=["web", "shared/ui"])
+        self.assertEqual(
+            [args[0] for args, _ in self.mock_stream_exec.call_args_list],
+            [
+                ["git", "worktree", "add", "--no-checkout", "--", "existing-branch"],
+                [
+                    "git",
+                    "-C",
+                    "existing-branch",
+                    "sparse-checkout",
+                    "set",
+                    "--cone",
+                    "--",
+                    "web",
+                    "shared/ui",
+                ],
+                ["git", "-C", "existing-branch", "checkout"],
+            ],
         )
 
     def test_open_worktree_validation(self):
@@ -130,3 +366,348 @@ class GitCLITestCase(TestCase):
             ["git", "worktree", "remove", "--force", "--", "old-tree"],
             cwd=Path("/test/tmp"),
         )
+
+    def _overlapping(self, func, names: List[str]) -> Dict[str, bool]:
+        """Runs func on each name in threads, returning which git commands overlapped others"""
+        running = []
+        overlapped = {}
+        barrier = threading.Barrier(len(names), timeout=1)
+
+        def stream_exec(command, cwd):
+            if command[1] == "-C":
+                # every populating checkout waits for the others, so they must run at once
+                barrier.wait()
+            running.append(command)
+            overlapped[command[1]] = (
+                overlapped.get(command[1], False) or len(running) > 1
+            )
+            time.sleep(0.01)
+            running.remove(command)
+            return 0
+
+        self.mock_stream_exec.side_effect = stream_exec
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            list(executor.map(func, names))
+        return overlapped
+
+    def test_add_worktree__locks_only_metadata(self):
+        overlapped = self._overlapping(
+            lambda name: self.cli.add_worktree(name, "main"), ["a", "b", "c", "d"]
+        )
+
+        self.assertEqual(overlapped, {"worktree": False, "-C": True})
+
+    def test_remove_worktree__serialized(self):
+        overlapped = self._overlapping(self.cli.remove_worktree, ["a", "b", "c", "d"])
+
+        self.assertEqual(overlapped, {"worktree": False})
+
+    @mock.patch("gh_worktree.git.read_output")
+    def test_list_worktrees(self, mock_read_output):
+        mock_read_output.return_value = (
+            b"worktree /repo/.bare\0bare\0\0"
+            b"worktree /repo/det\0HEAD abc123\0detached\0\0"
+            b"worktree /repo/feature/x\0HEAD def456\0branch refs/heads/feature/x\0"
+            b"locked reason\0prunable gitdir file points to non-existent location\0\0"
+        )
+
+        self.assertEqual(
+            self.cli.list_worktrees(),
+            [
+                GitWorktree(Path("/repo/.bare"), None, None, True, False, False, False),
+                GitWorktree(
+                    Path("/repo/det"), "abc123", None, False, True, False, False
+                ),
+                GitWorktree(
+                    Path("/repo/feature/x"),
+                    "def456",
+                    "feature/x",
+                    False,
+                    False,
+                    True,
+                    True,
+                ),
+            ],
+        )
+        mock_read_output.assert_called_once_with(
+            ["git", "worktree", "list", "--porcelain", "-z"], cwd=Path("/test/tmp")
+        )
+
+    @mock.patch("gh_worktree.git.read_output")
+    def test_status(self, mock_read_output):
+        mock_read_output.return_value = (
+            b"# branch.oid abc123\0# branch.head feature\0"
+            b"# branch.upstream origin/feature\0# branch.ab +2 -1\0"
+            b"1 M. N... 100644 100644 100644 abc def staged.txt\0"
+            b"1 .M N... 100644 100644 100644 abc def unstaged.txt\0"
+            b"2 R. N... 100644 100644 100644 abc def R100 new.txt\0old.txt\0"
+            b"u UU N... 100644 100644 100644 100644 abc def ghi conflict.txt\0"
+            b"? untracked.txt\0"
+        )
+
+        self.assertEqual(
+            self.cli.status(Path("/repo/feature")),
+            GitStatus("feature", "origin/feature", 2, 1, 2, 1, 1, 1),
+        )
+        mock_read_output.assert_called_once_with(
+            ["git", "status", "--porcelain=v2", "--branch", "-z"],
+            cwd=Path("/repo/feature"),
+            quiet=True,
+        )
+
+    @mock.patch("gh_worktree.execution.run_all")
+    def test_statuses(self, mock_run_all):
+        mock_run_all.return_value = [
+            ExecResult(
+                [], 0, b"# branch.oid abc123\0# branch.head feature\0", b"", False
+            ),
+            ExecResult([], 128, b"", b"fatal: not a git repository", False),
+        ]
+        paths = [Path("/repo/feature"), Path("/repo/gone")]
+
+        self.assertEqual(
+            self.cli.statuses(paths, max_workers=2),
+            [GitStatus("feature", None, None, None, 0, 0, 0, 0), None],
+        )
+        mock_run_all.assert_called_once_with(
+            [
+                ExecRequest(
+                    ["git", "status", "--porcelain=v2", "--branch", "-z"], cwd=path
+                )
+                for path in paths
+            ],
+            max_workers=2,
+        )
+
+    def test_parse_status__detached_without_upstream(self):
+        self.assertEqual(
+            parse_status(b"# branch.oid abc123\0# branch.head (detached)\0"),
+            GitStatus(None, None, None, None, 0, 0, 0, 0),
+        )
+
+
+@skipUnless(shutil.which("git"), "git is not installed")
+class GitObjectReaderTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        subprocess.run(["git", "init", "-q"], cwd=self.tmp_path, check=True)
+        self.blob = (
+            subprocess.run(
+                ["git", "hash-object", "-w", "--stdin"],
+                input=b"hello\x00world\n",
+                capture_output=True,
+                check=True,
+                cwd=self.tmp_path,
+            )
+            .stdout.decode("utf-8")
+            .strip()
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read(self):
+        reader = GitObjectReader(self.tmp_path)
+        self.addCleanup(reader.close)
+
+        git_object = reader.read(self.blob)
+        self.assertEqual(
+            git_object, GitObject(self.blob, "blob", 12, b"hello\x00world\n")
+        )
+        # the same coprocess answers subsequent reads
+        process = reader._process
+        self.assertEqual(reader.read(self.blob).content, b"hello\x00world\n")
+        self.assertIs(reader._process, process)
+
+    def test_read__check_only(self):
+        reader = GitObjectReader(self.tmp_path, check_only=True)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.read(self.blob), GitObject(self.blob, "blob", 12, None))
+
+    def test_read__missing(self):
+        reader = GitObjectReader(self.tmp_path)
+        self.addCleanup(reader.close)
+        self.assertIsNone(reader.read("0" * 40))
+
+    def test_read__restarts_dead_coprocess(self):
+        reader = GitObjectReader(self.tmp_path)
+        self.addCleanup(reader.close)
+        reader.read(self.blob)
+        reader._process.kill()
+        reader._process.wait()
+
+        self.assertEqual(reader.read(self.blob).content, b"hello\x00world\n")
+
+    def test_read__rejects_newline(self):
+        reader = GitObjectReader(self.tmp_path)
+        with self.assertRaises(ValueError):
+            reader.read("main\nHEAD")
+
+
+@skipUnless(shutil.which("git"), "git is not installed")
+class GitCloneTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.src = self.tmp_path / "src"
+        self.src.mkdir()
+        self._git(self.src, "init", "-q", "-b", "main")
+        self._commit("first")
+        self.cli = GitCLI(SimpleNamespace(cwd=self.tmp_path))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _git(cwd: Path, *args: str) -> bytes:
+        return subprocess.run(
+            ["git", "-c", "user.name=a", "-c", "user.email=a@b", *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+        ).stdout
+
+    def _commit(self, message: str):
+        (self.src / "file.txt").write_text(message)
+        self._git(self.src, "add", "file.txt")
+        self._git(self.src, "commit", "-q", "-m", message)
+
+    def test_clone__borrows_reference_objects(self):
+        reference_dir = self.tmp_path / "cache" / "repo.git"
+        with redirect_stdout(io.StringIO()):
+            self.cli.update_reference(str(self.src), reference_dir)
+            self._commit("second")
+            # refreshed with a fetch
+            self.cli.update_reference(str(self.src), reference_dir)
+            self.cli.clone(
+                str(self.src), str(self.tmp_path / "project"), str(reference_dir)
+            )
+
+        head = self._git(self.src, "rev-parse", "main")
+        self.assertEqual(self._git(reference_dir, "rev-parse", "main"), head)
+        # gc in the cache mustn't delete objects the project borrows
+        self.assertEqual(self._git(reference_dir, "config", "gc.auto"), b"0\n")
+        self.assertEqual(
+            self._git(reference_dir, "config", "gc.pruneExpire"), b"never\n"
+        )
+        alternates = self.tmp_path / "project" / "objects" / "info" / "alternates"
+        self.assertEqual(
+            Path(alternates.read_text().strip()).resolve(),
+            (reference_dir / "objects").resolve(),
+        )
+        self.assertEqual(
+            self._git(self.tmp_path / "project", "rev-parse", "main"), head
+        )
+
+    def test_fetch_objects__partial_clone(self):
+        self._git(self.src, "config", "uploadpack.allowFilter", "true")
+        self._git(self.src, "config", "uploadpack.allowAnySHA1InWant", "true")
+        project = self.tmp_path / "project"
+        with redirect_stdout(io.StringIO()):
+            self.cli.clone(self.src.as_uri(), str(project), filter_spec="blob:none")
+            blob = self._git(project, "rev-parse", "main:file.txt").decode().strip()
+            self.assertIn(f"?{blob}", self._missing(project))
+
+            GitCLI(SimpleNamespace(cwd=project)).fetch_objects([blob])
+
+        self.assertNotIn(f"?{blob}", self._missing(project))
+        self.assertEqual(self._git(project, "cat-file", "blob", blob), b"first")
+
+    def test_add_worktree__sparse(self):
+        for path in ("web/app.js", "api/app.py"):
+            (self.src / path).parent.mkdir()
+            (self.src / path).write_text(path)
+        self._git(self.src, "add", ".")
+        self._git(self.src, "commit", "-q", "-m", "dirs")
+        project = self.tmp_path / "project"
+        cli = GitCLI(SimpleNamespace(cwd=project))
+        with redirect_stdout(io.StringIO()):
+            self.cli.clone(str(self.src), str(project))
+            cli.add_worktree("full", "main")
+            cli.add_worktree("sparse", "main", sparse_cones=["web"])
+
+        self.assertTrue((project / "full" / "api" / "app.py").exists())
+        self.assertTrue((project / "sparse" / "web" / "app.js").exists())
+        self.assertTrue((project / "sparse" / "file.txt").exists())
+        self.assertFalse((project / "sparse" / "api").exists())
+
+    def _project(self) -> Tuple[Path, GitCLI]:
+        project = self.tmp_path / "project"
+        cli = GitCLI(SimpleNamespace(cwd=project))
+        with redirect_stdout(io.StringIO()):
+            self.cli.clone(str(self.src), str(project))
+            cli.add_worktree("feature", "main")
+        return project, cli
+
+    def test_merged_branches__new_branch(self):
+        project, cli = self._project()
+
+        with redirect_stdout(io.StringIO()):
+            merged = cli.merged_branches("main")
+            tips = [cli.rev_parse("refs/heads/feature"), cli.rev_parse("main")]
+
+        # a branch without commits of its own is merged, so `remove --merged` compares tips
+        self.assertEqual(merged, {"main", "feature"})
+        head = self._git(self.src, "rev-parse", "main").decode().strip()
+        self.assertEqual(tips, [head, head])
+
+    def test_remove_worktree(self):
+        project, cli = self._project()
+
+        with redirect_stdout(io.StringIO()):
+            cli.remove_worktree("feature")
+
+        self.assertFalse((project / "feature").exists())
+        self.assertFalse((project / "worktrees" / "feature").exists())
+
+    def _refused_removal(self, cli: GitCLI, name: str, force: bool = False) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            with self.assertRaisesRegex(RuntimeError, "Command failed"):
+                cli.remove_worktree(name, force=force)
+        return out.getvalue()
+
+    def test_remove_worktree__refuses_changes(self):
+        project, cli = self._project()
+        (project / "feature" / "file.txt").write_text("changed")
+
+        output = self._refused_removal(cli, "feature")
+        self.assertIn("contains modified or untracked files", output)
+        self.assertEqual((project / "feature" / "file.txt").read_text(), "changed")
+
+        with redirect_stdout(io.StringIO()):
+            cli.remove_worktree("feature", force=True)
+        self.assertFalse((project / "feature").exists())
+
+    def test_remove_worktree__refuses_submodules(self):
+        project, cli = self._project()
+        self._git(
+            project / "feature",
+            "-c",
+            "protocol.file.allow=always",
+            "submodule",
+            "add",
+            "-q",
+            str(self.src),
+            "sub",
+        )
+        self._git(project / "feature", "commit", "-q", "-m", "sub")
+
+        output = self._refused_removal(cli, "feature")
+        self.assertIn("containing submodules", output)
+        self.assertTrue((project / "feature" / "file.txt").exists())
+        self.assertTrue((project / "feature" / "sub" / "file.txt").exists())
+
+    def test_remove_worktree__refuses_locked(self):
+        project, cli = self._project()
+        self._git(project, "worktree", "lock", "feature")
+
+        output = self._refused_removal(cli, "feature", force=True)
+        self.assertIn("locked working tree", output)
+        self.assertTrue((project / "feature" / "file.txt").exists())
+
+    def _missing(self, project: Path) -> str:
+        return self._git(
+            project, "rev-list", "--objects", "--missing=print", "main"
+        ).decode()
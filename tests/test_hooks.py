@@ -2,14 +2,17 @@ import hashlib
 import os
 import stat
 import tempfile
+import threading
 from pathlib import Path
 from unittest import mock
 from unittest import TestCase
 
+from gh_worktree.config import GlobalConfig
 from gh_worktree.context import Context
 from gh_worktree.hooks import Hook
 from gh_worktree.hooks import HookExists
 from gh_worktree.hooks import Hooks
+from gh_worktree.jobs import HookJobs
 
 
 class HooksTestCase(TestCase):
@@ -102,6 +105,239 @@ class HooksTestCase(TestCase):
         self.assertFalse(self.hooks.fire(Hook.pre_init, "arg1"))
         mock_stream_exec.assert_not_called()
 
+    def _write_hook(self, path: Path, content: str = "echo ok"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"#!/bin/sh\n{content}\n")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        return str(path)
+
+    def _use_config_dirs(self, global_config: GlobalConfig):
+        """Points the hooks at a global and a project hooks dir within the temp dir"""
+        global_hooks_path = self.tmp_path / "global" / "hooks"
+        global_hooks_path.mkdir(parents=True)
+        self.context.get_global_config = lambda: global_config
+        config_dirs_patcher = mock.patch.object(
+            self.hooks,
+            "iter_config_dirs",
+            return_value=[global_hooks_path, self.hooks_path],
+        )
+        config_dirs_patcher.start()
+        self.addCleanup(config_dirs_patcher.stop)
+        return global_hooks_path
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    def test_plan__serial(self, mock_check_allowed):
+        global_hooks_path = self._use_config_dirs(GlobalConfig())
+        global_hook = self._write_hook(global_hooks_path / "post_create")
+        project_hook = self._write_hook(self.hooks_path / "post_create")
+
+        self.assertEqual(
+            self.hooks._plan(Hook.post_create),
+            {global_hook: set(), project_hook: {global_hook}},
+        )
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    def test_plan__hook_dir(self, mock_check_allowed):
+        self._use_config_dirs(GlobalConfig())
+        scripts_path = self.hooks_path / "post_create.d"
+        hook = self._write_hook(self.hooks_path / "post_create")
+        deps = self._write_hook(scripts_path / "10-deps")
+        index = self._write_hook(scripts_path / "20-index")
+        build = self._write_hook(scripts_path / "30-build", "# after: 10-deps, missing")
+        (scripts_path / ".hidden").write_text("ignored")
+
+        self.assertEqual(
+            self.hooks._plan(Hook.post_create),
+            {
+                hook: set(),
+                deps: {hook},
+                index: {hook},
+                build: {hook, deps},
+            },
+        )
+        self.assertEqual(mock_check_allowed.call_count, 4)
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    def test_plan__parallel(self, mock_check_allowed):
+        global_config = GlobalConfig()
+        global_config.update(parallel_hooks=[Hook.post_create.name])
+        global_hooks_path = self._use_config_dirs(global_config)
+        global_hook = self._write_hook(global_hooks_path / "post_create")
+        project_hook = self._write_hook(self.hooks_path / "post_create.d" / "setup")
+
+        self.assertEqual(
+            self.hooks._plan(Hook.post_create, parallel=True),
+            {global_hook: set(), project_hook: set()},
+        )
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec")
+    def test_fire__parallel(self, mock_stream_exec, mock_check_allowed):
+        global_config = GlobalConfig()
+        global_config.update(parallel_hooks=[Hook.post_create.name])
+        global_hooks_path = self._use_config_dirs(global_config)
+        global_hook = self._write_hook(global_hooks_path / "post_create")
+        project_hook = self._write_hook(self.hooks_path / "post_create")
+
+        started = threading.Barrier(2, timeout=5)
+
+        def fake_stream_exec(command_args, cwd):
+            # both hooks must be running at once to pass the barrier
+            started.wait()
+            return 0
+
+        mock_stream_exec.side_effect = fake_stream_exec
+
+        self.assertTrue(self.hooks.fire(Hook.post_create, "arg1"))
+        mock_stream_exec.assert_any_call([global_hook, "arg1"], cwd=self.tmp_path)
+        mock_stream_exec.assert_any_call([project_hook, "arg1"], cwd=self.tmp_path)
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec")
+    def test_fire__hook_dir_runs_concurrently(
+        self, mock_stream_exec, mock_check_allowed
+    ):
+        self._use_config_dirs(GlobalConfig())
+        scripts_path = self.hooks_path / "post_create.d"
+        self._write_hook(scripts_path / "a")
+        self._write_hook(scripts_path / "b")
+        after = self._write_hook(scripts_path / "c", "# after: a, b")
+
+        started = threading.Barrier(2, timeout=5)
+        calls = []
+
+        def fake_stream_exec(command_args, cwd):
+            if command_args[0] != after:
+                started.wait()
+            calls.append(command_args[0])
+            return 0
+
+        mock_stream_exec.side_effect = fake_stream_exec
+
+        self.assertTrue(self.hooks.fire(Hook.post_create))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[-1], after)
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec")
+    def test_fire__parallel_collects_failures(
+        self, mock_stream_exec, mock_check_allowed
+    ):
+        global_config = GlobalConfig()
+        global_config.update(parallel_hooks=[Hook.post_create.name])
+        global_hooks_path = self._use_config_dirs(global_config)
+        global_hook = self._write_hook(global_hooks_path / "post_create")
+        self._write_hook(self.hooks_path / "post_create")
+
+        mock_stream_exec.side_effect = lambda command_args, cwd: (
+            1 if command_args[0] == global_hook else 2
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "exit code [12].*exit code [12]"):
+            self.hooks.fire(Hook.post_create)
+        self.assertEqual(mock_stream_exec.call_count, 2)
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec")
+    def test_fire__serial_stops_on_failure(self, mock_stream_exec, mock_check_allowed):
+        global_hooks_path = self._use_config_dirs(GlobalConfig())
+        self._write_hook(global_hooks_path / "post_create")
+        self._write_hook(self.hooks_path / "post_create")
+        mock_stream_exec.return_value = 1
+
+        with self.assertRaisesRegex(RuntimeError, "failed with exit code 1"):
+            self.hooks.fire(Hook.post_create)
+        mock_stream_exec.assert_called_once()
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec")
+    @mock.patch("gh_worktree.hooks.os.fork", return_value=4321)
+    def test_fire__background(self, mock_fork, mock_stream_exec, mock_check_allowed):
+        global_config = GlobalConfig()
+        global_config.update(background_hooks=["post_create"])
+        self._use_config_dirs(global_config)
+        self._write_hook(self.hooks_path / "post_create")
+
+        self.assertTrue(
+            self.hooks.fire(Hook.post_create, "feature", worktree="feature")
+        )
+
+        mock_fork.assert_called_once()
+        mock_stream_exec.assert_not_called()
+        (job,) = HookJobs(self.context).list("feature")
+        self.assertEqual(job.hook, "post_create")
+        self.assertEqual(job.status, "running")
+        # recorded by the parent, in case the child dies before it runs anything
+        self.assertEqual(job.pid, 4321)
+
+    def test_runs_in_background(self):
+        global_config = GlobalConfig()
+        global_config.update(background_hooks=["post_create"])
+        self._use_config_dirs(global_config)
+
+        self.assertTrue(self.hooks.runs_in_background(Hook.post_create))
+        self.assertFalse(self.hooks.runs_in_background(Hook.post_checkout))
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec", return_value=0)
+    @mock.patch("gh_worktree.hooks.os.fork")
+    def test_fire__background_without_worktree(
+        self, mock_fork, mock_stream_exec, mock_check_allowed
+    ):
+        global_config = GlobalConfig()
+        global_config.update(background_hooks=["post_create"])
+        self._use_config_dirs(global_config)
+        self._write_hook(self.hooks_path / "post_create")
+
+        self.assertTrue(self.hooks.fire(Hook.post_create, "feature"))
+
+        mock_fork.assert_not_called()
+        mock_stream_exec.assert_called_once()
+
+    @mock.patch("gh_worktree.hooks.Hooks._check_allowed", return_value=True)
+    @mock.patch("gh_worktree.hooks.stream_exec", return_value=0)
+    @mock.patch("gh_worktree.hooks.os._exit")
+    @mock.patch("gh_worktree.hooks.os.setsid")
+    @mock.patch("gh_worktree.hooks.os.fork", return_value=0)
+    @mock.patch("gh_worktree.hooks.Hooks._redirect_output")
+    def test_fire__background_child(
+        self,
+        mock_redirect_output,
+        mock_fork,
+        mock_setsid,
+        mock_exit,
+        mock_stream_exec,
+        mock_check_allowed,
+    ):
+        global_config = GlobalConfig()
+        global_config.update(background_hooks=["post_create"])
+        self._use_config_dirs(global_config)
+        self._write_hook(self.hooks_path / "post_create")
+        jobs = HookJobs(self.context)
+
+        self.hooks.fire(Hook.post_create, "feature", worktree="feature")
+
+        mock_setsid.assert_called_once()
+        mock_redirect_output.assert_called_once_with(jobs.log_path("feature"))
+        mock_exit.assert_called_once_with(0)
+        (job,) = jobs.list("feature")
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.pid, os.getpid())
+        self.assertIsNotNone(job.finished_at)
+
+    @mock.patch("gh_worktree.hooks.stream_exec", return_value=3)
+    def test_run_job__failure(self, mock_stream_exec):
+        hook_file = self._write_hook(self.hooks_path / "post_create")
+        jobs = HookJobs(self.context)
+        job = jobs.start("feature", "post_create")
+
+        exit_code = self.hooks._run_job(jobs, job, {hook_file: set()}, ("feature",), 1)
+
+        self.assertEqual(exit_code, 1)
+        (job,) = jobs.list("feature")
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.exit_codes, {hook_file: 3})
+
     def test_add(self):
         with self.hooks.add(Hook.pre_init) as f:
             f.write("echo ok")
@@ -111,6 +347,22 @@ class HooksTestCase(TestCase):
         self.assertEqual(hook_file.read_text(), "echo ok")
         self.assertTrue(os.access(str(hook_file), os.X_OK))
 
+    def test_add__binary(self):
+        with self.hooks.add(Hook.pre_init, binary=True) as f:
+            f.write(b"echo ok\r\n")
+
+        hook_file = self.hooks_path / Hook.pre_init.name
+        self.assertEqual(hook_file.read_bytes(), b"echo ok\r\n")
+        self.assertTrue(os.access(str(hook_file), os.X_OK))
+
+    def test_add__script(self):
+        with self.hooks.add(Hook.post_create, script="10-deps") as f:
+            f.write("echo ok")
+
+        hook_file = self.hooks_path / "post_create.d" / "10-deps"
+        self.assertEqual(hook_file.read_text(), "echo ok")
+        self.assertTrue(os.access(str(hook_file), os.X_OK))
+
     def test_add__existing(self):
         hook_file = self.hooks_path / Hook.pre_init.name
         hook_file.write_bytes(b"echo ok")
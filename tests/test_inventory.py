@@ -0,0 +1,97 @@
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase
+
+from gh_worktree.git import GitWorktree
+from gh_worktree.hooks import Hook
+from gh_worktree.inventory import Inventory
+from gh_worktree.jobs import HookJobs
+
+
+def _git_worktree(path: Path, branch: str) -> GitWorktree:
+    return GitWorktree(path, "abc1234", branch, False, False, False, False)
+
+
+class InventoryTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.context = SimpleNamespace(config_dir=self.tmp_path / ".gh" / "worktree")
+        self.inventory = Inventory(self.context)
+        self.jobs = HookJobs(self.context)
+        self.worktrees = {
+            name: _git_worktree(self.tmp_path / name, name)
+            for name in ("feature", "other", "manual")
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record(self):
+        self.inventory.record("feature", base_ref="origin/main", base_commit="abc123")
+        self.inventory.record("other", base_ref="origin/other", pr_number="12")
+
+        entries = self.inventory.list(self.worktrees, self.jobs)
+
+        self.assertEqual(
+            [entry.name for entry in entries], ["feature", "manual", "other"]
+        )
+        feature, manual, other = entries
+        self.assertEqual(feature.git, self.worktrees["feature"])
+        self.assertEqual(feature.base_ref, "origin/main")
+        self.assertEqual(feature.base_commit, "abc123")
+        self.assertIsNone(feature.pr_number)
+        self.assertIsNotNone(feature.created_at)
+        self.assertEqual(other.pr_number, "12")
+        self.assertIsNone(manual.created_at)
+        self.assertIsNone(manual.hook)
+        # compact, as it's read on every list
+        self.assertNotIn("\n", self.inventory.index_path.read_text())
+
+    def test_record__replaces_earlier_worktree(self):
+        self.inventory.record("feature", base_ref="origin/main")
+        self.inventory.update("feature", hook="post_create", hook_status="failed")
+
+        self.inventory.record("feature", base_ref="origin/dev")
+
+        (entry,) = self.inventory.list(
+            {"feature": self.worktrees["feature"]}, self.jobs
+        )
+        self.assertEqual(entry.base_ref, "origin/dev")
+        self.assertIsNone(entry.hook)
+
+    def test_track_hook(self):
+        self.inventory.record("feature")
+        self.inventory.record("other")
+
+        with self.inventory.track_hook("feature", Hook.post_create):
+            pass
+        with self.assertRaises(RuntimeError):
+            with self.inventory.track_hook("other", Hook.post_checkout):
+                raise RuntimeError("Hook post_checkout failed with exit code 1")
+
+        feature, _, other = self.inventory.list(self.worktrees, self.jobs)
+        self.assertEqual(
+            (feature.hook, feature.hook_status), ("post_create", "succeeded")
+        )
+        self.assertEqual((other.hook, other.hook_status), ("post_checkout", "failed"))
+
+    def test_list__background_hook_uses_job(self):
+        self.inventory.record("feature")
+        with self.inventory.track_hook("feature", Hook.post_create):
+            job = self.jobs.start("feature", "post_create")
+        job.update(status="failed")
+        self.jobs.save(job)
+
+        (entry,) = self.inventory.list(
+            {"feature": self.worktrees["feature"]}, self.jobs
+        )
+        self.assertEqual(entry.hook_status, "failed")
+
+    def test_discard(self):
+        self.inventory.record("feature")
+        self.inventory.discard("feature")
+        self.inventory.discard("missing")
+
+        self.assertEqual(self.inventory.load().worktrees, {})
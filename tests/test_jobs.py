@@ -0,0 +1,107 @@
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.jobs import HookJob
+from gh_worktree.jobs import HookJobs
+
+
+class HookJobTestCase(TestCase):
+    def test_state__running(self):
+        job = HookJob()
+        job.update(status="running", pid=os.getpid())
+        self.assertEqual(job.state, "running")
+
+    def test_state__not_started(self):
+        job = HookJob()
+        job.update(status="running")
+        self.assertEqual(job.state, "running")
+
+    @mock.patch("gh_worktree.jobs.os.kill", side_effect=ProcessLookupError)
+    def test_state__interrupted(self, mock_kill):
+        job = HookJob()
+        job.update(status="running", pid=4321)
+        self.assertEqual(job.state, "interrupted")
+        mock_kill.assert_called_once_with(4321, 0)
+
+    @mock.patch("gh_worktree.jobs.os.kill")
+    def test_state__finished(self, mock_kill):
+        job = HookJob()
+        job.update(status="failed", pid=4321)
+        self.assertEqual(job.state, "failed")
+        mock_kill.assert_not_called()
+
+
+class HookJobsTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.context = SimpleNamespace(config_dir=self.tmp_path / ".gh" / "worktree")
+        self.jobs = HookJobs(self.context)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_start(self):
+        job = self.jobs.start("feature/nested", "post_create")
+
+        self.assertEqual(
+            self.jobs.job_path("feature/nested", "post_create"),
+            self.context.config_dir
+            / "jobs"
+            / "feature"
+            / "nested"
+            / "post_create.json",
+        )
+        self.assertTrue(self.jobs.job_path("feature/nested", "post_create").exists())
+        self.assertEqual(job.status, "running")
+        self.assertIsNotNone(job.started_at)
+
+    def test_save__replaces_record(self):
+        job = self.jobs.start("feature", "post_create")
+        job.update(status="succeeded")
+        self.jobs.save(job)
+
+        (saved,) = self.jobs.list()
+        self.assertEqual(saved.status, "succeeded")
+        self.assertEqual(
+            [p.name for p in self.jobs.job_path("feature", "x").parent.iterdir()],
+            ["post_create.json"],
+        )
+
+    def test_list(self):
+        with mock.patch("gh_worktree.jobs.time.time", return_value=2):
+            self.jobs.start("feature", "post_checkout")
+        with mock.patch("gh_worktree.jobs.time.time", return_value=1):
+            self.jobs.start("other", "post_create")
+
+        self.assertEqual(
+            [(job.worktree, job.hook) for job in self.jobs.list()],
+            [("other", "post_create"), ("feature", "post_checkout")],
+        )
+        self.assertEqual(
+            [job.worktree for job in self.jobs.list("feature")], ["feature"]
+        )
+        self.assertEqual(self.jobs.list("missing"), [])
+
+    def test_list__excludes_nested_worktrees(self):
+        self.jobs.start("feature", "post_create")
+        self.jobs.start("feature/nested", "post_create")
+
+        self.assertEqual(
+            [job.worktree for job in self.jobs.list("feature")], ["feature"]
+        )
+
+    def test_discard(self):
+        self.jobs.start("feature", "post_create")
+        log_path = self.jobs.log_path("feature")
+        log_path.parent.mkdir(parents=True)
+        log_path.write_text("output")
+
+        self.jobs.discard("feature")
+
+        self.assertEqual(self.jobs.list(), [])
+        self.assertFalse(log_path.exists())
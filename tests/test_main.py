@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+from unittest import mock
+from unittest import TestCase
+
+from gh_worktree.main import LazyCommand
+from gh_worktree.main import WorktreeCommands
+
+
+class WorktreeCommandsTestCase(TestCase):
+    def setUp(self):
+        self.commands = WorktreeCommands()
+
+    def test_lazy_commands__match_command_names(self):
+        lazy_commands = {
+            name: attr
+            for name, attr in vars(WorktreeCommands).items()
+            if isinstance(attr, LazyCommand)
+        }
+
+        expected_names = set()
+        for lazy_command in lazy_commands.values():
+            command_cls = lazy_command.load()
+            expected_names.add(command_cls._name)
+            expected_names.update(command_cls._aliases)
+
+        self.assertEqual(
+            {name.rstrip("_").replace("_", "-") for name in lazy_commands},
+            expected_names,
+        )
+
+    def test_lazy_command__returns_command(self):
+        from gh_worktree.commands.remove import RemoveCommand
+
+        command = self.commands.rm
+        self.assertIsInstance(command, RemoveCommand)
+        self.assertIs(command._runtime, self.commands._runtime)
+        # constructed once and cached
+        self.assertIs(self.commands.rm, command)
+
+    def test_import__defers_asyncio(self):
+        # the status dashboard alone needs asyncio, which is slow to import
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, gh_worktree.cli; print('asyncio' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_import__defers_runtime_services(self):
+        # `version` and `--help` need none of the services, so they're imported when first used
+        modules = [
+            "gh_worktree.gh",
+            "gh_worktree.git",
+            "gh_worktree.templates",
+            "hashlib",
+        ]
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, gh_worktree.cli; "
+                f"print([m for m in {modules!r} if m in sys.modules])",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_init__defers_runtime_services(self):
+        self.assertNotIn("templates", vars(self.commands._runtime))
+        self.assertNotIn("git", vars(self.commands._runtime))
+
+    @mock.patch("builtins.print")
+    def test_version(self, mock_print):
+        self.commands.version()
+        mock_print.assert_called_once()
+        self.assertTrue(mock_print.call_args[0][0].startswith("gh-worktree "))
@@ -0,0 +1,44 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from gh_worktree.response_cache import ResponseCache
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(Path(self.tmp_dir.name) / "cache")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.cache.get("octo/repo", "pr", "12"))
+
+        self.cache.put("octo/repo", "pr", "12", {"number": 12}, etag='W/"abc"')
+        cached = self.cache.get("octo/repo", "pr", "12")
+
+        self.assertEqual(cached.data, {"number": 12})
+        self.assertEqual(cached.etag, 'W/"abc"')
+        self.assertEqual(
+            self.cache.path("octo/repo", "pr", "12"),
+            Path(self.tmp_dir.name) / "cache" / "octo" / "repo" / "pr-12.json",
+        )
+        self.assertIsNone(self.cache.get("octo/other", "pr", "12"))
+
+    def test_is_fresh(self):
+        cached = self.cache.put("octo/repo", "pr", "12", {})
+
+        self.assertTrue(cached.is_fresh(60))
+        self.assertFalse(cached.is_fresh(0))
+        cached.update(fetched_at=time.time() - 120)
+        self.assertFalse(cached.is_fresh(60))
+
+    def test_get__corrupt(self):
+        path = self.cache.path("octo/repo", "pr", "12")
+        path.parent.mkdir(parents=True)
+        path.write_text("{")
+
+        self.assertIsNone(self.cache.get("octo/repo", "pr", "12"))
@@ -1,7 +1,12 @@
+import contextlib
+from pathlib import Path
 from types import SimpleNamespace
 from unittest import TestCase
+from unittest.mock import Mock
 
+from gh_worktree.config import RepositoryConfig
 from gh_worktree.git import GitRemote
+from gh_worktree.git import GitWorktree
 from gh_worktree.runtime import Runtime
 
 
@@ -40,3 +45,60 @@ class RuntimeTestCase(TestCase):
     def test_get_default_remote(self):
         remote = self.runtime.get_default_remote()
         self.assertEqual(remote, self.remotes[0])
+
+    def test_get_worktrees(self):
+        project_dir = Path("/repo")
+        self.runtime.context = SimpleNamespace(
+            project_dir=project_dir, use=lambda cwd: contextlib.nullcontext()
+        )
+        worktrees = [
+            GitWorktree(project_dir / ".bare", None, None, True, False, False, False),
+            GitWorktree(project_dir / "main", "a", "main", False, False, False, False),
+            GitWorktree(
+                project_dir / "feature/x", "b", "x", False, False, False, False
+            ),
+            GitWorktree(Path("/elsewhere"), "c", "y", False, False, False, False),
+        ]
+        self.runtime.git = SimpleNamespace(list_worktrees=lambda: worktrees)
+
+        self.assertEqual(
+            self.runtime.get_worktrees(),
+            {"main": worktrees[1], "feature/x": worktrees[2]},
+        )
+
+
+class RefreshConfigTestCase(TestCase):
+    def setUp(self):
+        self.runtime = Runtime()
+        self.config = RepositoryConfig()
+        self.config.update(owner="octo", name="repo", default_branch="master")
+        self.set_config = Mock()
+        self.runtime.context = SimpleNamespace(
+            get_config=lambda: self.config, set_config=self.set_config
+        )
+        self.repo_data = {
+            "defaultBranchRef": {"name": "main"},
+            "owner": {"login": "octo"},
+            "name": "repo",
+            "url": "https://github.com/octo/repo",
+            "isPrivate": False,
+        }
+        self.runtime.gh = SimpleNamespace(repo_status=Mock(return_value=self.repo_data))
+
+    def test_refresh_config__saves_changes(self):
+        config = self.runtime.refresh_config()
+
+        self.runtime.gh.repo_status.assert_called_once_with("octo/repo")
+        self.assertEqual(config.default_branch, "main")
+        self.set_config.assert_called_once_with(config)
+
+        self.runtime.refresh_config()
+        self.set_config.assert_called_once()
+
+    def test_refresh_config__unreachable(self):
+        self.runtime.gh.repo_status.side_effect = RuntimeError("Offline")
+
+        config = self.runtime.refresh_config()
+
+        self.assertEqual(config.default_branch, "master")
+        self.set_config.assert_not_called()
@@ -0,0 +1,72 @@
+import threading
+from unittest import TestCase
+
+from gh_worktree.scheduler import CycleError
+from gh_worktree.scheduler import run_graph
+
+
+class RunGraphTestCase(TestCase):
+    def test_respects_dependencies(self):
+        order = []
+        lock = threading.Lock()
+
+        def func(node):
+            with lock:
+                order.append(node)
+            return node.upper()
+
+        graph = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+        results = run_graph(graph, func, max_workers=4)
+
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C", "d": "D"})
+        self.assertEqual(order[0], "a")
+        self.assertEqual(order[-1], "d")
+
+    def test_runs_independent_nodes_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        results = run_graph(
+            {"a": set(), "b": set(), "c": set()},
+            lambda node: barrier.wait() is not None,
+            max_workers=3,
+        )
+        self.assertEqual(len(results), 3)
+
+    def test_bounded_workers(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def func(node):
+            with lock:
+                running.append(node)
+                peak.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.remove(node)
+
+        run_graph({i: set() for i in range(8)}, func, max_workers=2)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_should_stop(self):
+        graph = {"a": set(), "b": {"a"}, "c": {"b"}}
+        results = run_graph(
+            graph, lambda node: 1 if node == "b" else 0, 2, should_stop=bool
+        )
+        self.assertEqual(results, {"a": 0, "b": 1})
+
+    def test_raises_func_error(self):
+        def func(node):
+            if node == "a":
+                raise OSError("boom")
+            return node
+
+        with self.assertRaisesRegex(OSError, "boom"):
+            run_graph({"a": set(), "b": {"a"}}, func, max_workers=2)
+
+    def test_cycle(self):
+        with self.assertRaisesRegex(CycleError, "a, b"):
+            run_graph({"a": {"b"}, "b": {"a"}, "c": set()}, str, max_workers=1)
+
+    def test_unknown_dependency(self):
+        with self.assertRaisesRegex(ValueError, "unknown node"):
+            run_graph({"a": {"missing"}}, str, max_workers=1)
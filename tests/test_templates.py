@@ -1,11 +1,15 @@
 import os
 import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from gh_worktree.config import config_cache
+from gh_worktree.files import scan_template
 from gh_worktree.templates import TemplateExists
+from gh_worktree.templates import TemplateIndex
 from gh_worktree.templates import Templates
 
 
@@ -57,16 +61,25 @@ class TemplatesTestCase(unittest.TestCase):
         (subdir / "nested.txt").write_text("NESTED: $REPO_DIR\n")
 
         self.config = SimpleNamespace(name="test-repo")
-        self.global_config = SimpleNamespace(allowed_envvars=[])
+        self.global_config = SimpleNamespace(
+            allowed_envvars=[], template_strategy="copy", template_workers=4
+        )
 
     def tearDown(self):
         """Clean up test fixtures after each test method."""
         self.tmp_dir.cleanup()
 
-    def _create_context(self, allowed_envvars=None):
+    def _create_context(self, allowed_envvars=None, template_strategy="copy"):
         """Helper method to create a context with custom allowed_envvars."""
-        if allowed_envvars is not None:
-            self.global_config = SimpleNamespace(allowed_envvars=allowed_envvars)
+        self.global_config = SimpleNamespace(
+            allowed_envvars=(
+                allowed_envvars
+                if allowed_envvars is not None
+                else self.global_config.allowed_envvars
+            ),
+            template_strategy=template_strategy,
+            template_workers=4,
+        )
 
         return StubContext(
             self.project_dir,
@@ -154,6 +167,290 @@ class TemplatesTestCase(unittest.TestCase):
         self.assertTrue(worktree_script.exists())
         self.assertTrue(worktree_script.stat().st_mode & 0o111)
 
+    @patch("gh_worktree.templates.substitute_file")
+    def test_copy__copies_static_files_verbatim(self, mock_substitute_file):
+        """Test that files without placeholders, including binary files, aren't substituted."""
+        for path in self.project_templates_dir.rglob("*.txt"):
+            path.unlink()
+        (self.global_templates_dir / "config.txt").unlink()
+        binary = b"\x89PNG\r\n\x00$REPO_NAME\xff"
+        (self.project_templates_dir / "image.png").write_bytes(binary)
+        (self.project_templates_dir / "static.txt").write_text("no variables\n")
+
+        context = self._create_context()
+        templates = Templates(context)
+
+        worktree_dir = self.project_dir / "my-worktree"
+        worktree_dir.mkdir(parents=True)
+
+        templates.copy("my-worktree")
+
+        mock_substitute_file.assert_not_called()
+        self.assertEqual((worktree_dir / "image.png").read_bytes(), binary)
+        self.assertEqual((worktree_dir / "static.txt").read_text(), "no variables\n")
+
+    def test_copy__records_strategies(self):
+        """Test that copy records how each file was materialized."""
+        (self.project_templates_dir / "static.txt").write_text("no variables\n")
+
+        context = self._create_context()
+        templates = Templates(context)
+
+        worktree_dir = self.project_dir / "my-worktree"
+        worktree_dir.mkdir(parents=True)
+
+        templates.copy("my-worktree")
+
+        self.assertEqual(
+            templates.get_record("my-worktree").files,
+            {
+                "config.txt": "substitute",
+                "env.txt": "substitute",
+                "static.txt": "copy",
+                "subdir/nested.txt": "substitute",
+            },
+        )
+
+        templates.discard_record("my-worktree")
+        self.assertEqual(templates.get_record("my-worktree").files, {})
+
+    def test_copy__hardlinks_static_files(self):
+        """Test that the hardlink strategy links static files, and never writes through them."""
+        static_file = self.project_templates_dir / "static.txt"
+        static_file.write_text("no variables\n")
+        (self.global_templates_dir / "static.txt").write_text("global $REPO_NAME\n")
+
+        context = self._create_context(template_strategy="hardlink")
+        templates = Templates(context)
+
+        worktree_dir = self.project_dir / "my-worktree"
+        worktree_dir.mkdir(parents=True)
+
+        templates.copy("my-worktree")
+
+        # the project template overrides the global one
+        self.assertTrue((worktree_dir / "static.txt").samefile(static_file))
+        self.assertEqual(
+            templates.get_record("my-worktree").files["static.txt"], "hardlink"
+        )
+
+        # once it no longer does, the global template replaces the link, rather than being
+        # written through it
+        moved_file = static_file.rename(self.tmp_path / "static.txt")
+        templates.copy("my-worktree")
+        self.assertEqual(moved_file.read_text(), "no variables\n")
+        self.assertEqual(
+            (worktree_dir / "static.txt").read_text(), "global test-repo\n"
+        )
+
+    def _age_templates(self):
+        """Backdates the templates, so the index can trust their modification times."""
+        for path in self.tmp_path.rglob("*"):
+            os.utime(path, (1_000_000_000, 1_000_000_000))
+
+    def test_update_index(self):
+        """Test that the index only rescans templates that changed."""
+        self._age_templates()
+        config_file = self.global_templates_dir / "config.txt"
+        nested_file = self.project_templates_dir / "subdir" / "nested.txt"
+        templates = Templates(self._create_context())
+
+        with patch(
+            "gh_worktree.templates.scan_template", wraps=scan_template
+        ) as mock_scan_template:
+            infos = templates.update_index([config_file, nested_file])
+            self.assertEqual(mock_scan_template.call_count, 2)
+
+            self.assertEqual(
+                infos[str(config_file)].variables, ["REPO_NAME", "WORKTREE_NAME"]
+            )
+            self.assertFalse(infos[str(config_file)].static)
+            self.assertTrue(templates.index_path.exists())
+
+            mock_scan_template.reset_mock()
+            self.assertEqual(templates.update_index([config_file, nested_file]), infos)
+            mock_scan_template.assert_not_called()
+
+            nested_file.write_text("static\n")
+            os.utime(nested_file, (1_000_000_001, 1_000_000_001))
+            infos = templates.update_index([nested_file])
+            mock_scan_template.assert_called_once_with(nested_file)
+            self.assertTrue(infos[str(nested_file)].static)
+
+        index = config_cache.load(TemplateIndex, templates.index_path)
+        self.assertEqual(list(index.files), [str(nested_file)])
+
+    def test_update_index__rebuilds_unreadable_index(self):
+        """Test that a corrupt index is rebuilt, rather than failing every copy."""
+        config_file = self.global_templates_dir / "config.txt"
+        templates = Templates(self._create_context())
+        templates.index_path.parent.mkdir(parents=True, exist_ok=True)
+        templates.index_path.write_text('{"type": "template_index", "fi')
+
+        infos = templates.update_index([config_file])
+
+        self.assertEqual(
+            infos[str(config_file)].variables, ["REPO_NAME", "WORKTREE_NAME"]
+        )
+        index = config_cache.load(TemplateIndex, templates.index_path)
+        self.assertEqual(list(index.files), [str(config_file)])
+
+    def test_update_index__concurrent(self):
+        """Test that threads updating the index at once leave a complete index."""
+        self._age_templates()
+        config_file = self.global_templates_dir / "config.txt"
+        nested_file = self.project_templates_dir / "subdir" / "nested.txt"
+        templates = Templates(self._create_context())
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda _: templates.update_index([config_file, nested_file]),
+                    range(16),
+                )
+            )
+
+        self.assertTrue(all(result == results[0] for result in results))
+        index = config_cache.load(TemplateIndex, templates.index_path)
+        self.assertEqual(set(index.files), {str(config_file), str(nested_file)})
+        # no temporary files are left behind
+        self.assertNotIn(
+            ".template_index", "".join(os.listdir(templates.index_path.parent))
+        )
+
+    def test_update_index__rescans_racy_files(self):
+        """Test that files modified around when they were indexed are always rescanned."""
+        config_file = self.global_templates_dir / "config.txt"
+        templates = Templates(self._create_context())
+        templates.update_index([config_file])
+
+        with patch(
+            "gh_worktree.templates.scan_template", wraps=scan_template
+        ) as mock_scan:
+            templates.update_index([config_file])
+            mock_scan.assert_called_once_with(config_file)
+
+    @patch("gh_worktree.templates.is_template")
+    def test_copy__uses_index(self, mock_is_template):
+        """Test that copy decides what to substitute with the index, and warns about variables."""
+        (self.project_templates_dir / "static.txt").write_text("no variables\n")
+        context = self._create_context()
+        templates = Templates(context)
+
+        worktree_dir = self.project_dir / "my-worktree"
+        worktree_dir.mkdir(parents=True)
+
+        with patch("builtins.print") as mock_print:
+            templates.copy("my-worktree")
+
+        mock_is_template.assert_not_called()
+        self.assertEqual(
+            templates.get_record("my-worktree").files["static.txt"], "copy"
+        )
+        mock_print.assert_any_call(
+            "Template env.txt references variables that aren't allowed, and won't be replaced:"
+            " USER. To allow them, add them to `allowed_envvars` in your global config."
+        )
+        self.assertEqual(
+            (worktree_dir / "env.txt").read_text().splitlines()[1], "USER: $USER"
+        )
+
+    @patch("gh_worktree.templates.ThreadPoolExecutor", wraps=ThreadPoolExecutor)
+    def test_copy__concurrently_with_summary(self, mock_executor):
+        """Test that files are copied once each on the pool, with a single summary line."""
+        (self.global_templates_dir / "env.txt").write_text("GLOBAL\n")
+        (self.project_templates_dir / "static.txt").write_text("no variables\n")
+        context = self._create_context()
+        templates = Templates(context)
+
+        worktree_dir = self.project_dir / "my-worktree"
+        worktree_dir.mkdir(parents=True)
+
+        with patch("builtins.print") as mock_print:
+            templates.copy("my-worktree")
+
+        mock_executor.assert_called_once_with(4)
+        self.assertEqual(
+            templates.get_record("my-worktree").files,
+            {
+                "config.txt": "substitute",
+                "env.txt": "substitute",
+                "static.txt": "copy",
+                "subdir/nested.txt": "substitute",
+            },
+        )
+        self.assertEqual(
+            (worktree_dir / "env.txt").read_text(),
+            f"PATH: {worktree_dir}\nUSER: $USER\n",
+        )
+
+        summary = mock_print.call_args_list[-1][0][0]
+        self.assertRegex(
+            summary,
+            r"^Copied 4 templates into my-worktree in \d+\.\d\ds \(1 copy, 3 substitute\)$",
+        )
+
+    def test_sync(self):
+        """Test that sync only rewrites files whose rendered content or mode differs."""
+        (self.project_templates_dir / "static.txt").write_text("no variables\n")
+        context = self._create_context()
+        templates = Templates(context)
+        for worktree_name in ("one", "two"):
+            (self.project_dir / worktree_name).mkdir()
+            templates.copy(worktree_name)
+
+        (self.project_dir / "one" / "static.txt").write_text("edited\n")
+        (self.project_dir / "one" / "subdir" / "nested.txt").chmod(0o600)
+        (self.global_templates_dir / "config.txt").write_text(
+            "CHANGED: $WORKTREE_NAME\n"
+        )
+        os.utime(
+            self.global_templates_dir / "config.txt", (1_000_000_000, 1_000_000_000)
+        )
+
+        with patch.object(templates, "_copy", wraps=templates._copy) as mock_copy:
+            synced = templates.sync(["one", "two"])
+
+        self.assertEqual(
+            synced,
+            {
+                "one": {
+                    Path("config.txt"): "substitute",
+                    Path("static.txt"): "copy",
+                    Path("subdir/nested.txt"): "substitute",
+                },
+                "two": {Path("config.txt"): "substitute"},
+            },
+        )
+        self.assertEqual(mock_copy.call_count, 4)
+        self.assertEqual(
+            (self.project_dir / "two" / "config.txt").read_text(), "CHANGED: two\n"
+        )
+        self.assertEqual(
+            (self.project_dir / "one" / "static.txt").read_text(), "no variables\n"
+        )
+        self.assertEqual(templates.sync(["one", "two"]), {"one": {}, "two": {}})
+
+    def test_sync__hardlinked_template_gains_placeholders(self):
+        """Test that sync substitutes a hardlinked template once it has placeholders."""
+        static_template = self.project_templates_dir / "static.txt"
+        static_template.write_text("no variables\n")
+        templates = Templates(self._create_context(template_strategy="hardlink"))
+        (self.project_dir / "one").mkdir()
+        templates.copy("one")
+        dest_path = self.project_dir / "one" / "static.txt"
+        self.assertTrue(dest_path.samefile(static_template))
+
+        # edited in place, which the hardlink shares
+        static_template.write_text("worktree: $WORKTREE_NAME\n")
+        os.utime(static_template, (1_000_000_000, 1_000_000_000))
+        synced = templates.sync(["one"])
+
+        self.assertEqual(synced["one"][Path("static.txt")], "substitute")
+        self.assertFalse(dest_path.samefile(static_template))
+        self.assertEqual(dest_path.read_text(), "worktree: one\n")
+        self.assertEqual(static_template.read_text(), "worktree: $WORKTREE_NAME\n")
+
     def test_copy__handles_no_templates_directory(self):
         """Test that copy works when no template directories exist."""
         empty_project = self.tmp_path / "empty_project"
@@ -219,6 +516,18 @@ class TemplatesTestCase(unittest.TestCase):
         self.assertTrue(template_file.exists())
         self.assertEqual(template_file.read_text(), "hello")
 
+    def test_add__binary_with_mode(self):
+        context = self._create_context()
+        templates = Templates(context)
+
+        relative_path = ".gh/worktree/templates/script.sh"
+        with templates.add(relative_path, binary=True, mode=0o755) as f:
+            f.write(b"\x00\xffecho")
+
+        template_file = self.project_dir / relative_path
+        self.assertEqual(template_file.read_bytes(), b"\x00\xffecho")
+        self.assertEqual(template_file.stat().st_mode & 0o777, 0o755)
+
     def test_add__raises_when_existing(self):
         context = self._create_context()
         templates = Templates(context)
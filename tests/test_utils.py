@@ -1,8 +1,15 @@
+import io
+import subprocess
+import sys
 import tempfile
+import time
+from contextlib import redirect_stdout
 from pathlib import Path
+from unittest import mock
 from unittest import TestCase
 
 from gh_worktree.utils import find_up
+from gh_worktree.utils import iter_output
 
 
 class FindUpTestCase(TestCase):
@@ -42,3 +49,61 @@ class FindUpTestCase(TestCase):
 
         with self.assertRaisesRegex(RuntimeError, "Could not find non_existent_file"):
             find_up("non_existent_file", subdir)
+
+
+def _python(code: str):
+    return [sys.executable, "-c", code]
+
+
+class IterOutputTestCase(TestCase):
+    def _iter(self, command, **kwargs):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            yield from iter_output(command, **kwargs)
+
+    def test_iter_output__streams_and_kills_when_stopped(self):
+        lines = iter_output(
+            _python("import time; print('first', flush=True); time.sleep(30)")
+        )
+        start = time.monotonic()
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(next(lines), "first")
+            lines.close()
+
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_iter_output__binary(self):
+        command = _python("import sys; sys.stdout.buffer.write(b'a\\xff\\r\\nb\\nc')")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            lines = list(iter_output(command, binary=True))
+
+        self.assertEqual(lines, [b"a\xff\r", b"b", b"c"])
+        # only the command is echoed
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+    def test_iter_output__text(self):
+        command = _python(
+            "import sys; sys.stdout.buffer.write(b'a\\r\\n\\xc3\\xa9\\n')"
+        )
+        self.assertEqual(list(self._iter(command)), ["a", "\xe9"])
+
+    @mock.patch("gh_worktree.utils.LINE_LIMIT", 4)
+    def test_iter_output__splits_long_lines(self):
+        command = _python("print('abcdefghij')")
+        self.assertEqual(
+            list(self._iter(command, binary=True)), [b"abcd", b"efgh", b"ij"]
+        )
+
+    def test_iter_output__failure(self):
+        command = _python(
+            "import sys; print('partial'); sys.stderr.write('broken'); sys.exit(2)"
+        )
+        lines = []
+        with self.assertRaises(subprocess.CalledProcessError) as raised:
+            for line in self._iter(command):
+                lines.append(line)
+
+        self.assertEqual(lines, ["partial"])
+        self.assertEqual(raised.exception.returncode, 2)
+        self.assertEqual(raised.exception.stderr, b"broken")